@@ -0,0 +1,69 @@
+"""
+Compare a session of repeated tool calls answered by the MCP server with and without its response cache.
+
+The synthetic specification of bench_markdown.py is loaded, then the same session is replayed to the server:
+listing all IDs, searching all requirements and getting a few requirements, again and again.
+
+    uv run python benchmarks/bench_cache.py [--requirements N] [--rounds N]
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench_markdown import generate
+from speky.specification import Specification
+from speky_mcp.server import Server
+
+
+def session(count: int, rounds: int) -> str:
+    lines = [{'jsonrpc': '2.0', 'method': 'initialize', 'id': 0, 'params': {}}]
+    calls = [('list_all_ids', {}), ('search_requirements', {}), ('search_tests', {'category': 'functional'})]
+    calls += [('get_requirement', {'id': f'R{i:05}'}) for i in range(0, count, max(1, count // 10))]
+    for round_ in range(rounds):
+        for i, (name, arguments) in enumerate(calls):
+            request_id = round_ * len(calls) + i + 1
+            params = {'name': name, 'arguments': arguments}
+            lines.append({'jsonrpc': '2.0', 'method': 'tools/call', 'id': request_id, 'params': params})
+    return '\n'.join(map(json.dumps, lines)) + '\n'
+
+
+def measure(specs: Specification, requests: str, cache_size: int) -> tuple[float, str]:
+    output = io.StringIO()
+    server = Server(specs, max_concurrency=1, cache_size=cache_size)
+    start = time.perf_counter()
+    asyncio.run(server.serve(io.StringIO(requests), output))
+    return time.perf_counter() - start, output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requirements', type=int, default=10_000, help='Number of requirements (and tests)')
+    parser.add_argument('--rounds', type=int, default=20, help='Number of times the session is repeated')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        generate(Path(folder), args.requirements)
+        specs = Specification()
+        specs.read_file(Path(folder) / 'requirements.yaml')
+        specs.read_file(Path(folder) / 'tests.yaml')
+        specs.check_references()
+        specs.compute_coverage()
+
+    requests = session(args.requirements, args.rounds)
+    uncached_time, uncached_output = measure(specs, requests, 0)
+    cached_time, cached_output = measure(specs, requests, 256)
+    if uncached_output != cached_output:
+        sys.exit('The server answered differently with its cache')
+    print(f'{requests.count(chr(10)) - 1} tool calls, {len(cached_output) / 1e6:.1f} MB of responses')
+    print(f'Without cache: {uncached_time:.3f}s')
+    print(f'With cache:    {cached_time:.3f}s ({uncached_time / cached_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
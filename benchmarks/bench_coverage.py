@@ -0,0 +1,140 @@
+"""
+Compare the coverage engine with the scans it replaced, on a large synthetic specification.
+
+Requirements are spread over several manifests and categories, each covered by a few tests,
+a part of them automated by a code reference flagged as a test function.
+The coverage buckets of every manifest, and the test counts of every requirement, are timed both ways,
+then the cost of updating the engine when the tests of a file are unloaded and loaded again.
+
+    uv run python benchmarks/bench_coverage.py [--requirements N] [--manifests N]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+from speky.models import Manifest, NullSourceLinks, Requirement, Test
+from speky.scanner import CodeReference
+from speky.specification import Specification
+
+CATEGORIES = ('functional', 'non-functional', 'security')
+
+
+def generate(count: int, manifest_count: int) -> Specification:
+    rng = random.Random(42)
+    specs = Specification()
+    for m in range(manifest_count):
+        name = f'project{m}'
+        specs.manifests.append(
+            Manifest(name, Path(name), Path(name) / 'speky.toml', [], NullSourceLinks(), None, list(CATEGORIES))
+        )
+    manifest_by_name = {m.name: m for m in specs.manifests}
+    for i in range(count):
+        manifest = specs.manifests[i % manifest_count]
+        requirement = Requirement({'id': f'R{i:06}', 'long': 'Requirement'}, 'generated.yaml', manifest)
+        specs.load_requirement(requirement, CATEGORIES[i % len(CATEGORIES)])
+        for t in range(rng.randrange(4)):
+            test_id = f'T{i:06}_{t}'
+            data = {'id': test_id, 'long': 'Test', 'ref': [requirement.id], 'steps': []}
+            specs.load_test(Test(data, f'tests{i % 100}.yaml', manifest), CATEGORIES[i % len(CATEGORIES)])
+            specs.items_by_file[Path(f'tests{i % 100}.yaml')].append(specs.by_id[test_id])
+            for _ in range(rng.randrange(3)):
+                ref = CodeReference(manifest.name, Path('test.py'), 1, test_id, 'python', 'test_it', rng.random() < 0.7)
+                specs._load_code_reference(ref, manifest_by_name)
+    return specs
+
+
+# The coverage as it was computed, scanning the code references of each test of each requirement
+
+
+def legacy_is_test_automated(specs: Specification, test_id: str) -> bool:
+    return any(r.is_test for r in specs.code_refs_by_id.get(test_id, []))
+
+
+def legacy_coverage(specs: Specification) -> dict:
+    result = {}
+    for manifest in specs.manifests:
+        for category in manifest.coverage_categories:
+            requirements = [r for r in specs.requirements.get(category, []) if r.manifest is manifest]
+            automated, partial, manual, no_plan = [], [], [], []
+            for r in sorted(requirements):
+                if r.id not in specs.testers_of:
+                    no_plan.append(r)
+                else:
+                    tests = specs.testers_of[r.id]
+                    auto_count = sum(1 for t in tests if legacy_is_test_automated(specs, t.id))
+                    if auto_count == len(tests):
+                        automated.append(r)
+                    elif auto_count == 0:
+                        manual.append(r)
+                    else:
+                        partial.append(r)
+            result[manifest.name, category] = (automated, partial, manual, no_plan)
+    return result
+
+
+def legacy_counts(specs: Specification) -> list[tuple[int, int]]:
+    counts = []
+    for requirements in specs.requirements.values():
+        for r in requirements:
+            tests = specs.testers_of.get(r.id, [])
+            counts.append((len(tests), sum(1 for t in tests if legacy_is_test_automated(specs, t.id))))
+    return counts
+
+
+def engine_coverage(specs: Specification) -> dict:
+    specs.compute_coverage()
+    return {(m.name, category): buckets for m in specs.manifests for category, buckets in m.coverage.items()}
+
+
+def engine_counts(specs: Specification) -> list[tuple[int, int]]:
+    return [specs.coverage.counts(r.id) for requirements in specs.requirements.values() for r in requirements]
+
+
+def timed(function, repeat: int = 5) -> tuple[float, object]:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requirements', type=int, default=100_000, help='Number of requirements')
+    parser.add_argument('--manifests', type=int, default=20, help='Number of manifests')
+    args = parser.parse_args()
+
+    specs = generate(args.requirements, args.manifests)
+    cases = {
+        'coverage buckets': (lambda: legacy_coverage(specs), lambda: engine_coverage(specs)),
+        'test counts': (lambda: legacy_counts(specs), lambda: engine_counts(specs)),
+    }
+    for name, (legacy, engine) in cases.items():
+        legacy_time, legacy_result = timed(legacy)
+        engine_time, engine_result = timed(engine)
+        if legacy_result != engine_result:
+            sys.exit(f'{name}: the scans and the engine gave different results')
+        print(
+            f'{name:16}  scan: {legacy_time * 1000:7.1f}ms  engine: {engine_time * 1000:7.1f}ms'
+            f' ({legacy_time / engine_time:.1f}x)'
+        )
+
+    tests = specs.items_by_file[Path('tests0.yaml')]
+    start = time.perf_counter()
+    for test in tests:
+        specs.coverage.remove_test(test.id, test.ref)
+    for test in tests:
+        specs.coverage.add_test(test.id, test.ref)
+    print(
+        f'{len(tests)} tests unloaded and loaded again: engine updated in {(time.perf_counter() - start) * 1000:.2f}ms'
+    )
+    if engine_counts(specs) != legacy_counts(specs):
+        sys.exit('The engine is out of date after reloading tests')
+
+
+if __name__ == '__main__':
+    main()
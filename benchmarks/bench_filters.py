@@ -0,0 +1,92 @@
+"""
+Compare the combined filters of the MCP tools with the category scans they replaced.
+
+Requirements spread over a few categories are generated with random tags, and a test for each of them,
+then tag and category, several tags, and tested requirement and category filters are timed both ways.
+
+    uv run python benchmarks/bench_filters.py [--requirements N]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from speky.models import Requirement, Test
+from speky.specification import Specification
+
+CATEGORIES = ('functional', 'non-functional', 'security')
+
+
+def generate(count: int) -> Specification:
+    rng = random.Random(42)
+    specs = Specification()
+    for i in range(count):
+        tags = rng.sample([f'tag{t}' for t in range(200)], 3)
+        requirement = Requirement({'id': f'R{i:06}', 'long': 'Requirement', 'tags': tags}, 'generated.yaml')
+        specs.load_requirement(requirement, CATEGORIES[i % len(CATEGORIES)])
+        test = Test({'id': f'T{i:06}', 'long': 'Test', 'ref': [f'R{i:06}'], 'steps': []}, 'generated.yaml')
+        specs.load_test(test, CATEGORIES[i % len(CATEGORIES)])
+    return specs
+
+
+# The filters as they were, scanning the category for the other criterion
+
+
+def legacy_requirements(specs: Specification, tag: str, category: str) -> list:
+    by_tag = {r.id for r in specs.tags[tag]}
+    return [r for r in specs.requirements[category] if r.id in by_tag]
+
+
+def legacy_all_tags(specs: Specification, tags: list[str], category: str) -> list:
+    by_tags = set.intersection(*({r.id for r in specs.tags[tag]} for tag in tags))
+    return [r for r in specs.requirements[category] if r.id in by_tags]
+
+
+def legacy_tests(specs: Specification, tester_of: str, category: str) -> list:
+    by_tester = {t.id for t in specs.testers_of[tester_of]}
+    return [t for t in specs.tests[category] if t.id in by_tester]
+
+
+def timed(function, repeat: int = 20) -> tuple[float, list[str]]:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, sorted(item.id for item in result)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requirements', type=int, default=100_000, help='Number of requirements (and tests)')
+    args = parser.parse_args()
+
+    specs = generate(args.requirements)
+    cases = {
+        'tag + category': (
+            lambda: legacy_requirements(specs, 'tag7', 'security'),
+            lambda: specs.find_requirements(['tag7'], 'security'),
+        ),
+        'two tags + category': (
+            lambda: legacy_all_tags(specs, ['tag7', 'tag8'], 'security'),
+            lambda: specs.find_requirements(['tag7', 'tag8'], 'security'),
+        ),
+        'tester + category': (
+            lambda: legacy_tests(specs, 'R000002', 'security'),
+            lambda: specs.find_tests('R000002', 'security'),
+        ),
+    }
+    for name, (legacy, indexed) in cases.items():
+        legacy_time, legacy_result = timed(legacy)
+        indexed_time, indexed_result = timed(indexed)
+        if legacy_result != indexed_result:
+            sys.exit(f'{name}: the filters returned different items')
+        print(
+            f'{name:20} {len(indexed_result):5} results  scan: {legacy_time * 1000:7.3f}ms'
+            f'  index: {indexed_time * 1000:7.3f}ms ({legacy_time / indexed_time:.0f}x)'
+        )
+
+
+if __name__ == '__main__':
+    main()
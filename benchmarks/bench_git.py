@@ -0,0 +1,70 @@
+"""
+Compare the resolution of the source links of many manifests in one repository with the git commands it replaced.
+
+A repository is created with nested folders, each one standing for a manifest with `source_links` set to auto.
+The source links of every manifest are resolved by running git three times per manifest,
+then by a resolver shared by all the manifests.
+
+    uv run python benchmarks/bench_git.py [--manifests N]
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from speky.git import GitResolver
+from speky.models import SourceLinkConfig, normalize_remote_url
+
+
+def git(cwd: Path, *arguments: str) -> subprocess.CompletedProcess:
+    return subprocess.run(['git', *arguments], cwd=cwd, capture_output=True, text=True)
+
+
+def generate(folder: Path, count: int) -> list[Path]:
+    git(folder, 'init', '-q', '-b', 'main')
+    identity = ['-c', 'user.name=Speky', '-c', 'user.email=speky@example.com']
+    git(folder, *identity, 'commit', '-q', '--allow-empty', '-m', 'First')
+    git(folder, 'remote', 'add', 'origin', 'git@github.com:agagniere/speky.git')
+    manifests = [folder / 'specs' / f'project{i // 10}' / f'module{i}' for i in range(count)]
+    for manifest in manifests:
+        manifest.mkdir(parents=True)
+    return manifests
+
+
+def legacy(cwd: Path) -> tuple[str, str, Path]:
+    """The git commands that each manifest used to run."""
+    url = normalize_remote_url(git(cwd, 'remote', 'get-url', 'origin').stdout.strip())
+    branch = git(cwd, 'rev-parse', '--abbrev-ref', 'HEAD').stdout.strip()
+    return url, branch, Path(git(cwd, 'rev-parse', '--show-toplevel').stdout.strip())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--manifests', type=int, default=50, help='Number of manifests in the repository')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        manifests = generate(Path(folder).resolve(), args.manifests)
+
+        start = time.perf_counter()
+        expected = [legacy(manifest) for manifest in manifests]
+        legacy_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        resolver = GitResolver()
+        configs = [SourceLinkConfig.from_dict({'url': 'auto'}, manifest, resolver) for manifest in manifests]
+        resolver_time = time.perf_counter() - start
+
+    if [(c.url, c.branch, c.git_root) for c in configs] != expected:
+        sys.exit('The resolver and git found different metadata')
+    print(
+        f'{args.manifests} manifests  git commands: {legacy_time * 1000:6.1f}ms'
+        f'  resolver: {resolver_time * 1000:5.2f}ms ({resolver.subprocesses} git commands)'
+    )
+
+
+if __name__ == '__main__':
+    main()
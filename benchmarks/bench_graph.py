@@ -0,0 +1,96 @@
+"""
+Measure the traceability graph on a large synthetic specification.
+
+Layers of requirements refer to requirements of the layer below, and each requirement is covered by tests
+chained by prerequisites, until the requested number of dependencies is reached.
+The graph is built, then impact_of is timed for requirements of each layer, against a search of the same
+dependencies through the dictionaries of the specification.
+
+    uv run python benchmarks/bench_graph.py [--edges N]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from speky.models import Requirement, Test
+from speky.specification import Specification
+
+LAYERS = 5
+
+
+def generate(edges: int) -> Specification:
+    rng = random.Random(42)
+    per_layer = edges // (LAYERS * 4)
+    specs = Specification()
+    for layer in range(LAYERS):
+        for i in range(per_layer):
+            ref = [f'R{layer - 1}_{rng.randrange(per_layer)}' for _ in range(2)] if layer else None
+            requirement = Requirement({'id': f'R{layer}_{i}', 'long': 'Requirement', 'ref': ref}, 'generated.yaml')
+            specs.load_requirement(requirement, 'functional')
+            for t in range(2):
+                prereq = [f'T{layer}_{i}_0'] if t else None
+                data = {'id': f'T{layer}_{i}_{t}', 'long': 'Test', 'ref': [f'R{layer}_{i}'], 'prereq': prereq}
+                specs.load_test(Test(data | {'steps': []}, 'generated.yaml'), 'functional')
+    return specs
+
+
+def search(specs: Specification, item_id: str) -> set[str]:
+    """The same dependencies, found through the dictionaries of the specification."""
+    prereq_of = {}
+    for tests in specs.tests.values():
+        for test in tests:
+            for prereq in test.prereq or []:
+                prereq_of.setdefault(prereq, []).append(test)
+    seen = {item_id}
+    frontier = [item_id]
+    while frontier:
+        reached = []
+        for current in frontier:
+            for item in (
+                *specs.references.get(current, []),
+                *specs.testers_of.get(current, []),
+                *prereq_of.get(current, []),
+            ):
+                if item.id not in seen:
+                    seen.add(item.id)
+                    reached.append(item.id)
+        frontier = reached
+    return seen - {item_id}
+
+
+def timed(function, repeat: int = 20) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--edges', type=int, default=100_000, help='Approximate number of dependencies')
+    args = parser.parse_args()
+
+    specs = generate(args.edges)
+    start = time.perf_counter()
+    graph = specs.traceability_graph()
+    print(f'{len(graph.ids)} items, {len(graph)} dependencies, graph built in {time.perf_counter() - start:.2f}s')
+
+    for layer in range(LAYERS):
+        item_id = f'R{layer}_0'
+        impacted = graph.impact_of(item_id)
+        if {impact.item_id for impact in impacted} != search(specs, item_id):
+            sys.exit(f'{item_id}: the graph and the search found different items')
+        graph_time = timed(lambda item_id=item_id: graph.impact_of(item_id))
+        search_time = timed(lambda item_id=item_id: search(specs, item_id), repeat=3)
+        print(
+            f'{item_id:6} {len(impacted):6} impacted, depth {max((i.depth for i in impacted), default=0)}'
+            f'  graph: {graph_time * 1000:8.3f}ms  dictionaries: {search_time * 1000:7.1f}ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
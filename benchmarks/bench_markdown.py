@@ -0,0 +1,283 @@
+"""
+Compare the rendering of Markdown pages with the stream-based writers they replaced.
+
+A synthetic specification of requirements, each validated by a test, is generated in a temporary folder,
+then every requirement and test page is rendered in memory by both writer stacks.
+
+    uv run python benchmarks/bench_markdown.py [--requirements N]
+"""
+
+import argparse
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import TextIO
+
+from speky.generators.markdown import MystWriter, requirement_to_myst, test_to_myst
+from speky.specification import Specification
+
+# Writers streaming every line to a file-like object, as they were before fragment lists
+
+
+class LegacyMarkdownWriter:
+    def __init__(self, output: TextIO):
+        self.output = output
+
+    def write(self, string: str):
+        self.output.write(string)
+
+    def write_line(self, line: str):
+        self.write(f'{line}\n')
+
+    def empty_line(self):
+        self.write_line('')
+
+    def heading(self, title: str, level: int):
+        self.write_line(f'{"#" * (level + 1)} {title}')
+
+    def quote(self, quote_lines: list[str]):
+        for line in quote_lines:
+            self.write_line(f'> {line}')
+
+    def code_block(self, language: str = ''):
+        return LegacyMarkdownCodeBlock(language, self)
+
+
+class LegacyMystEnvironment(LegacyMarkdownWriter):
+    delimiter = ':'
+    name = None
+    braces = True
+
+    def __init__(self, output: LegacyMarkdownWriter, title: str | None = None, height: int = 0):
+        super().__init__(output)
+        self.height = height
+        self.args = {}
+        self.title = title
+
+    def __enter__(self):
+        first_line = [self.delimiter] * (3 + self.height)
+        if self.braces:
+            first_line.append('{')
+        first_line.append(self.name)
+        if self.braces:
+            first_line.append('}')
+        if self.title:
+            first_line += [' ', self.title]
+        self.write_line(''.join(first_line))
+
+        if self.args:
+            for key, value in self.args.items():
+                self.write_line(f':{key}: {value}')
+            self.empty_line()
+        return self
+
+    def __exit__(self, exception_type, exception_value, traceback):
+        self.write_line(self.delimiter * (3 + self.height))
+
+
+class LegacyMarkdownCodeBlock(LegacyMystEnvironment):
+    delimiter = '`'
+    braces = False
+
+    def __init__(self, language: str, output: LegacyMarkdownWriter):
+        super().__init__(output)
+        self.name = language
+
+
+class LegacyDropdown(LegacyMystEnvironment):
+    name = 'dropdown'
+
+    def __init__(
+        self,
+        height: int,
+        output: LegacyMarkdownWriter,
+        title: str,
+        opened: bool,
+        color: str | None = None,
+        icon: str | None = None,
+    ):
+        super().__init__(output, title, height)
+        if opened:
+            self.args['open'] = ''
+        if icon:
+            self.args['icon'] = icon
+        if color:
+            self.args['color'] = color
+
+
+class LegacyTableOfContent(LegacyMystEnvironment):
+    name = 'toctree'
+
+    def __init__(self, output, max_depth: int | None):
+        super().__init__(output)
+        if max_depth is not None:
+            self.args['maxdepth'] = max_depth
+
+
+class LegacyCard(LegacyMystEnvironment):
+    name = 'card'
+
+    def __init__(
+        self,
+        height: int,
+        output: LegacyMarkdownWriter,
+        title: str,
+        text_align: str,
+        width: str | None = None,
+        margin: str | None = None,
+        header: str | None = None,
+        footer: str | None = None,
+        class_card: str | None = None,
+        class_header: str | None = None,
+    ):
+        super().__init__(output, title, height)
+        self.args['text-align'] = text_align
+        if width:
+            self.args['width'] = width
+        if margin:
+            self.args['margin'] = margin
+        if class_card:
+            self.args['class-card'] = class_card
+        if class_header:
+            self.args['class-header'] = class_header
+        self.header = header
+        self.footer = footer
+
+    def __enter__(self):
+        super().__enter__()
+        if self.header:
+            self.write_line(self.header)
+            self.write_line('^^^')
+        return self
+
+    def __exit__(self, *args):
+        if self.footer:
+            self.write_line('+++')
+            self.write_line(self.footer)
+        super().__exit__(*args)
+
+
+class LegacyGrid(LegacyMystEnvironment):
+    name = 'grid'
+
+    def __init__(self, output: LegacyMarkdownWriter, columns: str, gutter: int = 3):
+        super().__init__(output, title=columns, height=1)
+        self.args['gutter'] = gutter
+
+
+class LegacyGridItemCard(LegacyCard):
+    name = 'grid-item-card'
+
+    def __init__(self, output: LegacyMarkdownWriter, title: str, color: str, text_align: str = 'center'):
+        super().__init__(0, output, None, text_align, header=title)
+        self.args['class-header'] = f'sd-bg-{color} sd-text-white'
+
+
+class LegacyMystWriter(LegacyMarkdownWriter):
+    def quote(self, quote_lines: list[str], attribution: str | None = None):
+        if attribution:
+            self.write_line('{' + f'attribution="{attribution}"}}')
+        super().quote(quote_lines)
+
+    def dropdown(self, height, title, color, opened, icon):
+        return LegacyDropdown(height, self, title, opened, color, icon)
+
+    def table_of_content(self, max_depth=None):
+        return LegacyTableOfContent(self, max_depth=max_depth)
+
+    def card(self, height, title, align, **kwargs):
+        return LegacyCard(height, self, title, align, **kwargs)
+
+    def grid(self, columns: str, gutter: int = 3):
+        return LegacyGrid(self, columns, gutter)
+
+
+def generate(folder: Path, count: int) -> Path:
+    requirements = ['kind: requirements', 'category: functional', 'requirements:']
+    tests = ['kind: tests', 'category: functional', 'tests:']
+    for i in range(count):
+        requirements += [
+            f'- id: R{i:05}',
+            f'  short: Requirement {i}',
+            f'  long: The requirement number {i}, described at length',
+            f'  ref: [R{(i + 1) % count:05}]',
+            '  properties:',
+            f'    priority: P{i % 3}',
+        ]
+        tests += [
+            f'- id: T{i:05}',
+            f'  ref: [R{i:05}]',
+            f'  long: The test of requirement {i}',
+            '  steps:',
+            '  - action: Do this',
+            '  - action: Do that shell command',
+            f'    run: echo {i}',
+        ]
+    (folder / 'requirements.yaml').write_text('\n'.join(requirements) + '\n')
+    (folder / 'tests.yaml').write_text('\n'.join(tests) + '\n')
+    return folder
+
+
+def render_legacy(specs: Specification) -> list[str]:
+    pages = []
+    for item, function in pages_of(specs):
+        buffer = io.StringIO()
+        function(item, LegacyMystWriter(buffer), specs)
+        pages.append(buffer.getvalue())
+    return pages
+
+
+def render(specs: Specification) -> list[str]:
+    pages = []
+    for item, function in pages_of(specs):
+        output = MystWriter()
+        function(item, output, specs)
+        pages.append(output.getvalue())
+    return pages
+
+
+def pages_of(specs: Specification):
+    for requirements in specs.requirements.values():
+        for requirement in requirements:
+            yield requirement, requirement_to_myst
+    for tests in specs.tests.values():
+        for test in tests:
+            yield test, test_to_myst
+
+
+def measure(function, specs: Specification, repeat: int) -> tuple[float, list[str]]:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pages = function(specs)
+        best = min(best, time.perf_counter() - start)
+    return best, pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requirements', type=int, default=10_000, help='Number of requirements (and tests)')
+    parser.add_argument('--repeat', type=int, default=5, help='Number of measurements, the best one is kept')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        generate(Path(folder), args.requirements)
+        specs = Specification()
+        specs.read_file(Path(folder) / 'requirements.yaml')
+        specs.read_file(Path(folder) / 'tests.yaml')
+        specs.check_references()
+        specs.compute_coverage()
+
+    legacy_time, legacy_pages = measure(render_legacy, specs, args.repeat)
+    buffered_time, buffered_pages = measure(render, specs, args.repeat)
+    if legacy_pages != buffered_pages:
+        sys.exit('The writers rendered different pages')
+    print(f'{len(buffered_pages)} pages, {sum(map(len, buffered_pages)) / 1e6:.1f} MB')
+    print(f'Stream writers:   {legacy_time:.3f}s')
+    print(f'Fragment buffers: {buffered_time:.3f}s ({legacy_time / buffered_time:.2f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,301 @@
+"""
+Compare the memory used by the loaded model with the SimpleNamespace classes and the identifiers it had before.
+
+A synthetic specification of requirements, tests and comments is generated in a temporary folder,
+then loaded the way speky-mcp does and indexed for search, each variant in a fresh process:
+- SimpleNamespace: items with a per-instance dictionary, and a copy of identifiers per occurrence
+- Slots: slotted items, and a copy of identifiers per occurrence
+- Slots + interning: slotted items sharing a single copy of each identifier, tag and category
+- Lazy: the same, without the heavy fields, that speky-mcp --lazy reads from the files when requested
+
+A second specification is a single file of requirements with long descriptions, as written by hand,
+to compare the memory needed to parse a large file with and without locating its items.
+
+    uv run python benchmarks/bench_models.py [--items N] [--long-requirements N]
+
+Resident memory is read from /proc, so this benchmark only runs on Linux.
+"""
+
+import argparse
+import datetime
+import gc
+import resource
+import subprocess
+import sys
+import tempfile
+from argparse import Namespace
+from pathlib import Path
+from types import SimpleNamespace
+
+import speky.specification
+from speky.utils import ensure_fields, import_fields, warn_extra_fields
+from speky_mcp.server import load_specification
+
+# Classes with a per-instance dictionary, as they were before slots
+
+
+class LegacySpecItem(SimpleNamespace):
+    """Base class for specification items (requirements and tests)."""
+
+    folder = 'misc'
+    id_field = 'id'
+    mandatory_fields = ['long']
+    optional_fields = ['short']
+
+    @classmethod
+    def fields(cls):
+        """Return all fields (id + mandatory + optional)."""
+        return [cls.id_field] + cls.mandatory_fields + cls.optional_fields
+
+    @classmethod
+    def from_dict(cls, data: dict, location: str, manifest=None):
+        """
+        Create a LegacySpecItem from YAML data.
+
+        Args:
+            data: Dictionary from YAML
+            location: Source file path for error messages
+            manifest: The Manifest that loaded this file, if any
+
+        Returns:
+            Instance of the class
+
+        Raises:
+            KeyError: If required fields are missing
+        """
+        result = SimpleNamespace(source_file=location, manifest=manifest)
+        ensure_fields(f'Definition of a {cls.__name__} in "{location}"', data, [cls.id_field])
+        item_location = f'Definition of {cls.__name__} {data[cls.id_field]} in "{location}"'
+        ensure_fields(item_location, data, cls.mandatory_fields)
+        warn_extra_fields(item_location, data, cls.fields())
+        import_fields(result, data, cls.fields())
+        return cls(**result.__dict__)
+
+    @property
+    def title(self):
+        """Return formatted title with ID and optional short description."""
+        return f'`{self.id}` {self.short}' if self.short else f'`{self.id}`'
+
+    def json_oneliner(self, full_summary: bool):
+        """Equivalent of the title but in JSON format"""
+        result = {'id': self.id}
+        if self.short:
+            result['short'] = self.short
+        if full_summary:
+            result['category'] = self.category
+            if hasattr(self, 'tags') and self.tags:
+                result['tags'] = self.tags
+        return result
+
+    def __lt__(self, other):
+        """Compare by ID field for sorting."""
+        return getattr(self, self.id_field) < getattr(other, other.id_field)
+
+
+class LegacyRequirement(LegacySpecItem):
+    """speky:speky#SF001 — LegacyRequirement specification item."""
+
+    folder = 'requirements'
+    optional_fields = LegacySpecItem.optional_fields + ['tags', 'client_statement', 'properties', 'ref']
+
+
+class LegacyTest(LegacySpecItem):
+    """speky:speky#SF001 — LegacyTest specification item."""
+
+    folder = 'tests'
+    mandatory_fields = LegacySpecItem.mandatory_fields + ['ref', 'steps']
+    optional_fields = LegacySpecItem.optional_fields + ['initial', 'prereq']
+
+    step_fields = {'action', 'run', 'expected', 'sample', 'sample_lang'}
+
+    @classmethod
+    def from_dict(cls, data: dict, location: str, manifest=None):
+        """
+        Create a LegacyTest from YAML data, validating step structure.
+
+        Args:
+            data: Dictionary from YAML
+            location: Source file path for error messages
+            manifest: The Manifest that loaded this file, if any
+
+        Returns:
+            LegacyTest instance
+
+        Raises:
+            KeyError: If required fields are missing
+        """
+        result = super().from_dict(data, location, manifest=manifest)
+        for i, step in enumerate(result.steps, 1):
+            name = f'Step {i} of {cls.__name__} {data[cls.id_field]} in "{location}"'
+            ensure_fields(name, step, ['action'])
+            warn_extra_fields(name, step, cls.step_fields)
+        return result
+
+
+class LegacyComment(SimpleNamespace):
+    """speky:speky#SF006 — LegacyComment on a requirement or test."""
+
+    fields = ['about', 'from', 'date', 'text', 'external']
+
+    @classmethod
+    def from_dict(cls, data: dict, location: str):
+        """
+        Create a LegacyComment from YAML data.
+
+        Args:
+            data: Dictionary from YAML
+            location: Source file path for error messages
+
+        Returns:
+            LegacyComment instance
+
+        Raises:
+            KeyError: If required fields are missing
+        """
+        result = SimpleNamespace(source_file=location)
+        item_location = f'Definition of a {cls.__name__} in "{location}"'
+        ensure_fields(item_location, data, cls.fields)
+        warn_extra_fields(item_location, data, cls.fields)
+        import_fields(result, data, cls.fields)
+        result.external = result.external in ['True', 'true', True, 1, '1']
+        result.time = datetime.datetime.strptime(result.date, '%d/%m/%Y').astimezone(datetime.UTC)
+        return cls(**result.__dict__)
+
+    def __lt__(self, other):
+        """Compare by timestamp for chronological sorting."""
+        return self.time < other.time
+
+
+def generate(folder: Path, count: int) -> Path:
+    """Write a manifest loading count items: 40% requirements, 40% tests and 20% comments."""
+    requirements = ['kind: requirements', 'category: functional', 'requirements:']
+    tests = ['kind: tests', 'category: functional', 'tests:']
+    comments = ['kind: comments', 'comments:']
+    for i in range(count * 2 // 5):
+        requirements += [
+            f'- id: R{i:06}',
+            f'  short: Requirement {i}',
+            f'  long: The requirement number {i}',
+            f'  tags: [group{i % 10}]',
+            f'  ref: [R{(i + 1) % (count * 2 // 5):06}]',
+        ]
+        tests += [
+            f'- id: T{i:06}',
+            f'  ref: [R{i:06}]',
+            f'  long: The test of requirement {i}',
+            '  steps:',
+            f'  - action: Run {i}',
+        ]
+    for i in range(count // 5):
+        comments += [f'- about: R{i:06}', '  from: Bench', '  date: 01/02/2026', f'  text: Comment {i}']
+    (folder / 'requirements.yaml').write_text('\n'.join(requirements) + '\n')
+    (folder / 'tests.yaml').write_text('\n'.join(tests) + '\n')
+    (folder / 'comments.yaml').write_text('\n'.join(comments) + '\n')
+    manifest = folder / 'manifest.yaml'
+    manifest.write_text(
+        'kind: project\nname: bench\nfiles:\n  - requirements.yaml\n  - tests.yaml\n  - comments.yaml\n'
+    )
+    return manifest
+
+
+def generate_long(folder: Path, count: int) -> Path:
+    """Write a manifest loading a single file of count requirements, each with a description of about 1 KB."""
+    paragraph = ' '.join(f'word{w}' for w in range(150))
+    requirements = ['kind: requirements', 'category: functional', 'requirements:']
+    for i in range(count):
+        requirements += [
+            f'- id: R{i:06}',
+            f'  short: Requirement {i}',
+            '  long: |',
+            f'    The requirement number {i} is described at length: {paragraph[: 500 + i % 100]}',
+            f'    {paragraph[i % 100 :][:500]}',
+            f'  tags: [group{i % 10}]',
+        ]
+    (folder / 'requirements.yaml').write_text('\n'.join(requirements) + '\n')
+    manifest = folder / 'manifest.yaml'
+    manifest.write_text('kind: project\nname: bench\nfiles:\n  - requirements.yaml\n')
+    return manifest
+
+
+def resident() -> int:
+    """Return the current resident set size, in bytes."""
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * resource.getpagesize()
+
+
+VARIANTS = ('SimpleNamespace', 'Slots', 'Slots + interning', 'Lazy')
+
+
+def measure(manifest: Path, variant: str):
+    """
+    Load and index the specification in this process.
+
+    Print the number of items, and the resident memory added in the end and at the peak.
+    """
+    if variant == 'SimpleNamespace':
+        speky.specification.Requirement = LegacyRequirement
+        speky.specification.Test = LegacyTest
+        speky.specification.Comment = LegacyComment
+    if variant in ('SimpleNamespace', 'Slots'):
+        speky.specification._intern = lambda value: value
+    args = Namespace(
+        snapshot=None, jobs=1, lazy=variant == 'Lazy', paths=[str(manifest)], comment_csvs=None, cache_dir=None
+    )
+    gc.collect()
+    before = resident()
+    specs = load_specification(args)
+    specs.search_index()  # Built at startup in eager mode, and by the first search in lazy mode
+    gc.collect()
+    items = len(specs.by_id) + sum(map(len, specs.comments.values()))
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(items, resident() - before, peak - before)
+
+
+def compare(name: str, generator, count: int):
+    """Load the specification written by a generator with each variant, and print the memory they use."""
+    with tempfile.TemporaryDirectory() as folder:
+        manifest = generator(Path(folder), count)
+        results = {}
+        for variant in VARIANTS:
+            output = subprocess.run(
+                [sys.executable, __file__, '--measure', str(manifest), '--variant', variant],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            results[variant] = [int(value) for value in output.split()]
+
+    if len({items for items, _, _ in results.values()}) > 1:
+        sys.exit('The variants loaded different items')
+    baseline = results[VARIANTS[0]][1]
+    print(f'{name}: {results[VARIANTS[0]][0]} items loaded, resident memory added:')
+    for variant, (_, added, peak) in results.items():
+        print(
+            f'{variant:18} {added / 2**20:6.1f} MiB ({(baseline - added) / 2**20:5.1f} MiB saved)'
+            f', {peak / 2**20:6.1f} MiB at the peak'
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=100_000, help='Number of requirements, tests and comments')
+    parser.add_argument(
+        '--long-requirements', type=int, default=20_000, help='Number of requirements in the file of long ones'
+    )
+    parser.add_argument('--measure', type=Path, metavar='MANIFEST', help=argparse.SUPPRESS)
+    parser.add_argument('--variant', choices=VARIANTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure, args.variant)
+        return
+
+    for name, generator, count in (
+        ('Many small items', generate, args.items),
+        ('One file of long requirements', generate_long, args.long_requirements),
+    ):
+        compare(name, generator, count)
+
+
+if __name__ == '__main__':
+    main()
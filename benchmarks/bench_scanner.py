@@ -0,0 +1,290 @@
+"""
+Compare the tag extraction of the scanner with the recursive walk it replaced.
+
+A synthetic tree of Python, Go, Rust and Bash files is generated in a temporary folder,
+then both extractors are run on every file, after tree-sitter parsing.
+
+    uv run python benchmarks/bench_scanner.py [--files N] [--functions N]
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from speky.scanner import (
+    _COMMENT_TYPES,
+    _GO_LANG,
+    _LANGUAGES,
+    _PY_LANG,
+    _RS_LANG,
+    _SH_LANG,
+    _SYMBOL_TYPES,
+    ANNOTATION_RE,
+    CodeReference,
+    _extract,
+    _symbol_name,
+    _text,
+)
+from tree_sitter import Node, Parser
+
+PROJECT = 'bench'
+LANGUAGES = {'.py': _PY_LANG, '.go': _GO_LANG, '.rs': _RS_LANG, '.sh': _SH_LANG}
+
+# Recursive extraction, as it was before tree-sitter queries
+
+
+def legacy_walk(node: Node, source: bytes, ext: str, project_names: set[str], file: Path, refs: list[CodeReference]):
+    if node.type in _COMMENT_TYPES[ext]:
+        text = _text(node, source)
+        for m in ANNOTATION_RE.finditer(text):
+            if m.group('project').lower() not in project_names:
+                continue
+            symbol, is_test, symbol_node = legacy_following_symbol(node, source, ext)
+            if ext == '.sh' and file.name.startswith('test'):
+                is_test = True
+            elif ext == '.go' and file.name.endswith('_test.go'):
+                is_test = True
+            line = (symbol_node.start_point[0] + 1) if symbol_node else (node.start_point[0] + 1)
+            refs.append(
+                CodeReference(
+                    project=m.group('project').lower(),
+                    target_id=m.group('id'),
+                    file=file,
+                    line=line,
+                    language=_LANGUAGES[ext],
+                    symbol=symbol,
+                    is_test=is_test,
+                )
+            )
+        return  # don't recurse into comment text
+
+    for child in node.children:
+        legacy_walk(child, source, ext, project_names, file, refs)
+
+
+def legacy_following_symbol(comment: Node, source: bytes, ext: str) -> tuple[str | None, bool, Node | None]:
+    """Return (name, is_test, node) of the named symbol immediately after this comment, or (None, False, None)."""
+    parent = comment.parent
+    if not parent:
+        return None, False, None
+
+    siblings = parent.children
+    idx = next((i for i, c in enumerate(siblings) if c.id == comment.id), -1)
+    if idx < 0:
+        return None, False, None
+
+    for sibling in siblings[idx + 1 :]:
+        if sibling.type in _COMMENT_TYPES[ext]:
+            continue  # consecutive comments are still "adjacent"
+        if sibling.type in _SYMBOL_TYPES[ext]:
+            name = _symbol_name(sibling, source)
+            return name, legacy_is_test(sibling, siblings, idx + 1, source, ext, name), sibling
+        break
+
+    return None, False, None
+
+
+def legacy_is_test(
+    symbol: Node, siblings: list[Node], symbol_idx: int, source: bytes, ext: str, name: str | None
+) -> bool:
+    if ext == '.py':
+        return bool(name and name.startswith(('test', 'Test')))
+    if ext == '.go':
+        return bool(name and name.startswith('Test'))
+    if ext == '.rs':
+        for sibling in reversed(siblings[:symbol_idx]):
+            if sibling.type == 'attribute_item' and 'test' in _text(sibling, source):
+                return True
+            if sibling.type not in ('line_comment',):
+                break
+    return False
+
+
+def legacy_collect_python_docstrings(
+    root: Node, source: bytes, project_names: set[str], file: Path, refs: list[CodeReference]
+):
+    """Collect tags from Python docstrings (first string literal in a function/class/module body)."""
+    if root.type in ('function_definition', 'class_definition'):
+        body = next((c for c in root.children if c.type == 'block'), None)
+        if body:
+            first = next((c for c in body.children if c.is_named), None)
+            if first and first.type == 'expression_statement':
+                string = next((c for c in first.children if c.type == 'string'), None)
+                if string:
+                    text = _text(string, source)
+                    name = _symbol_name(root, source)
+                    is_test = bool(name and name.startswith(('test', 'Test')))
+                    for m in ANNOTATION_RE.finditer(text):
+                        if m.group('project').lower() in project_names:
+                            refs.append(
+                                CodeReference(
+                                    project=m.group('project').lower(),
+                                    target_id=m.group('id'),
+                                    file=file,
+                                    line=root.start_point[0] + 1,
+                                    language='python',
+                                    symbol=name,
+                                    is_test=is_test,
+                                )
+                            )
+    elif root.type == 'module':
+        first = next((c for c in root.children if c.is_named), None)
+        if first and first.type == 'expression_statement':
+            string = next((c for c in first.children if c.type == 'string'), None)
+            if string:
+                text = _text(string, source)
+                for m in ANNOTATION_RE.finditer(text):
+                    if m.group('project') in project_names:
+                        refs.append(
+                            CodeReference(
+                                project=m.group('project').lower(),
+                                target_id=m.group('id'),
+                                file=file,
+                                line=string.start_point[0] + 1,
+                                language='python',
+                                symbol=None,
+                                is_test=False,
+                            )
+                        )
+
+    for child in root.children:
+        legacy_collect_python_docstrings(child, source, project_names, file, refs)
+
+
+def legacy_extract(root: Node, source: bytes, ext: str, project_names: set[str], file: Path) -> list[CodeReference]:
+    refs: list[CodeReference] = []
+    legacy_walk(root, source, ext, project_names, file, refs)
+    if ext == '.py':
+        legacy_collect_python_docstrings(root, source, project_names, file, refs)
+    return refs
+
+
+# Synthetic sources
+
+
+def python_source(functions: int) -> str:
+    lines = [f'"""Module docstring. speky:{PROJECT}#M001"""', '']
+    for i in range(functions):
+        lines += [
+            f'class Feature{i}:',
+            f'    """speky:{PROJECT}#R{i:04}"""',
+            '',
+            f'    # speky:{PROJECT}#T{i:04}',
+            f'    def test_feature_{i}(self, value):',
+            '        # An unrelated comment',
+            '        if value:',
+            '            return [x * 2 for x in range(value) if x % 3]',
+            f'        return {{"key": {i}, "other": (1, 2, 3)}}',
+            '',
+            f'    def helper_{i}(self):',
+            '        pass',
+            '',
+        ]
+    return '\n'.join(lines)
+
+
+def go_source(functions: int) -> str:
+    lines = ['package bench', '']
+    for i in range(functions):
+        lines += [
+            f'// speky:{PROJECT}#R{i:04}',
+            f'// Implements feature {i}',
+            f'func Feature{i}(values []int) int {{',
+            '\ttotal := 0',
+            '\tfor _, v := range values {',
+            '\t\ttotal += v // not a tag',
+            '\t}',
+            '\treturn total',
+            '}',
+            '',
+        ]
+    return '\n'.join(lines)
+
+
+def rust_source(functions: int) -> str:
+    lines = []
+    for i in range(functions):
+        lines += [
+            '#[test]',
+            f'// speky:{PROJECT}#T{i:04}',
+            f'fn test_feature_{i}() {{',
+            f'    let values: Vec<i32> = (0..{i}).map(|x| x * 2).collect();',
+            '    assert!(values.len() >= 0);',
+            '}',
+            '',
+        ]
+    return '\n'.join(lines)
+
+
+def bash_source(functions: int) -> str:
+    lines = ['#!/bin/bash', '']
+    for i in range(functions):
+        lines += [
+            f'# speky:{PROJECT}#R{i:04}',
+            f'feature_{i}() {{',
+            '    for x in "$@"; do echo "$x" | grep -q foo && return 0; done',
+            '}',
+            '',
+        ]
+    return '\n'.join(lines)
+
+
+GENERATORS = {'.py': python_source, '.go': go_source, '.rs': rust_source, '.sh': bash_source}
+
+
+def generate(folder: Path, files: int, functions: int) -> list[Path]:
+    paths = []
+    for i in range(files):
+        for ext, generator in GENERATORS.items():
+            path = folder / f'source_{i}{ext}'
+            path.write_text(generator(functions))
+            paths.append(path)
+    return paths
+
+
+def measure(extractor, trees) -> tuple[float, list[CodeReference]]:
+    refs = []
+    start = time.perf_counter()
+    for path, source, root in trees:
+        refs.extend(extractor(root, source, path.suffix, {PROJECT}, path))
+    return time.perf_counter() - start, refs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=100, help='Number of files per language')
+    parser.add_argument('--functions', type=int, default=100, help='Number of functions per file')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        paths = generate(Path(folder), args.files, args.functions)
+        trees = []
+        for path in paths:
+            source = path.read_bytes()
+            trees.append((path, source, Parser(LANGUAGES[path.suffix]).parse(source).root_node))
+        print(f'{len(paths)} files, {sum(len(s) for _, s, _ in trees) / 1e6:.1f} MB')
+
+        legacy_time, legacy_refs = measure(legacy_extract, trees)
+        query_time, query_refs = measure(_extract, trees)
+        if legacy_refs != query_refs:
+            sys.exit('The extractors found different references')
+        print(f'{len(query_refs)} references found by both extractors')
+        print(f'Recursive walk: {legacy_time:.3f}s')
+        print(f'Queries:        {query_time:.3f}s ({legacy_time / query_time:.1f}x)')
+
+        # Deeply nested expressions exhaust the Python stack of a recursive walk
+        deep = f'# speky:{PROJECT}#R0000\nvalue = ' + '(' * 2000 + '1' + ')' * 2000 + '\n'
+        source = deep.encode()
+        root = Parser(_PY_LANG).parse(source).root_node
+        try:
+            legacy_extract(root, source, '.py', {PROJECT}, Path('deep.py'))
+            print('Deep file: recursive walk succeeded')
+        except RecursionError:
+            print('Deep file: recursive walk hit the recursion limit')
+        print(f'Deep file: queries found {len(_extract(root, source, ".py", {PROJECT}, Path("deep.py")))} reference(s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+Measure the full-text search index on a large synthetic specification.
+
+Requirements and tests are generated with descriptions drawn from a Zipf-distributed vocabulary,
+then the index is built, and queries of each kind are timed against a scan of every item's text.
+The score of a term in each document is computed by the first query using it, and reused by the next ones.
+
+    uv run python benchmarks/bench_search.py [--items N]
+"""
+
+import argparse
+import random
+import re
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+from speky.search import searchable_fields
+from speky.specification import Specification
+
+QUERIES = {
+    'common word': 'system',
+    'rare words': 'w4000 w4001',
+    'prefix': 'w12*',
+    'phrase': '"shall validate"',
+    'mixed': 'system w100* "shall validate"',
+}
+
+
+def generate(folder: Path, count: int):
+    rng = random.Random(42)
+    vocabulary = ['system', 'shall', 'validate', 'user', 'data'] + [f'w{i}' for i in range(5000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+
+    def sentence(length: int) -> str:
+        return ' '.join(rng.choices(vocabulary, weights, k=length))
+
+    half = count // 2
+    requirements = [
+        {'id': f'R{i:06}', 'short': sentence(4), 'long': sentence(40), 'client_statement': sentence(20)}
+        for i in range(half)
+    ]
+    tests = [
+        {
+            'id': f'T{i:06}',
+            'ref': [f'R{i:06}'],
+            'long': sentence(30),
+            'steps': [{'action': sentence(10), 'expected': sentence(5)} for _ in range(3)],
+        }
+        for i in range(count - half)
+    ]
+    requirement_file = {'kind': 'requirements', 'category': 'functional', 'requirements': requirements}
+    test_file = {'kind': 'tests', 'category': 'functional', 'tests': tests}
+    (folder / 'requirements.yaml').write_text(yaml.safe_dump(requirement_file))
+    (folder / 'tests.yaml').write_text(yaml.safe_dump(test_file))
+
+
+def scan(specs: Specification, query: str) -> int:
+    """What a client does without the index: look for each word of the query in every item."""
+    words = [re.compile(rf'\b{re.escape(word.strip("*"))}', re.IGNORECASE) for word in re.findall(r'[\w*]+', query)]
+    found = 0
+    for item in specs.by_id.values():
+        text = '\n'.join(text for _, text in searchable_fields(item, specs.comments))
+        found += any(word.search(text) for word in words)
+    return found
+
+
+def timed(function, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=50_000, help='Number of requirements and tests')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        generate(Path(folder), args.items)
+        specs = Specification()
+        specs.read_file(Path(folder) / 'requirements.yaml')
+        specs.read_file(Path(folder) / 'tests.yaml')
+        specs.check_references()
+
+    start = time.perf_counter()
+    index = specs.search_index()
+    print(f'{len(index.items)} items, {len(index.terms)} terms, index built in {time.perf_counter() - start:.2f}s')
+
+    for name, query in QUERIES.items():
+        first = timed(lambda query=query: index.search(query), repeat=1)
+        again = timed(lambda query=query: index.search(query))
+        scanned = timed(lambda query=query: scan(specs, query), repeat=1)
+        print(
+            f'{name:12} {query!r:32} index: {first * 1000:6.2f}ms first, {again * 1000:6.2f}ms again'
+            f'  scan: {scanned * 1000:5.0f}ms'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""
+Measure the coverage summary on a large synthetic specification.
+
+Requirements are generated with random tags, some of them in tag groups, spread over manifests and categories,
+and covered by tests a part of which are automated.
+The summary is timed, building its bitsets then counting each group, against counting the same statistics by
+looking up the status of every requirement of every group.
+
+    uv run python benchmarks/bench_summary.py [--requirements N]
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from speky.coverage import STATUSES, CoverageStats
+from speky.models import Manifest, NullSourceLinks, Requirement, Test
+from speky.specification import Specification
+
+CATEGORIES = ('functional', 'non-functional', 'security')
+TAGS = [f'tag{t}' for t in range(150)] + [f'group{g}:tag{t}' for g in range(10) for t in range(5)]
+
+
+def generate(count: int) -> Specification:
+    rng = random.Random(42)
+    specs = Specification()
+    specs.manifests = [
+        Manifest(f'project{m}', Path(), Path('speky.toml'), [], NullSourceLinks(), None, list(CATEGORIES))
+        for m in range(10)
+    ]
+    for i in range(count):
+        data = {'id': f'R{i:06}', 'long': 'Requirement', 'tags': rng.sample(TAGS, 3)}
+        requirement = Requirement(data, 'generated.yaml', specs.manifests[i % len(specs.manifests)])
+        specs.load_requirement(requirement, CATEGORIES[i % len(CATEGORIES)])
+        for t in range(rng.randrange(3)):
+            test_id = f'T{i:06}_{t}'
+            specs.load_test(Test({'id': test_id, 'long': 'Test', 'ref': [requirement.id], 'steps': []}, 'x'), 'tests')
+            if rng.random() < 0.6:
+                specs.coverage.add_automation(test_id)
+    return specs
+
+
+def lookups(specs: Specification) -> list[CoverageStats]:
+    """The same statistics, counted one requirement at a time."""
+    groups: dict[tuple[str, str], Counter] = {}
+    for category in specs.requirements.values():
+        for requirement in category:
+            status = STATUSES[specs.coverage.status(requirement.id)]
+            keys = {('category', requirement.category), ('manifest', requirement.manifest.name)}
+            for tag in requirement.tags:
+                keys.add(('tag', tag))
+                if ':' in tag:
+                    keys.add(('tag_group', tag.split(':', 1)[0]))
+            for key in keys:
+                groups.setdefault(key, Counter())[status] += 1
+    return [
+        CoverageStats(*key, sum(counts.values()), *(counts[status] for status in STATUSES))
+        for key, counts in sorted(groups.items())
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requirements', type=int, default=50_000, help='Number of requirements')
+    args = parser.parse_args()
+
+    specs = generate(args.requirements)
+
+    start = time.perf_counter()
+    summary = specs.coverage_summary()
+    built = time.perf_counter()
+    stats = summary.stats()
+    counted = time.perf_counter()
+    expected = lookups(specs)
+    looked_up = time.perf_counter()
+
+    if stats != expected:
+        sys.exit('The summary and the lookups gave different statistics')
+    print(
+        f'{args.requirements} requirements, {len(stats)} groups'
+        f'  summary: {(built - start) * 1000:.0f}ms to build, {(counted - built) * 1000:.1f}ms to count'
+        f'  lookups: {(looked_up - counted) * 1000:.0f}ms'
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Compare the pure-Python YAML loader with the libyaml one used by Specification.read_file.
+
+The requirements and tests of the repository's own specs/ are copied under new IDs
+until the requested number of items is reached, then the resulting documents are parsed by both loaders.
+
+    uv run python benchmarks/bench_yaml.py [--items N]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import yaml
+
+SPECS_DIR = Path(__file__).parent.parent / 'specs'
+
+
+def inflate(count: int) -> list[str]:
+    """Return YAML documents holding about count requirements and tests, copied from specs/."""
+    documents = []
+    for path in sorted(SPECS_DIR.rglob('*.yaml')):
+        data = yaml.safe_load(path.read_text(encoding='utf8'))
+        if isinstance(data, dict) and data.get('kind') in ('requirements', 'tests'):
+            documents.append(data)
+    items = sum(len(document[document['kind']]) for document in documents)
+    if not items:
+        sys.exit(f'No requirement nor test found in {SPECS_DIR}')
+
+    result = []
+    for copy in range(-(-count // items)):
+        for document in documents:
+            inflated = dict(document)
+            inflated[document['kind']] = [dict(item, id=f'{item["id"]}_{copy}') for item in document[document['kind']]]
+            result.append(yaml.safe_dump(inflated, sort_keys=False, allow_unicode=True))
+    return result
+
+
+def measure(loader, documents: list[str]) -> tuple[float, list]:
+    start = time.perf_counter()
+    data = [yaml.load(document, Loader=loader) for document in documents]
+    return time.perf_counter() - start, data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=10_000, help='Number of requirements and tests to parse')
+    args = parser.parse_args()
+
+    if not yaml.__with_libyaml__:
+        sys.exit('PyYAML was built without libyaml, CSafeLoader is not available')
+
+    documents = inflate(args.items)
+    print(f'{len(documents)} documents, {sum(map(len, documents)) / 1e6:.1f} MB')
+
+    python_time, python_data = measure(yaml.SafeLoader, documents)
+    c_time, c_data = measure(yaml.CSafeLoader, documents)
+    if python_data != c_data:
+        sys.exit('The loaders returned different data')
+    print(f'SafeLoader:  {python_time:.3f}s')
+    print(f'CSafeLoader: {c_time:.3f}s ({python_time / c_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
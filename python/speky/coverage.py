@@ -0,0 +1,177 @@
+"""
+Test coverage of the requirements of a specification, kept up to date as items and code references change.
+
+A test is automated when at least one code reference to it is flagged as a test function.
+Each requirement has two counters: how many tests cover it, and how many of them are automated.
+Loading or unloading a test updates the counters of the requirements it refers to,
+and the first or last automating reference to a test updates those of all the requirements it covers.
+
+The summary aggregates these statuses by tag, tag group, category and manifest.
+Requirements are numbered in the order of their IDs, and each status and each group is a set of requirements
+stored as the bits of an integer, so that counting the requirements of a group in a status is a single AND.
+"""
+
+import csv
+import json
+from collections import defaultdict
+from functools import partial
+from operator import attrgetter
+from pathlib import Path
+from typing import NamedTuple
+
+# Coverage status of a requirement, in the order of the buckets of Manifest.coverage
+STATUSES = ('automated', 'partial', 'manual', 'no_plan')
+AUTOMATED, PARTIAL, MANUAL, NO_PLAN = range(len(STATUSES))
+# How requirements are grouped in the summary
+DIMENSIONS = ('tag', 'tag_group', 'category', 'manifest')
+
+
+class CoverageEngine:
+    """
+    speky:speky#SF019
+
+    Per-requirement counts of tests and automated tests.
+    """
+
+    def __init__(self):
+        # Number of code references flagged as test functions, by test ID
+        self.automations: dict[str, int] = {}
+        # The requirements covered by each loaded test, by test ID, with one list per test of that ID
+        self.covered: dict[str, list[list[str]]] = {}
+        # [tests, automated tests] by requirement ID
+        self.counters: dict[str, list[int]] = {}
+
+    def is_automated(self, test_id: str) -> bool:
+        return test_id in self.automations
+
+    def counts(self, requirement_id: str) -> tuple[int, int]:
+        """The number of tests of a requirement, and how many of them are automated."""
+        total, automated = self.counters.get(requirement_id, (0, 0))
+        return total, automated
+
+    def status(self, requirement_id: str) -> int:
+        """The coverage bucket of a requirement, as an index in STATUSES."""
+        total, automated = self.counts(requirement_id)
+        if not total:
+            return NO_PLAN
+        if automated == total:
+            return AUTOMATED
+        return MANUAL if automated == 0 else PARTIAL
+
+    def add_test(self, test_id: str, requirement_ids: list[str]):
+        self.covered.setdefault(test_id, []).append(requirement_ids)
+        self._count(requirement_ids, 1, self.is_automated(test_id))
+
+    def remove_test(self, test_id: str, requirement_ids: list[str]):
+        covered = self.covered.get(test_id, [])
+        if requirement_ids not in covered:
+            return
+        covered.remove(requirement_ids)
+        if not covered:
+            del self.covered[test_id]
+        self._count(requirement_ids, -1, self.is_automated(test_id))
+
+    def add_automation(self, test_id: str):
+        """Count a code reference flagged as a test function."""
+        self.automations[test_id] = self.automations.get(test_id, 0) + 1
+        if self.automations[test_id] == 1:
+            self._automate(test_id, 1)
+
+    def remove_automation(self, test_id: str):
+        remaining = self.automations.get(test_id, 0) - 1
+        if remaining > 0:
+            self.automations[test_id] = remaining
+        elif remaining == 0:
+            self._automate(test_id, -1)
+            del self.automations[test_id]
+
+    def _automate(self, test_id: str, delta: int):
+        for requirement_ids in self.covered.get(test_id, []):
+            for requirement_id in requirement_ids:
+                self.counters[requirement_id][1] += delta
+
+    def _count(self, requirement_ids: list[str], delta: int, automated: bool):
+        for requirement_id in requirement_ids:
+            counters = self.counters.setdefault(requirement_id, [0, 0])
+            counters[0] += delta
+            counters[1] += delta * automated
+            if not counters[0]:
+                del self.counters[requirement_id]
+
+
+class CoverageStats(NamedTuple):
+    dimension: str
+    name: str
+    requirements: int
+    automated: int
+    partial: int
+    manual: int
+    no_plan: int
+
+
+class CoverageSummary:
+    """
+    speky:speky#SF020
+
+    Coverage statistics of the requirements of a specification, as of one of its generations.
+    """
+
+    def __init__(self, specs):
+        self.generation = specs.generation
+        requirements = sorted((r for category in specs.requirements.values() for r in category), key=attrgetter('id'))
+        size = len(requirements) // 8 + 1
+        statuses = [bytearray(size) for _ in STATUSES]
+        groups: dict[tuple[str, str], bytearray] = defaultdict(partial(bytearray, size))
+        status = specs.coverage.status
+
+        for number, requirement in enumerate(requirements):
+            byte, bit = number >> 3, 1 << (number & 7)
+            statuses[status(requirement.id)][byte] |= bit
+            groups['category', requirement.category][byte] |= bit
+            if requirement.manifest is not None:
+                groups['manifest', requirement.manifest.name][byte] |= bit
+            for tag in requirement.tags or []:
+                groups['tag', tag][byte] |= bit
+                if ':' in tag:
+                    groups['tag_group', tag.split(':', 1)[0]][byte] |= bit
+
+        self.statuses = [int.from_bytes(bits, 'little') for bits in statuses]
+        self.groups = {key: int.from_bytes(bits, 'little') for key, bits in sorted(groups.items())}
+
+    def stats(self, dimension: str | None = None) -> list[CoverageStats]:
+        """
+        The number of requirements of each group in each coverage status.
+
+        Args:
+            dimension: One of DIMENSIONS, to only return groups of that kind
+
+        Returns:
+            The statistics of each group, by dimension then name
+        """
+        return [
+            CoverageStats(kind, name, members.bit_count(), *((members & bits).bit_count() for bits in self.statuses))
+            for (kind, name), members in self.groups.items()
+            if dimension is None or kind == dimension
+        ]
+
+
+def save_summary(summary: CoverageSummary, path: Path):
+    """
+    speky:speky#SF020
+
+    Write the coverage statistics to a JSON or CSV file, depending on its extension.
+
+    Raises:
+        RuntimeError: If the extension is neither .json nor .csv
+    """
+    rows = [stats._asdict() for stats in summary.stats()]
+    if path.suffix == '.json':
+        path.write_text(json.dumps(rows, indent=2) + '\n')
+    elif path.suffix == '.csv':
+        with path.open('w', encoding='utf8', newline='') as f:
+            writer = csv.DictWriter(f, CoverageStats._fields)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        message = f'Cannot write the coverage summary to "{path}": the extension must be .json or .csv'
+        raise RuntimeError(message)
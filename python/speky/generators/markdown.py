@@ -3,11 +3,17 @@ speky:speky#SF003
 """
 
 import importlib.resources
+import logging
 import os
 import shutil
-from typing import TextIO
+import threading
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import partial
 
 assets = importlib.resources.files(__package__).parent.joinpath('assets')
+logger = logging.getLogger(__name__)
 
 
 class Markdown:
@@ -25,14 +31,23 @@ class Markdown:
 
 
 class MarkdownWriter:
-    def __init__(self, output: TextIO):
-        self.output = output
+    """
+    Accumulate the fragments of a document, to be joined once it is complete.
+
+    Environments opened from a writer append to the same list of fragments.
+    """
+
+    def __init__(self, parts: list[str] | None = None):
+        self.parts = [] if parts is None else parts
+
+    def getvalue(self) -> str:
+        return ''.join(self.parts)
 
     def write(self, string: str):
-        self.output.write(string)
+        self.parts.append(string)
 
     def write_line(self, line: str):
-        self.write(f'{line}\n')
+        self.parts += (line, '\n')
 
     def empty_line(self):
         self.write_line('')
@@ -54,7 +69,7 @@ class MystEnvironment(MarkdownWriter):
     braces = True
 
     def __init__(self, output: MarkdownWriter, title: str | None = None, height: int = 0):
-        super().__init__(output)
+        super().__init__(output.parts)
         self.height = height
         self.args = {}
         self.title = title
@@ -202,9 +217,87 @@ _BUCKET_LABELS = ['Automated', 'Partially Manual', 'Manual', 'No Test Plan']
 _BUCKET_ICONS = ['check-circle-fill', 'gear', 'pencil', 'x-circle-fill']
 
 
-def coverage_to_myst(specs, folder_name: str):
-    with open(os.path.join(folder_name, 'coverage.md'), encoding='utf8', mode='w') as f:
-        output = MystWriter(f)
+class OutputFolder:
+    """
+    The folder where pages are generated.
+
+    Pages are rendered in memory, and only written when their content differs from the file on disk,
+    so that the modification time of unchanged pages is preserved.
+    """
+
+    # Sub-folders where every page is generated, so that other pages can be removed
+    generated_folders = ('requirements', 'tests')
+
+    def __init__(self, path: str, jobs: int = 1):
+        self.path = path
+        self.jobs = jobs
+        self.pages: set[str] = set()
+        self.written = 0
+        self.unchanged = 0
+        self.removed = 0
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def page(self, *parts: str) -> Iterator[MystWriter]:
+        """Render a page, given its path relative to the output folder."""
+        output = MystWriter()
+        yield output
+        self.save(os.path.join(self.path, *parts), output.getvalue().encode('utf8'))
+
+    def render_all(self, pages: list[tuple[tuple[str, ...], Callable[[MystWriter], None]]]):
+        """
+        Render many pages, given their path relative to the output folder and a function writing their content.
+
+        With more than one job, pages are rendered and written by a pool of threads:
+        the content of each page does not depend on the others, and file system latency dominates.
+        """
+
+        def render(page):
+            parts, function = page
+            with self.page(*parts) as output:
+                function(output)
+
+        if self.jobs <= 1:
+            for page in pages:
+                render(page)
+            return
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            for _ in executor.map(render, pages):
+                pass  # Propagate exceptions
+
+    def save(self, path: str, content: bytes):
+        with self.lock:
+            self.pages.add(path)
+        unchanged = False
+        try:
+            if os.path.getsize(path) == len(content):
+                with open(path, mode='rb') as f:
+                    unchanged = f.read() == content
+        except FileNotFoundError:
+            pass
+        if not unchanged:
+            with open(path, mode='wb') as f:
+                f.write(content)
+        with self.lock:
+            if unchanged:
+                self.unchanged += 1
+            else:
+                self.written += 1
+
+    def remove_stale_pages(self, *optional_pages: str):
+        """Remove the pages that were not generated this time: former IDs, categories and optional pages."""
+        candidates = [os.path.join(self.path, page) for page in optional_pages]
+        for folder in self.generated_folders:
+            with os.scandir(os.path.join(self.path, folder)) as entries:
+                candidates += [entry.path for entry in entries if entry.is_file() and entry.name.endswith('.md')]
+        for path in candidates:
+            if path not in self.pages and os.path.isfile(path):
+                os.remove(path)
+                self.removed += 1
+
+
+def coverage_to_myst(specs, folder: OutputFolder):
+    with folder.page('coverage.md') as output:
         output.heading('Test Coverage', 0)
         for manifest in specs.manifests:
             if not manifest.coverage:
@@ -224,16 +317,16 @@ def coverage_to_myst(specs, folder_name: str):
             output.empty_line()
 
 
-def specification_to_myst(self, folder_name: str, sort: bool):
+def specification_to_myst(self, folder_name: str, sort: bool, jobs: int = 1):
     os.makedirs(os.path.join(folder_name, 'requirements'), exist_ok=True)
     os.makedirs(os.path.join(folder_name, 'tests'), exist_ok=True)
     css_dir = os.path.join(folder_name, 'css')
     os.makedirs(css_dir, exist_ok=True)
     with importlib.resources.as_file(assets.joinpath('speky.css')) as css_path:
         shutil.copy2(css_path, os.path.join(css_dir, 'speky.css'))
+    folder = OutputFolder(folder_name, jobs)
     has_coverage = any(m.coverage for m in self.manifests)
-    with open(os.path.join(folder_name, 'index.md'), encoding='utf8', mode='w') as f:
-        output = MystWriter(f)
+    with folder.page('index.md') as output:
         output.heading('{{project}} Specification', 0)
         with output.table_of_content(max_depth=3) as toc:
             toc.write_line('requirements/index')
@@ -242,48 +335,46 @@ def specification_to_myst(self, folder_name: str, sort: bool):
             if has_coverage:
                 toc.write_line('coverage')
     if has_coverage:
-        coverage_to_myst(self, folder_name)
-    with open(os.path.join(folder_name, 'requirements', 'index.md'), encoding='utf8', mode='w') as f:
-        output = MystWriter(f)
+        coverage_to_myst(self, folder)
+    with folder.page('requirements', 'index.md') as output:
         output.heading('Requirements', 0)
         with output.table_of_content(max_depth=2) as toc:
             for category in sorted(self.requirements.keys()):
                 toc.write_line(category)
-    with open(os.path.join(folder_name, 'tests', 'index.md'), encoding='utf8', mode='w') as f:
-        output = MystWriter(f)
+    with folder.page('tests', 'index.md') as output:
         output.heading('Tests', 0)
         with output.table_of_content(max_depth=2) as toc:
             for category in sorted(self.tests.keys()):
                 toc.write_line(category)
 
     for category, requirements in self.requirements.items():
-        with open(os.path.join(folder_name, 'requirements', f'{category}.md'), encoding='utf8', mode='w') as f:
-            output = MystWriter(f)
+        with folder.page('requirements', f'{category}.md') as output:
             output.heading(category.title(), 0)
             with output.table_of_content(max_depth=1) as toc:
                 for requirement in sorted(requirements) if sort else requirements:
                     toc.write_line(requirement.id)
-
-        for requirement in requirements:
-            with open(
-                os.path.join(folder_name, 'requirements', f'{requirement.id}.md'),
-                encoding='utf8',
-                mode='w',
-            ) as f:
-                requirement_to_myst(requirement, MystWriter(f), self)
+    folder.render_all(
+        [
+            (('requirements', f'{requirement.id}.md'), partial(requirement_to_myst, requirement, specs=self))
+            for requirements in self.requirements.values()
+            for requirement in requirements
+        ]
+    )
 
     for category, tests in self.tests.items():
-        with open(os.path.join(folder_name, 'tests', f'{category}.md'), encoding='utf8', mode='w') as f:
-            output = MystWriter(f)
+        with folder.page('tests', f'{category}.md') as output:
             output.heading(category.title(), 0)
             with output.table_of_content(max_depth=1) as toc:
                 for test in sorted(tests):
                     toc.write_line(test.id)
-        for test in tests:
-            with open(os.path.join(folder_name, 'tests', f'{test.id}.md'), encoding='utf8', mode='w') as f:
-                test_to_myst(test, MystWriter(f), self)
-    with open(os.path.join(folder_name, 'by_tag.md'), encoding='utf8', mode='w') as f:
-        output = MystWriter(f)
+    folder.render_all(
+        [
+            (('tests', f'{test.id}.md'), partial(test_to_myst, test, specs=self))
+            for tests in self.tests.values()
+            for test in tests
+        ]
+    )
+    with folder.page('by_tag.md') as output:
         output.heading('Tags', 0)
         last = None
         for tag, requirements in sorted(self.tags.items()):
@@ -298,6 +389,8 @@ def specification_to_myst(self, folder_name: str, sort: bool):
                 output.heading(tag.title(), 1)
                 last = tag
             write_list_of_links(output, requirements)
+    folder.remove_stale_pages('coverage.md')
+    logger.info('Pages: %d written, %d unchanged, %d removed', folder.written, folder.unchanged, folder.removed)
 
 
 def link_to(item) -> str:
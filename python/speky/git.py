@@ -0,0 +1,231 @@
+"""
+Metadata of the git repositories that manifests are in, read once per repository.
+
+The repository of a directory is found by looking for `.git` in it and its parents,
+and its branch and remote URL are read from the files of the repository: HEAD, the loose and packed refs, and config.
+A `.git` file points to the repository of a worktree, whose refs and config are in the common directory.
+Whenever these files use something this module does not read, like includes or URL rewrites,
+the value is asked to the git command instead, so that the result is always the same as git's.
+"""
+
+import os
+import re
+import subprocess
+from pathlib import Path
+from typing import NamedTuple
+
+# Environment variables that change where git finds repositories or configuration
+_GIT_ENVIRONMENT = (
+    'GIT_DIR',
+    'GIT_WORK_TREE',
+    'GIT_COMMON_DIR',
+    'GIT_CONFIG',
+    'GIT_CONFIG_COUNT',
+    'GIT_CONFIG_GLOBAL',
+    'GIT_CONFIG_PARAMETERS',
+    'GIT_CONFIG_SYSTEM',
+)
+# Configuration that changes the values read here, in ways that only git resolves
+_UNREAD_NAMES = ('insteadof', 'pushinsteadof', 'worktreeconfig')
+_SECTION = re.compile(r'\[\s*([\w.-]+)(?:\s+"((?:[^"\\]|\\.)*)")?\s*\]')
+
+
+class GitError(RuntimeError):
+    """A git metadata that could not be resolved, with the reason given by git."""
+
+
+class _Repository(NamedTuple):
+    root: Path  # The working tree
+    git_dir: Path  # Where HEAD is
+    common_dir: Path  # Where the refs and config are, shared by all the worktrees of a repository
+
+
+class GitResolver:
+    """
+    speky:speky#SN007
+
+    The top-level directory, branch and remote URL of repositories, resolved once per repository.
+    """
+
+    def __init__(self):
+        self.repositories: dict[Path, _Repository | None] = {}  # By directory
+        self.values: dict[tuple[Path, str], tuple[bool, str]] = {}  # (success, value or error) by repository
+        self.subprocesses = 0  # How many times git had to be run
+        self._configs: dict[Path, dict | None] = {}
+        self._overridden: bool | None = None
+
+    def toplevel(self, cwd: Path) -> Path:
+        """
+        The root of the working tree that a directory is in.
+
+        Raises:
+            GitError: If the directory is not in a git repository
+        """
+        return Path(self._resolve(cwd, 'toplevel', self._read_toplevel, ['rev-parse', '--show-toplevel']))
+
+    def branch(self, cwd: Path) -> str:
+        """
+        The name of the current branch, or HEAD when detached.
+
+        Raises:
+            GitError: If the directory is not in a git repository, or it has no commit yet
+        """
+        return self._resolve(cwd, 'branch', self._read_branch, ['rev-parse', '--abbrev-ref', 'HEAD'])
+
+    def remote_url(self, cwd: Path, remote: str = 'origin') -> str:
+        """
+        The URL of a remote, as configured.
+
+        Raises:
+            GitError: If the directory is not in a git repository, or the remote does not exist
+        """
+        return self._resolve(
+            cwd,
+            f'remote.{remote}',
+            lambda repository: self._read_remote_url(repository, remote),
+            ['remote', 'get-url', remote],
+        )
+
+    def _resolve(self, cwd: Path, name: str, read, arguments: list[str]) -> str:
+        repository = self._find(cwd)
+        key = (repository.git_dir if repository else cwd.resolve(), name)
+        if key not in self.values:
+            value = read(repository) if repository and not self._environment_overridden() else None
+            if value is not None:
+                self.values[key] = (True, value)
+            else:
+                self.subprocesses += 1
+                result = subprocess.run(['git', *arguments], cwd=cwd, capture_output=True, text=True)
+                if result.returncode == 0:
+                    self.values[key] = (True, result.stdout.strip())
+                else:
+                    self.values[key] = (False, result.stderr.strip())
+        success, value = self.values[key]
+        if not success:
+            raise GitError(value)
+        return value
+
+    def _find(self, cwd: Path) -> _Repository | None:
+        directory = cwd.resolve()
+        if directory not in self.repositories:
+            self.repositories[directory] = None
+            for candidate in (directory, *directory.parents):
+                if candidate in self.repositories and candidate != directory:
+                    self.repositories[directory] = self.repositories[candidate]
+                    break
+                dot_git = candidate / '.git'
+                git_dir = _git_dir(dot_git)
+                if git_dir is not None:
+                    common_dir = git_dir
+                    if (git_dir / 'commondir').is_file():
+                        common_dir = (git_dir / (git_dir / 'commondir').read_text().strip()).resolve()
+                    self.repositories[directory] = _Repository(candidate, git_dir, common_dir)
+                    break
+        return self.repositories[directory]
+
+    def _read_toplevel(self, repository: _Repository) -> str | None:
+        config = self._config(repository)
+        if config is None or 'worktree' in config.get(('core', None), {}):
+            return None
+        if config.get(('core', None), {}).get('bare', ['false'])[0].lower() in ('', 'true', 'yes', 'on', '1'):
+            return None
+        return str(repository.root)
+
+    def _read_branch(self, repository: _Repository) -> str | None:
+        try:
+            head = (repository.git_dir / 'HEAD').read_text().strip()
+        except OSError:
+            return None
+        if re.fullmatch(r'[0-9a-f]{40}|[0-9a-f]{64}', head):
+            return 'HEAD'  # Detached
+        ref = head.removeprefix('ref: ')
+        if ref == head or not ref.startswith('refs/heads/'):
+            return None
+        if (repository.common_dir / ref).is_file() or ref in _packed_refs(repository.common_dir):
+            return ref.removeprefix('refs/heads/')
+        return None  # No commit on the branch yet: let git report it
+
+    def _read_remote_url(self, repository: _Repository, remote: str) -> str | None:
+        config = self._config(repository)
+        if config is None:
+            return None
+        urls = config.get(('remote', remote), {}).get('url')
+        return urls[0] if urls else None
+
+    def _config(self, repository: _Repository) -> dict | None:
+        if repository.common_dir not in self._configs:
+            self._configs[repository.common_dir] = _read_config(repository.common_dir / 'config')
+        return self._configs[repository.common_dir]
+
+    def _environment_overridden(self) -> bool:
+        """True if git would be configured by more than the files of the repository, in a way that matters here."""
+        if self._overridden is None:
+            self._overridden = any(variable in os.environ for variable in _GIT_ENVIRONMENT) or any(
+                _rewrites_urls(path) for path in _global_configs()
+            )
+        return self._overridden
+
+
+def _git_dir(dot_git: Path) -> Path | None:
+    """The git directory that a .git directory or file designates, if any."""
+    if dot_git.is_dir():
+        return dot_git if (dot_git / 'HEAD').is_file() else None
+    if dot_git.is_file():
+        content = dot_git.read_text().strip()
+        if content.startswith('gitdir:'):
+            return (dot_git.parent / content.removeprefix('gitdir:').strip()).resolve()
+    return None
+
+
+def _packed_refs(common_dir: Path) -> set[str]:
+    try:
+        lines = (common_dir / 'packed-refs').read_text().splitlines()
+    except OSError:
+        return set()
+    return {line.split(' ', 1)[1] for line in lines if line and line[0] not in '#^' and ' ' in line}
+
+
+def _read_config(path: Path) -> dict[tuple[str, str | None], dict[str, list[str]]] | None:
+    """
+    The values of a git config file, by section and subsection then by name.
+
+    Returns:
+        None if the file uses includes, URL rewrites, or a syntax this parser does not read
+    """
+    try:
+        lines = path.read_text().splitlines()
+    except OSError:
+        return None
+    config: dict[tuple[str, str | None], dict[str, list[str]]] = {}
+    section = None
+    for line in lines:
+        line = line.strip()
+        if not line or line[0] in '#;':
+            continue
+        if line.startswith('['):
+            match = _SECTION.match(line)
+            if match is None or '\\' in line or match.group(1).lower() in ('include', 'includeif'):
+                return None
+            section = config.setdefault((match.group(1).lower(), match.group(2)), {})
+            continue
+        name, _, value = line.partition('=')
+        name, value = name.strip().lower(), value.strip()
+        if section is None or name in _UNREAD_NAMES or any(c in value for c in '"\\;#'):
+            return None
+        section.setdefault(name, []).append(value)
+    return config
+
+
+def _global_configs() -> list[Path]:
+    home = Path.home()
+    xdg = Path(os.environ.get('XDG_CONFIG_HOME') or home / '.config')
+    return [home / '.gitconfig', xdg / 'git' / 'config', Path('/etc/gitconfig')]
+
+
+def _rewrites_urls(path: Path) -> bool:
+    """True if a config file may change the URLs of remotes, directly or through the files it includes."""
+    try:
+        text = path.read_text().lower()
+    except OSError:
+        return False
+    return 'insteadof' in text or '[include' in text
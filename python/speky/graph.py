@@ -0,0 +1,96 @@
+"""
+Traceability graph of a specification, to find everything affected by a change.
+
+An edge goes from an item to each item that depends on it:
+the requirements that refer to it, the tests that cover it, and the tests that need it as a prerequisite.
+Nodes are numbered in the order of their IDs, and edges stored in compressed sparse rows:
+the edges of node n are the entries offsets[n] to offsets[n + 1] of targets and relations.
+"""
+
+from array import array
+from typing import NamedTuple
+
+# Why an item depends on another one
+RELATIONS = ('ref', 'test', 'prereq')
+REF, TEST, PREREQ = range(len(RELATIONS))
+
+
+class Impact(NamedTuple):
+    item_id: str
+    depth: int
+    via: str
+    relation: str
+
+
+class TraceabilityGraph:
+    """
+    speky:speky_mcp#MCP023
+
+    The dependencies between the requirements and tests of a specification, as of one of its generations.
+    """
+
+    def __init__(self, specs):
+        self.generation = specs.generation
+        self.ids = sorted(specs.by_id)
+        self.index = {item_id: number for number, item_id in enumerate(self.ids)}
+
+        edges: list[list[tuple[int, int]]] = [[] for _ in self.ids]
+        self._add_edges(edges, specs.references, REF)
+        self._add_edges(edges, specs.testers_of, TEST)
+        for tests in specs.tests.values():
+            for test in tests:
+                for prereq in test.prereq or []:
+                    if prereq in self.index:
+                        edges[self.index[prereq]].append((self.index[test.id], PREREQ))
+
+        self.offsets = array('I', [0])
+        self.targets = array('I')
+        self.relations = array('B')
+        for node_edges in edges:
+            for target, relation in sorted(set(node_edges)):
+                self.targets.append(target)
+                self.relations.append(relation)
+            self.offsets.append(len(self.targets))
+
+    def _add_edges(self, edges: list[list[tuple[int, int]]], dependents: dict[str, list], relation: int):
+        for item_id, items in dependents.items():
+            source = self.index.get(item_id)
+            if source is None:
+                continue  # Dangling references are reported by check_references
+            edges[source].extend((self.index[item.id], relation) for item in items if item.id in self.index)
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def impact_of(self, item_id: str, max_depth: int | None = None) -> list[Impact]:
+        """
+        Breadth-first search of the items that depend on an item, directly or not.
+
+        Args:
+            item_id: The requirement or test that changes
+            max_depth: How many dependencies to follow at most, all of them when None
+
+        Returns:
+            Each item reached, at its shortest distance, with the item it was reached from, by distance then ID
+        """
+        offsets, targets, relations = self.offsets, self.targets, self.relations
+        start = self.index[item_id]
+        seen = bytearray(len(self.ids))
+        seen[start] = 1
+        frontier = [start]
+        found = []
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            reached = []
+            for node in frontier:
+                for edge in range(offsets[node], offsets[node + 1]):
+                    target = targets[edge]
+                    if not seen[target]:
+                        seen[target] = 1
+                        reached.append(target)
+                        found.append((depth, target, node, relations[edge]))
+            frontier = reached
+        found.sort()
+        ids = self.ids
+        return [Impact(ids[target], depth, ids[node], RELATIONS[relation]) for depth, target, node, relation in found]
@@ -0,0 +1,344 @@
+"""
+Items that read their heavy fields from their source file on first access.
+
+In lazy mode, only the fields used to index, search and list items are kept in memory:
+the long descriptions, client statements, properties, initial conditions, steps and comment texts
+are forgotten after validation, and read again from the file when asked for.
+
+For YAML files, the position of each item is recorded at load time, so that only the item is parsed again.
+Other files are parsed again entirely, once for all their items as long as they do not change.
+"""
+
+import logging
+import threading
+import tomllib
+from collections import OrderedDict
+from pathlib import Path
+from typing import NamedTuple
+
+import yaml
+from yaml.composer import Composer, ComposerError
+from yaml.events import (
+    AliasEvent,
+    DocumentStartEvent,
+    MappingEndEvent,
+    MappingStartEvent,
+    SequenceEndEvent,
+    SequenceStartEvent,
+    StreamEndEvent,
+)
+
+from .models import Comment, Requirement, Test
+from .utils import YamlLoader, load_yaml
+
+logger = logging.getLogger(__name__)
+
+# Where the items of a file are listed, depending on its kind
+SECTIONS = ('requirements', 'tests', 'comments')
+# How many files parsed entirely to keep, with their items indexed by key
+CACHED_DOCUMENTS = 8
+
+_documents: OrderedDict[tuple[Path, int], dict] = OrderedDict()
+_documents_lock = threading.Lock()
+
+
+class Locator(NamedTuple):
+    """Where to find an item in its source file."""
+
+    path: Path
+    mtime_ns: int
+    section: str
+    position: int
+    span: tuple[int, int, int] | None  # Start and end byte offsets of the item in a YAML file, and its column
+
+
+def parse_yaml_with_spans(path: Path) -> tuple[object, dict[str, list[tuple[int, int, int] | None]]]:
+    """
+    Parse a YAML file, and locate each item of its top-level sections.
+
+    The file is read as a stream, and the items of the sections are composed and constructed one at a time,
+    so that neither the whole text nor the nodes of the whole document are kept while parsing.
+
+    Returns:
+        The parsed document, and for each section the span of its items, as expected by Locator
+    """
+    with open(path, encoding='utf8', newline='') as f:  # Keep line breaks as they are, for offsets to match bytes
+        offsets = _ByteOffsets(f)
+        loader = _StreamLoader(offsets)
+        try:
+            parsed = _parse_sections(loader, offsets)
+        finally:
+            loader.dispose()
+    if parsed is None:
+        # Empty, or not a mapping of plain keys: its items are not located, and are read from the whole file
+        with open(path, encoding='utf8') as f:
+            return load_yaml(f), {}
+    return parsed
+
+
+class _StreamLoader(YamlLoader, Composer):
+    """The YAML loader, that composes nodes from its events one at a time instead of a whole document."""
+
+    def __init__(self, stream):
+        super().__init__(stream)
+        self.anchors = {}
+
+
+def _parse_sections(loader: _StreamLoader, offsets: '_ByteOffsets') -> tuple[dict, dict] | None:
+    """The document and the spans of its items, or None if the document is not a mapping of plain keys."""
+    loader.get_event()  # Stream start
+    if not loader.check_event(DocumentStartEvent):
+        return None
+    document = loader.get_event()
+    event = loader.peek_event()
+    if not isinstance(event, MappingStartEvent) or event.anchor is not None or event.tag not in (None, '!'):
+        return None
+    loader.get_event()
+    data = {}
+    spans = {}
+    while not loader.check_event(MappingEndEvent):
+        key = loader.compose_node(None, None)
+        if not isinstance(key, yaml.ScalarNode) or key.tag != 'tag:yaml.org,2002:str':
+            return None
+        event = loader.peek_event()
+        if key.value in SECTIONS and isinstance(event, SequenceStartEvent) and event.anchor is None:
+            loader.get_event()
+            data[key.value] = []
+            spans[key.value] = []
+            while not loader.check_event(SequenceEndEvent):
+                alias = loader.check_event(AliasEvent)  # Its span would be the one of the item it repeats
+                item = loader.compose_node(None, None)
+                start, end = item.start_mark, item.end_mark
+                span = None if alias else (offsets.of(start.index), offsets.of(end.index), start.column)
+                spans[key.value].append(span)
+                data[key.value].append(loader.construct_document(item))
+            loader.get_event()
+        else:
+            data[key.value] = loader.construct_document(loader.compose_node(None, None))
+    loader.get_event()  # Mapping end
+    loader.get_event()  # Document end
+    if not loader.check_event(StreamEndEvent):
+        event = loader.get_event()
+        context, problem = 'expected a single document in the stream', 'but found another document'
+        raise ComposerError(context, document.start_mark, problem, event.start_mark)
+    return data, spans
+
+
+class _ByteOffsets:
+    """
+    Read a UTF-8 file for a parser, and convert the increasing character offsets of its marks into byte offsets.
+
+    Only the text between the last converted offset and what the parser read is kept.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.name = getattr(stream, 'name', '<file>')
+        self.pending = ''  # Text read, starting at the character offset self.character
+        self.position = 0  # Offset in pending of the last converted character
+        self.character = 0
+        self.byte = 0
+
+    def read(self, size: int) -> str:
+        chunk = self.stream.read(size)
+        self.character += self.position
+        self.pending = self.pending[self.position :] + chunk
+        self.position = 0
+        return chunk
+
+    def of(self, character: int) -> int:
+        index = character - self.character
+        self.byte += len(self.pending[self.position : index].encode('utf8'))
+        self.position = index
+        return self.byte
+
+
+class LazyField:
+    """A heavy field stored in a slot of a parent class, filled from the source file when first read."""
+
+    def __set_name__(self, owner, name: str):
+        self.name = name
+        self.slot = next(vars(cls)[name] for cls in owner.__mro__[1:] if name in vars(cls))
+
+    def __get__(self, item, owner=None):
+        if item is None:
+            return self
+        try:
+            return self.slot.__get__(item, owner)
+        except AttributeError:
+            item.load_heavy_fields()
+            return self.slot.__get__(item, owner)
+
+    def __set__(self, item, value):
+        self.slot.__set__(item, value)
+
+    def __delete__(self, item):
+        self.slot.__delete__(item)
+
+
+class LazyItem:
+    """
+    speky:speky_mcp#MCP015
+
+    Mixin of the lazy item classes, that declare a `locator` slot and a LazyField for each heavy field.
+    """
+
+    __slots__ = ()
+
+    heavy_fields: tuple[str, ...] = ()
+    key_field = 'id'
+
+    def forget(self, locator: Locator):
+        """Release the heavy fields, to be read again from the given location."""
+        self.locator = locator
+        for field in self.heavy_fields:
+            delattr(self, field)
+
+    def load_heavy_fields(self):
+        for field, value in self.read_heavy_fields().items():
+            setattr(self, field, value)
+
+    def read_heavy_fields(self) -> dict:
+        """The heavy fields, read from the source file without keeping them."""
+        key = getattr(self, self.key_field)
+        data = read_item(self.locator, self.key_field, key, self.required_fields())
+        if data is None:
+            logger.error('Could not find %s again in "%s"', key, self.locator.path)
+            data = {}
+        return {field: data.get(field) for field in self.heavy_fields}
+
+    def is_loaded(self) -> bool:
+        """Whether the heavy fields are in memory."""
+        try:
+            getattr(type(self), self.heavy_fields[0]).slot.__get__(self)
+        except AttributeError:
+            return False
+        return True
+
+    @classmethod
+    def required_fields(cls) -> list[str]:
+        return [field for field in cls.heavy_fields if field in cls.mandatory_fields]
+
+
+class _Detached:
+    """A read-only view of a lazy item, with heavy fields that were read for the view only."""
+
+    def __init__(self, item: LazyItem, fields: dict):
+        self._item = item
+        self._fields = fields
+
+    def __getattr__(self, name: str):
+        if name in self._fields:
+            return self._fields[name]
+        return getattr(self._item, name)
+
+
+def detached(item):
+    """
+    An item whose fields can be read without keeping its heavy fields in memory.
+
+    Reading them never changes the item, so that it can be shared with other threads.
+    """
+    if isinstance(item, LazyItem) and not item.is_loaded():
+        return _Detached(item, item.read_heavy_fields())
+    return item
+
+
+class LazyRequirement(LazyItem, Requirement):
+    __slots__ = ('locator',)
+
+    heavy_fields = ('long', 'client_statement', 'properties')
+    long = LazyField()
+    client_statement = LazyField()
+    properties = LazyField()
+
+
+class LazyTest(LazyItem, Test):
+    __slots__ = ('locator',)
+
+    heavy_fields = ('long', 'initial', 'steps')
+    long = LazyField()
+    initial = LazyField()
+    steps = LazyField()
+
+
+class LazyComment(LazyItem, Comment):
+    __slots__ = ('locator',)
+
+    heavy_fields = ('text',)
+    key_field = 'about'
+    mandatory_fields = Comment.fields
+    text = LazyField()
+
+
+def read_item(locator: Locator, key_field: str, key, required: list[str]) -> dict | None:
+    """
+    Read the fields of an item from its source file.
+
+    Returns:
+        The fields of the item, or None if the file no longer defines it
+    """
+    try:
+        mtime_ns = locator.path.stat().st_mtime_ns
+        if mtime_ns != locator.mtime_ns:
+            logger.warning('"%s" changed since it was loaded', locator.path)
+        if locator.span:
+            start, end, column = locator.span
+            with open(locator.path, 'rb') as f:
+                f.seek(start)
+                chunk = f.read(end - start).decode('utf8')
+            try:
+                data = load_yaml(' ' * column + chunk)
+            except yaml.YAMLError:
+                data = None  # Like aliases to anchors defined elsewhere, that need the whole file
+            # The key of a comment can come from the defaults of the file
+            if isinstance(data, dict) and data.get(key_field, key) == key and data.keys() >= set(required):
+                return data
+        return _read_whole_file(locator, mtime_ns, key_field, key)
+    except (OSError, UnicodeDecodeError, yaml.YAMLError, tomllib.TOMLDecodeError) as err:
+        logger.error('Could not read "%s" again: %s', locator.path, err)
+        return None
+
+
+def _read_whole_file(locator: Locator, mtime_ns: int, key_field: str, key) -> dict | None:
+    items, by_key = _section(locator.path, mtime_ns, locator.section, key_field)
+    if locator.position < len(items) and items[locator.position].get(key_field) == key:
+        return items[locator.position]
+    return by_key.get(key)
+
+
+def _section(path: Path, mtime_ns: int, section: str, key_field: str) -> tuple[list[dict], dict]:
+    """
+    The items of a section of a file, and the first item of each key, parsed once per version of the file.
+
+    Returns:
+        Empty results if the file does not have the section
+    """
+    with _documents_lock:
+        cached = _documents.get((path, mtime_ns))
+        if cached is None:
+            cached = _documents[path, mtime_ns] = {'document': _parse_whole_file(path), 'sections': {}}
+            while len(_documents) > CACHED_DOCUMENTS:
+                _documents.popitem(last=False)
+        else:
+            _documents.move_to_end((path, mtime_ns))
+        if (section, key_field) not in cached['sections']:
+            document = cached['document']
+            items = []
+            if isinstance(document, dict) and isinstance(document.get(section), list):
+                items = document[section]
+                if section == 'comments' and 'default' in document:
+                    items = [document['default'] | item for item in items]
+            by_key = {}
+            for item in items:
+                by_key.setdefault(item.get(key_field), item)
+            cached['sections'][section, key_field] = (items, by_key)
+        return cached['sections'][section, key_field]
+
+
+def _parse_whole_file(path: Path) -> object:
+    if path.suffix == '.toml':
+        with open(path, 'rb') as f:
+            return tomllib.load(f)
+    with open(path, encoding='utf8') as f:
+        return load_yaml(f)
@@ -11,8 +11,11 @@ from pathlib import Path
 
 import yaml
 
+from .coverage import save_summary
 from .generators import specification_to_myst
+from .snapshot import save_snapshot
 from .specification import Specification
+from .utils import YamlLoader
 
 assets = importlib.resources.files(__package__).joinpath('assets')
 default_logging_file = assets.joinpath('logging.yaml')
@@ -49,7 +52,9 @@ def run(argv: list[str] | None = None):
         description="Write your project's specification in YAML, display it as a static website",
         epilog='Copyright (c) 2025-2026 Antoine GAGNIERE',
     )
-    cli_parser.add_argument('-v', '--version', action='version', version='%(prog)s ' + version(__package__))
+    cli_parser.add_argument(
+        '-v', '--version', action='version', version=f'%(prog)s {version(__package__)} (YAML: {YamlLoader.__name__})'
+    )
     cli_parser.add_argument(
         'paths',
         type=str,
@@ -85,6 +90,32 @@ def run(argv: list[str] | None = None):
     cli_parser.add_argument(
         '-c', '--check-only', action='store_true', help='Validate input files but do not output any markdown'
     )
+    cli_parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        metavar='N',
+        default=1,
+        help='The number of workers used to parse specification files and code sources, and to write pages',
+    )
+    cli_parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        metavar='PATH',
+        help='The folder where to cache the tags found in code sources, to skip parsing unchanged files',
+    )
+    cli_parser.add_argument(
+        '--snapshot',
+        type=Path,
+        metavar='FILE',
+        help='Also save the loaded specification to a binary FILE, that speky-mcp --snapshot loads quickly',
+    )
+    cli_parser.add_argument(
+        '--coverage-summary',
+        type=Path,
+        metavar='FILE',
+        help='Also write the test coverage by tag, tag group, category and manifest to a .json or .csv FILE',
+    )
     cli_parser.add_argument(
         '--sort',
         action=argparse.BooleanOptionalAction,
@@ -96,16 +127,21 @@ def run(argv: list[str] | None = None):
     logging_config_file = Path(cli_args.logging_config)
     with logging_config_file.open() as f:
         logging.config.dictConfig(yaml.safe_load(f))
+    logger.debug('Parsing YAML with %s', YamlLoader.__name__)
 
-    specs = Specification()
+    specs = Specification(jobs=cli_args.jobs)
     for filename in cli_args.paths:
         specs.read_file(Path(filename))
     if cli_args.comment_csvs:
         for filename in cli_args.comment_csvs:
             specs.read_comment_csv(Path(filename))
     specs.check_references()
-    specs.scan_code_sources()
+    specs.scan_code_sources(cli_args.cache_dir)
     specs.compute_coverage()
 
+    if cli_args.snapshot:
+        save_snapshot(specs, cli_args.snapshot)
+    if cli_args.coverage_summary:
+        save_summary(specs.coverage_summary(), cli_args.coverage_summary)
     if not cli_args.check_only:
-        specification_to_myst(specs, cli_args.output_folder, cli_args.sort)
+        specification_to_myst(specs, cli_args.output_folder, cli_args.sort, cli_args.jobs)
@@ -4,15 +4,21 @@ from __future__ import annotations
 
 import datetime
 import logging
-import subprocess
 from pathlib import Path
-from types import SimpleNamespace
 
+from .git import GitError, GitResolver
 from .utils import ensure_fields, import_fields, warn_extra_fields
 
 
-class SpecItem(SimpleNamespace):
-    """Base class for specification items (requirements and tests)."""
+class SpecItem:
+    """
+    Base class for specification items (requirements and tests).
+
+    Attributes are slots: an item has no per-instance dictionary.
+    Subclasses declare a slot for each of their additional fields.
+    """
+
+    __slots__ = ('id', 'short', 'long', 'source_file', 'manifest', 'category', 'kind')
 
     folder = 'misc'
     id_field = 'id'
@@ -24,6 +30,20 @@ class SpecItem(SimpleNamespace):
         """Return all fields (id + mandatory + optional)."""
         return [cls.id_field] + cls.mandatory_fields + cls.optional_fields
 
+    def __init__(self, data: dict, source_file: str, manifest=None):
+        """
+        Args:
+            data: The fields of the item, the missing optional ones are set to None
+            source_file: Where the item is defined
+            manifest: The Manifest that loaded this file, if any
+        """
+        self.source_file = source_file
+        self.manifest = manifest
+        import_fields(self, data, self.fields())
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self.id!r})'
+
     @classmethod
     def from_dict(cls, data: dict, location: str, manifest=None):
         """
@@ -40,13 +60,11 @@ class SpecItem(SimpleNamespace):
         Raises:
             KeyError: If required fields are missing
         """
-        result = SimpleNamespace(source_file=location, manifest=manifest)
         ensure_fields(f'Definition of a {cls.__name__} in "{location}"', data, [cls.id_field])
         item_location = f'Definition of {cls.__name__} {data[cls.id_field]} in "{location}"'
         ensure_fields(item_location, data, cls.mandatory_fields)
         warn_extra_fields(item_location, data, cls.fields())
-        import_fields(result, data, cls.fields())
-        return cls(**result.__dict__)
+        return cls(data, location, manifest)
 
     @property
     def title(self):
@@ -72,6 +90,8 @@ class SpecItem(SimpleNamespace):
 class Requirement(SpecItem):
     """speky:speky#SF001 — Requirement specification item."""
 
+    __slots__ = ('tags', 'client_statement', 'properties', 'ref')
+
     folder = 'requirements'
     optional_fields = SpecItem.optional_fields + ['tags', 'client_statement', 'properties', 'ref']
 
@@ -79,6 +99,8 @@ class Requirement(SpecItem):
 class Test(SpecItem):
     """speky:speky#SF001 — Test specification item."""
 
+    __slots__ = ('initial', 'prereq', 'ref', 'steps')
+
     folder = 'tests'
     mandatory_fields = SpecItem.mandatory_fields + ['ref', 'steps']
     optional_fields = SpecItem.optional_fields + ['initial', 'prereq']
@@ -109,11 +131,27 @@ class Test(SpecItem):
         return result
 
 
-class Comment(SimpleNamespace):
+class Comment:
     """speky:speky#SF006 — Comment on a requirement or test."""
 
+    __slots__ = ('about', 'from', 'date', 'text', 'external', 'source_file', 'time')
+
     fields = ['about', 'from', 'date', 'text', 'external']
 
+    def __init__(self, data: dict, source_file: str):
+        """
+        Args:
+            data: The fields of the comment, with a date formatted as day/month/year
+            source_file: Where the comment is defined
+        """
+        self.source_file = source_file
+        import_fields(self, data, self.fields)
+        self.external = self.external in ['True', 'true', True, 1, '1']
+        self.time = datetime.datetime.strptime(self.date, '%d/%m/%Y').astimezone(datetime.UTC)
+
+    def __repr__(self):
+        return f'Comment(about={self.about!r}, date={self.date!r})'
+
     @classmethod
     def from_dict(cls, data: dict, location: str):
         """
@@ -129,14 +167,10 @@ class Comment(SimpleNamespace):
         Raises:
             KeyError: If required fields are missing
         """
-        result = SimpleNamespace(source_file=location)
         item_location = f'Definition of a {cls.__name__} in "{location}"'
         ensure_fields(item_location, data, cls.fields)
         warn_extra_fields(item_location, data, cls.fields)
-        import_fields(result, data, cls.fields)
-        result.external = result.external in ['True', 'true', True, 1, '1']
-        result.time = datetime.datetime.strptime(result.date, '%d/%m/%Y').astimezone(datetime.UTC)
-        return cls(**result.__dict__)
+        return cls(data, location)
 
     def __lt__(self, other):
         """Compare by timestamp for chronological sorting."""
@@ -162,6 +196,8 @@ class Manifest:
         link_config: SourceLinkConfig | NullSourceLinks,
         parent_manifest: Manifest | None,
         coverage_categories: list[str] | None = None,
+        files: list[str] | None = None,
+        comments_csvs: list[str] | None = None,
     ):
         self.name = name
         self.root_dir = root_dir
@@ -170,6 +206,8 @@ class Manifest:
         self.link_config = link_config
         self.parent = parent_manifest
         self.coverage_categories = coverage_categories or []
+        self.files = files or []
+        self.comments_csvs = comments_csvs or []
         self.coverage: dict[str, tuple[list, list, list, list]] = {}
 
     def relative_path(self, absolute: Path) -> str:
@@ -194,40 +232,46 @@ class SourceLinkConfig:
         self.git_root = git_root
 
     @classmethod
-    def from_dict(cls, data: dict | None, cwd: Path) -> SourceLinkConfig | NullSourceLinks:
+    def from_dict(
+        cls, data: dict | None, cwd: Path, git: GitResolver | None = None
+    ) -> SourceLinkConfig | NullSourceLinks:
         """
         Build a SourceLinkConfig from a `source_links` manifest dict.
 
+        Args:
+            data: The `source_links` of a manifest, if any
+            cwd: The folder of the manifest, in the git repository
+            git: Where to resolve the metadata of repositories, to share it between the manifests of a repository
+
         Returns a NullSourceLinks if data is None or any required value cannot be resolved.
         """
         if data is None:
             return NullSourceLinks()
         log = logging.getLogger(__name__)
+        git = git or GitResolver()
 
         url = data.get('url')
         branch = data.get('branch', 'auto')
 
         if url == 'auto':
-            result = subprocess.run(['git', 'remote', 'get-url', 'origin'], cwd=cwd, capture_output=True, text=True)
-            if result.returncode != 0:
-                log.warning('Could not detect git remote URL: %s', result.stderr.strip())
+            try:
+                url = normalize_remote_url(git.remote_url(cwd))
+            except GitError as err:
+                log.warning('Could not detect git remote URL: %s', err)
                 return NullSourceLinks()
-            url = normalize_remote_url(result.stdout.strip())
 
         if branch == 'auto':
-            result = subprocess.run(
-                ['git', 'rev-parse', '--abbrev-ref', 'HEAD'], cwd=cwd, capture_output=True, text=True
-            )
-            if result.returncode != 0:
-                log.warning('Could not detect git branch: %s', result.stderr.strip())
+            try:
+                branch = git.branch(cwd)
+            except GitError as err:
+                log.warning('Could not detect git branch: %s', err)
                 return NullSourceLinks()
-            branch = result.stdout.strip()
 
-        result = subprocess.run(['git', 'rev-parse', '--show-toplevel'], cwd=cwd, capture_output=True, text=True)
-        if result.returncode != 0:
-            log.warning('Could not find git root: %s', result.stderr.strip())
+        try:
+            git_root = git.toplevel(cwd)
+        except GitError as err:
+            log.warning('Could not find git root: %s', err)
             return NullSourceLinks()
-        git_root = Path(result.stdout.strip())
 
         return cls(url=url, branch=branch, git_root=git_root)
 
@@ -13,9 +13,14 @@ Tags in other project namespaces are silently ignored.
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
+from itertools import repeat
 from pathlib import Path
 from typing import TYPE_CHECKING
 
@@ -23,13 +28,17 @@ import tree_sitter_bash as tsbash
 import tree_sitter_go as tsgo
 import tree_sitter_python as tspython
 import tree_sitter_rust as tsrust
-from tree_sitter import Language, Node, Parser
+from tree_sitter import Language, Node, Parser, Query, QueryCursor
 
 if TYPE_CHECKING:
     from .models import Manifest
 
 logger = logging.getLogger(__name__)
 
+# Bump whenever the extraction logic changes, so that persisted scan caches are discarded
+SCANNER_VERSION = 2
+
+TAG_MARKER = b'speky:'
 ANNOTATION_RE = re.compile(r'speky:(?P<project>[A-Za-z0-9_.-]+)#(?P<id>[A-Za-z0-9_-]+)')
 
 _SH_LANG = Language(tsbash.language())
@@ -52,6 +61,25 @@ _SYMBOL_TYPES: dict[str, frozenset[str]] = {
 }
 
 
+# Each query yields, in a single pass of the native cursor, every comment and every docstring of a file
+_QUERIES: dict[str, Query] = {
+    '.sh': Query(_SH_LANG, '(comment) @comment'),
+    '.py': Query(
+        _PY_LANG,
+        """
+        (comment) @comment
+        (module . (expression_statement (string) @docstring))
+        ([
+          (function_definition body: (block . (expression_statement (string) @docstring)))
+          (class_definition body: (block . (expression_statement (string) @docstring)))
+        ] @definition)
+        """,
+    ),
+    '.go': Query(_GO_LANG, '(comment) @comment'),
+    '.rs': Query(_RS_LANG, '(line_comment) @comment'),
+}
+
+
 @dataclass(order=True)
 class CodeReference:
     """A speky tag found in source code."""
@@ -71,22 +99,162 @@ class CodeReference:
         return str(self.file.relative_to(self.manifest.root_dir))
 
 
-def scan_sources(sources: list[Path], project_names: set[str]) -> list[CodeReference]:
-    """Scan a list of source files for speky tags."""
-    refs: list[CodeReference] = []
+def scan_sources(
+    sources: list[Path], project_names: set[str], cache_folder: Path | None = None, jobs: int = 1
+) -> list[CodeReference]:
+    """
+    Scan a list of source files for speky tags.
+
+    When a cache folder is given, files that did not change since the previous scan are not parsed again.
+    With more than one job, files are parsed in a pool of processes.
+    The result does not depend on the number of jobs: references are ordered as the files are.
+    """
+    cache = ScanCache.load(cache_folder, project_names) if cache_folder else None
+    files = [path for path in _source_files(sources) if path.suffix in _SCANNERS]
+    found: dict[Path, list[CodeReference]] = {}
+    pending: list[Path] = []
+    for path in files:
+        if cache and (refs := cache.lookup(path)) is not None:
+            found[path] = refs
+        else:
+            pending.append(path)
+    skipped = 0
+    for path, refs in zip(pending, _scan_files(pending, project_names, jobs), strict=True):
+        if refs is None:
+            skipped += 1
+            refs = []
+        found[path] = refs
+        if cache:
+            cache.store(path, refs)
+    logger.info(
+        'Scanning %d unique source file(s): %d parsed, %d skipped without tag, %d from cache',
+        len(files),
+        len(pending) - skipped,
+        skipped,
+        len(files) - len(pending),
+    )
+    if cache:
+        logger.info('Scan cache: %d hit(s), %d miss(es)', cache.hits, cache.misses)
+        cache.save()
+    return [ref for path in files for ref in found[path]]
+
+
+def _scan_files(paths: list[Path], project_names: set[str], jobs: int) -> list[list[CodeReference] | None]:
+    if jobs <= 1 or len(paths) <= 1:
+        return [_scan_file(path, project_names) for path in paths]
+    # Several files per task amortize the inter-process communication, a few tasks per worker balance the load
+    chunksize = max(1, len(paths) // (jobs * 4))
+    logger.debug('Scanning %d file(s) with %d processes, %d file(s) at a time', len(paths), jobs, chunksize)
+    with ProcessPoolExecutor(max_workers=min(jobs, len(paths))) as executor:
+        return list(executor.map(_scan_file, paths, repeat(project_names), chunksize=chunksize))
+
+
+def _source_files(sources: list[Path]):
     for source in sources:
         if source.is_file():
-            refs.extend(_scan_file(source, project_names))
+            yield source
         elif source.is_dir():
             for path in sorted(source.rglob('*')):
                 if path.suffix in _SCANNERS:
-                    refs.extend(_scan_file(path, project_names))
+                    yield path
         else:
             logger.warning('Code source not found: %s', source)
-    return refs
 
 
-def _scan_file(path: Path, project_names: set[str]) -> list[CodeReference]:
+class ScanCache:
+    """
+    speky:speky#SF016
+
+    Persistent record of the tags found in each source file.
+
+    An entry is reused as is when the size and modification time of the file are unchanged,
+    or when its content still has the same SHA-256 digest.
+    The whole cache is discarded when the scanner version or the set of project names differ.
+    """
+
+    filename = 'scan.json'
+
+    def __init__(self, folder: Path, project_names: set[str], entries: dict[str, dict]):
+        self.folder = folder
+        self.project_names = project_names
+        self.previous = entries
+        self.entries: dict[str, dict] = {}
+        self.pending: dict[str, dict] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, folder: Path, project_names: set[str]) -> ScanCache:
+        entries = {}
+        path = folder / cls.filename
+        try:
+            with open(path, encoding='utf8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            logger.debug('No scan cache in %s', folder)
+        except (OSError, ValueError) as err:
+            logger.warning('Ignoring unreadable scan cache %s: %s', path, err)
+        else:
+            if data.get('version') == SCANNER_VERSION and data.get('projects') == sorted(project_names):
+                entries = data.get('files', {})
+            else:
+                logger.debug('Discarding scan cache made for another scanner version or other projects')
+        return cls(folder, project_names, entries)
+
+    def save(self):
+        """Write the entries of the files scanned during this run, dropping the others."""
+        self.folder.mkdir(parents=True, exist_ok=True)
+        data = {'version': SCANNER_VERSION, 'projects': sorted(self.project_names), 'files': self.entries}
+        temporary = self.folder / f'{self.filename}.tmp'
+        with open(temporary, encoding='utf8', mode='w') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(temporary, self.folder / self.filename)
+
+    def lookup(self, path: Path) -> list[CodeReference] | None:
+        """Return the tags of a file if it did not change since it was cached, None if it must be parsed."""
+        key = str(path)
+        try:
+            stat = path.stat()
+            entry = self.previous.get(key)
+            if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                return self._hit(key, path, entry)
+            digest = hashlib.sha256(path.read_bytes()).hexdigest()
+        except OSError:
+            return None  # Let the scanner report it
+        if entry and entry['sha256'] == digest:
+            entry |= {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+            return self._hit(key, path, entry)
+        self.misses += 1
+        self.pending[key] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'sha256': digest}
+        return None
+
+    def store(self, path: Path, refs: list[CodeReference]):
+        """Record the tags found in a file that was looked up and missed."""
+        key = str(path)
+        if key in self.pending:
+            self.entries[key] = self.pending.pop(key) | {
+                'refs': [[r.project, r.line, r.target_id, r.language, r.symbol, r.is_test] for r in refs]
+            }
+
+    def _hit(self, key: str, path: Path, entry: dict) -> list[CodeReference]:
+        self.hits += 1
+        self.entries[key] = entry
+        return [
+            CodeReference(
+                project=project,
+                file=path,
+                line=line,
+                target_id=target_id,
+                language=language,
+                symbol=symbol,
+                is_test=is_test,
+            )
+            for project, line, target_id, language, symbol, is_test in entry['refs']
+        ]
+
+
+def _scan_file(path: Path, project_names: set[str]) -> list[CodeReference] | None:
+    """Return the tags found in a file, or None if it was not parsed because it cannot contain any."""
     scanner = _SCANNERS.get(path.suffix)
     if not scanner:
         return []
@@ -95,36 +263,26 @@ def _scan_file(path: Path, project_names: set[str]) -> list[CodeReference]:
     except OSError as err:
         logger.warning('Cannot read %s: %s', path, err)
         return []
+    # Searching the raw bytes is much cheaper than building a syntax tree, and most files have no tag
+    if TAG_MARKER not in source:
+        return None
     return scanner(source, project_names, path)
 
 
 def _scan_python(source: bytes, project_names: set[str], file: Path) -> list[CodeReference]:
-    tree = Parser(_PY_LANG).parse(source)
-    refs: list[CodeReference] = []
-    _walk(tree.root_node, source, '.py', project_names, file, refs)
-    _collect_python_docstrings(tree.root_node, source, project_names, file, refs)
-    return refs
+    return _extract(Parser(_PY_LANG).parse(source).root_node, source, '.py', project_names, file)
 
 
 def _scan_go(source: bytes, project_names: set[str], file: Path) -> list[CodeReference]:
-    tree = Parser(_GO_LANG).parse(source)
-    refs: list[CodeReference] = []
-    _walk(tree.root_node, source, '.go', project_names, file, refs)
-    return refs
+    return _extract(Parser(_GO_LANG).parse(source).root_node, source, '.go', project_names, file)
 
 
 def _scan_rust(source: bytes, project_names: set[str], file: Path) -> list[CodeReference]:
-    tree = Parser(_RS_LANG).parse(source)
-    refs: list[CodeReference] = []
-    _walk(tree.root_node, source, '.rs', project_names, file, refs)
-    return refs
+    return _extract(Parser(_RS_LANG).parse(source).root_node, source, '.rs', project_names, file)
 
 
 def _scan_bash(source: bytes, project_names: set[str], file: Path) -> list[CodeReference]:
-    tree = Parser(_SH_LANG).parse(source)
-    refs: list[CodeReference] = []
-    _walk(tree.root_node, source, '.sh', project_names, file, refs)
-    return refs
+    return _extract(Parser(_SH_LANG).parse(source).root_node, source, '.sh', project_names, file)
 
 
 _LANGUAGES = {
@@ -142,55 +300,57 @@ _SCANNERS = {
 }
 
 
-def _walk(node: Node, source: bytes, ext: str, project_names: set[str], file: Path, refs: list[CodeReference]):
-    if node.type in _COMMENT_TYPES[ext]:
-        text = _text(node, source)
-        for m in ANNOTATION_RE.finditer(text):
-            if m.group('project').lower() not in project_names:
-                continue
-            symbol, is_test, symbol_node = _following_symbol(node, source, ext)
-            if ext == '.sh' and file.name.startswith('test'):
-                is_test = True
-            elif ext == '.go' and file.name.endswith('_test.go'):
-                is_test = True
-            line = (symbol_node.start_point[0] + 1) if symbol_node else (node.start_point[0] + 1)
-            refs.append(
-                CodeReference(
-                    project=m.group('project').lower(),
-                    target_id=m.group('id'),
-                    file=file,
-                    line=line,
-                    language=_LANGUAGES[ext],
-                    symbol=symbol,
-                    is_test=is_test,
-                )
-            )
-        return  # don't recurse into comment text
+def _extract(root: Node, source: bytes, ext: str, project_names: set[str], file: Path) -> list[CodeReference]:
+    """Collect the tags of comments, then of docstrings, in the order they appear in the file."""
+    comments: list[Node] = []
+    docstrings: list[tuple[Node | None, Node]] = []
+    for _, captures in QueryCursor(_QUERIES[ext]).matches(root):
+        if 'comment' in captures:
+            comments.append(captures['comment'][0])
+        else:
+            docstrings.append((captures.get('definition', [None])[0], captures['docstring'][0]))
 
-    for child in node.children:
-        _walk(child, source, ext, project_names, file, refs)
+    refs: list[CodeReference] = []
+    for node in sorted(comments, key=lambda n: n.start_byte):
+        _collect_comment(node, source, ext, project_names, file, refs)
+    for definition, string in sorted(docstrings, key=lambda d: (d[0] or d[1]).start_byte):
+        _collect_python_docstring(definition, string, source, project_names, file, refs)
+    return refs
+
+
+def _collect_comment(node: Node, source: bytes, ext: str, project_names: set[str], file: Path, refs: list):
+    text = _text(node, source)
+    for m in ANNOTATION_RE.finditer(text):
+        if m.group('project').lower() not in project_names:
+            continue
+        symbol, is_test, symbol_node = _following_symbol(node, source, ext)
+        if ext == '.sh' and file.name.startswith('test'):
+            is_test = True
+        elif ext == '.go' and file.name.endswith('_test.go'):
+            is_test = True
+        line = (symbol_node.start_point[0] + 1) if symbol_node else (node.start_point[0] + 1)
+        refs.append(
+            CodeReference(
+                project=m.group('project').lower(),
+                target_id=m.group('id'),
+                file=file,
+                line=line,
+                language=_LANGUAGES[ext],
+                symbol=symbol,
+                is_test=is_test,
+            )
+        )
 
 
 def _following_symbol(comment: Node, source: bytes, ext: str) -> tuple[str | None, bool, Node | None]:
     """Return (name, is_test, node) of the named symbol immediately after this comment, or (None, False, None)."""
-    parent = comment.parent
-    if not parent:
-        return None, False, None
-
-    siblings = parent.children
-    idx = next((i for i, c in enumerate(siblings) if c.id == comment.id), -1)
-    if idx < 0:
+    sibling = comment.next_sibling
+    while sibling is not None and sibling.type in _COMMENT_TYPES[ext]:
+        sibling = sibling.next_sibling  # consecutive comments are still "adjacent"
+    if sibling is None or sibling.type not in _SYMBOL_TYPES[ext]:
         return None, False, None
-
-    for sibling in siblings[idx + 1 :]:
-        if sibling.type in _COMMENT_TYPES[ext]:
-            continue  # consecutive comments are still "adjacent"
-        if sibling.type in _SYMBOL_TYPES[ext]:
-            name = _symbol_name(sibling, source)
-            return name, _is_test(sibling, siblings, idx + 1, source, ext, name), sibling
-        break
-
-    return None, False, None
+    name = _symbol_name(sibling, source)
+    return name, _is_test(comment, source, ext, name), sibling
 
 
 def _symbol_name(node: Node, source: bytes) -> str | None:
@@ -203,69 +363,57 @@ def _symbol_name(node: Node, source: bytes) -> str | None:
     return None
 
 
-def _is_test(symbol: Node, siblings: list[Node], symbol_idx: int, source: bytes, ext: str, name: str | None) -> bool:
+def _is_test(comment: Node, source: bytes, ext: str, name: str | None) -> bool:
     if ext == '.py':
         return bool(name and name.startswith(('test', 'Test')))
     if ext == '.go':
         return bool(name and name.startswith('Test'))
     if ext == '.rs':
-        for sibling in reversed(siblings[:symbol_idx]):
-            if sibling.type == 'attribute_item' and 'test' in _text(sibling, source):
+        node = comment
+        while node is not None:
+            if node.type == 'attribute_item' and 'test' in _text(node, source):
                 return True
-            if sibling.type not in ('line_comment',):
+            if node.type not in ('line_comment',):
                 break
+            node = node.prev_sibling
     return False
 
 
-def _collect_python_docstrings(
-    root: Node, source: bytes, project_names: set[str], file: Path, refs: list[CodeReference]
+def _collect_python_docstring(
+    definition: Node | None, string: Node, source: bytes, project_names: set[str], file: Path, refs: list
 ):
-    """Collect tags from Python docstrings (first string literal in a function/class/module body)."""
-    if root.type in ('function_definition', 'class_definition'):
-        body = next((c for c in root.children if c.type == 'block'), None)
-        if body:
-            first = next((c for c in body.children if c.is_named), None)
-            if first and first.type == 'expression_statement':
-                string = next((c for c in first.children if c.type == 'string'), None)
-                if string:
-                    text = _text(string, source)
-                    name = _symbol_name(root, source)
-                    is_test = bool(name and name.startswith(('test', 'Test')))
-                    for m in ANNOTATION_RE.finditer(text):
-                        if m.group('project').lower() in project_names:
-                            refs.append(
-                                CodeReference(
-                                    project=m.group('project').lower(),
-                                    target_id=m.group('id'),
-                                    file=file,
-                                    line=root.start_point[0] + 1,
-                                    language='python',
-                                    symbol=name,
-                                    is_test=is_test,
-                                )
-                            )
-    elif root.type == 'module':
-        first = next((c for c in root.children if c.is_named), None)
-        if first and first.type == 'expression_statement':
-            string = next((c for c in first.children if c.type == 'string'), None)
-            if string:
-                text = _text(string, source)
-                for m in ANNOTATION_RE.finditer(text):
-                    if m.group('project') in project_names:
-                        refs.append(
-                            CodeReference(
-                                project=m.group('project').lower(),
-                                target_id=m.group('id'),
-                                file=file,
-                                line=string.start_point[0] + 1,
-                                language='python',
-                                symbol=None,
-                                is_test=False,
-                            )
-                        )
-
-    for child in root.children:
-        _collect_python_docstrings(child, source, project_names, file, refs)
+    """Collect tags from a Python docstring, of a function or class definition, or of the module if None."""
+    text = _text(string, source)
+    if definition is not None:
+        name = _symbol_name(definition, source)
+        is_test = bool(name and name.startswith(('test', 'Test')))
+        for m in ANNOTATION_RE.finditer(text):
+            if m.group('project').lower() in project_names:
+                refs.append(
+                    CodeReference(
+                        project=m.group('project').lower(),
+                        target_id=m.group('id'),
+                        file=file,
+                        line=definition.start_point[0] + 1,
+                        language='python',
+                        symbol=name,
+                        is_test=is_test,
+                    )
+                )
+    else:
+        for m in ANNOTATION_RE.finditer(text):
+            if m.group('project') in project_names:
+                refs.append(
+                    CodeReference(
+                        project=m.group('project').lower(),
+                        target_id=m.group('id'),
+                        file=file,
+                        line=string.start_point[0] + 1,
+                        language='python',
+                        symbol=None,
+                        is_test=False,
+                    )
+                )
 
 
 def _text(node: Node, source: bytes) -> str:
@@ -0,0 +1,253 @@
+"""
+Full-text search over the requirements and tests of a specification.
+
+Each requirement and test is a document made of its short and long descriptions, its client statement,
+the actions and expected results of its steps, and the text of the comments about it.
+Documents are ranked with Okapi BM25.
+
+Queries are made of words, that documents need not all contain, of prefixes like `auth*`,
+and of phrases like `"shall not"`, that documents must contain.
+"""
+
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Iterator
+from typing import NamedTuple
+
+from .lazy import detached
+
+# Okapi BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_WORD = re.compile(r'\w+')
+_QUERY = re.compile(r'"([^"]*)"?|([^\s"]+)')
+_SEPARATOR = 0xFFFFFFFF  # Between fields, so that phrases do not span two of them
+_SNIPPET_CONTEXT = 60
+
+
+class Hit(NamedTuple):
+    item: object
+    score: float
+    field: str
+    snippet: str
+
+
+def tokenize(text: str) -> list[str]:
+    return _WORD.findall(text.lower())
+
+
+def searchable_fields(item, comments: dict[str, list]) -> Iterator[tuple[str, str]]:
+    """
+    The names and texts of the indexed fields of a requirement or test.
+
+    The heavy fields of lazy items are read without being kept, so that items shared with other threads never change.
+    """
+    item = detached(item)
+    for field in ('short', 'long', 'client_statement'):
+        text = getattr(item, field, None)
+        if text:
+            yield field, text
+    for step in getattr(item, 'steps', None) or []:
+        for text in (step.get('action'), step.get('expected')):
+            if text:
+                yield 'steps', str(text)
+    for comment in comments.get(item.id, []):
+        text = detached(comment).text
+        if text:
+            yield 'comments', text
+
+
+class SearchIndex:
+    """
+    speky:speky_mcp#MCP021
+
+    Inverted index of the requirements and tests of a specification, as of one of its generations.
+
+    For each term, the documents that contain it in increasing order, and how many times.
+    For each document, the sequence of its terms as 32-bit integers, to match phrases with bytes.find.
+    """
+
+    def __init__(self, specs):
+        self.generation = specs.generation
+        self.comments = specs.comments
+        self.items = []
+        self.terms: dict[str, int] = {}
+        self.documents: list[bytes] = []
+        self.lengths = array('I')
+        self.postings: list[array] = []
+        self.frequencies: list[array] = []
+        self.impacts: dict[int, array] = {}
+
+        for item in _items(specs):
+            self._add(item)
+        self.names = list(self.terms)
+        self.vocabulary = sorted(self.terms)
+        self.average_length = (sum(self.lengths) / len(self.lengths) if self.lengths else 0) or 1
+
+    def _add(self, item):
+        number = len(self.items)
+        document = array('I')
+        counts = defaultdict(int)
+        for _, text in searchable_fields(item, self.comments):
+            if document:
+                document.append(_SEPARATOR)
+            for token in tokenize(text):
+                term = self.terms.setdefault(token, len(self.terms))
+                document.append(term)
+                counts[term] += 1
+
+        self.items.append(item)
+        self.documents.append(document.tobytes())
+        self.lengths.append(sum(counts.values()))
+        for term, count in counts.items():
+            if term == len(self.postings):
+                self.postings.append(array('I'))
+                self.frequencies.append(array('I'))
+            self.postings[term].append(number)
+            self.frequencies[term].append(count)
+
+    def search(self, query: str, kind: str | None = None, count: int = 20) -> list[Hit]:
+        """
+        Rank the documents matching a query.
+
+        Args:
+            query: Words, prefixes ending with `*` and double-quoted phrases
+            kind: Only return items of this kind, requirement or test
+            count: The maximum number of results
+
+        Returns:
+            The best results, from the highest score
+        """
+        words: set[int] = set()
+        phrases: list[list[str]] = []
+        for phrase, word in _QUERY.findall(query):
+            tokens = tokenize(phrase or word)
+            if not tokens:
+                continue
+            if phrase:
+                phrases.append(tokens)
+            elif word.endswith('*'):
+                words.update(self._expand(tokens.pop()))
+            words.update(self.terms[token] for token in tokens if token in self.terms)
+
+        required = None
+        for tokens in phrases:
+            matches = self._phrase(tokens)
+            required = matches if required is None else required & matches
+        if required is not None and not required:
+            return []
+
+        scores: dict[int, float] = {}
+        # Starting from the longest list of documents, built at C speed
+        for term in sorted(words, key=lambda term: len(self.postings[term]), reverse=True):
+            if not scores:
+                scores = dict(zip(self.postings[term], self._impacts(term), strict=True))
+                continue
+            get = scores.get
+            for number, impact in zip(self.postings[term], self._impacts(term), strict=True):
+                scores[number] = get(number, 0.0) + impact
+        if required is not None:
+            scores = {number: scores.get(number, 0.0) for number in required}
+        if kind:
+            scores = {number: score for number, score in scores.items() if self.items[number].kind == kind}
+
+        best = heapq.nlargest(count, scores, key=scores.__getitem__)
+        highlights = self._highlights(words, phrases)
+        return [self._hit(number, scores[number], highlights) for number in best]
+
+    def _expand(self, prefix: str) -> list[int]:
+        """The terms starting with a prefix."""
+        result = []
+        for position in range(bisect_left(self.vocabulary, prefix), len(self.vocabulary)):
+            term = self.vocabulary[position]
+            if not term.startswith(prefix):
+                break
+            result.append(self.terms[term])
+        return result
+
+    def _impacts(self, term: int) -> array:
+        """The BM25 score of a term in each document that contains it, computed on first use."""
+        impacts = self.impacts.get(term)
+        if impacts is None:
+            documents = self.postings[term]
+            idf = math.log(1 + (len(self.items) - len(documents) + 0.5) / (len(documents) + 0.5))
+            lengths = self.lengths
+            constant = K1 * (1 - B)
+            relative = K1 * B / self.average_length
+            impacts = array(
+                'd',
+                (
+                    idf * frequency * (K1 + 1) / (frequency + constant + relative * lengths[number])
+                    for number, frequency in zip(documents, self.frequencies[term], strict=True)
+                ),
+            )
+            self.impacts[term] = impacts
+        return impacts
+
+    def _phrase(self, tokens: list[str]) -> set[int]:
+        """The documents containing the given terms in a row."""
+        if any(token not in self.terms for token in tokens):
+            return set()
+        terms = [self.terms[token] for token in tokens]
+        by_frequency = sorted(set(terms), key=lambda term: len(self.postings[term]))
+        candidates = set(self.postings[by_frequency[0]])
+        for term in by_frequency[1:]:
+            candidates.intersection_update(self.postings[term])
+        if len(terms) == 1:
+            return candidates
+        pattern = array('I', terms).tobytes()
+        return {number for number in candidates if _contains(self.documents[number], pattern)}
+
+    def _highlights(self, words: set[int], phrases: list[list[str]]) -> list[re.Pattern]:
+        """Patterns matching the phrases of a query, then its words, the longest first."""
+        alternatives = [
+            [r'\W+'.join(map(re.escape, tokens)) for tokens in phrases],
+            sorted((re.escape(self.names[term]) for term in words), key=len, reverse=True),
+        ]
+        return [
+            re.compile(rf'(?<!\w)(?:{"|".join(patterns)})(?!\w)', re.IGNORECASE)
+            for patterns in alternatives
+            if patterns
+        ]
+
+    def _hit(self, number: int, score: float, highlights: list[re.Pattern]) -> Hit:
+        item = self.items[number]
+        fields = list(searchable_fields(item, self.comments))
+        for pattern in highlights:
+            for field, text in fields:
+                if match := pattern.search(text):
+                    return Hit(item, score, field, snippet(text, match.start(), match.end()))
+        field, text = fields[0] if fields else ('long', '')
+        return Hit(item, score, field, snippet(text, 0, 0))
+
+
+def snippet(text: str, start: int, end: int) -> str:
+    """The words around a match, on a single line."""
+    left = max(0, start - _SNIPPET_CONTEXT)
+    right = min(len(text), end + _SNIPPET_CONTEXT)
+    if left > 0 and (space := text.find(' ', left, start)) != -1:
+        left = space + 1
+    if right < len(text) and (space := text.rfind(' ', end, right)) != -1:
+        right = space
+    result = ' '.join(text[left:right].split())
+    return ('…' if left > 0 else '') + result + ('…' if right < len(text) else '')
+
+
+def _items(specs):
+    for requirements in specs.requirements.values():
+        yield from requirements
+    for tests in specs.tests.values():
+        yield from tests
+
+
+def _contains(document: bytes, pattern: bytes) -> bool:
+    """Whether a document holds a sequence of terms, that only matches at the start of a term."""
+    position = document.find(pattern)
+    while position > 0 and position % 4:
+        position = document.find(pattern, position + 1)
+    return position != -1
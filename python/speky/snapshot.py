@@ -0,0 +1,89 @@
+"""
+Save a fully loaded Specification to a binary file, and load it back.
+
+A snapshot holds the requirements, tests, comments, indexes, code references and coverage of a specification,
+so that loading it skips parsing, validation and code scanning.
+
+The file starts with a header: a magic string, the version of the format and the version of Speky that wrote it.
+A snapshot is only loaded by the same version of Speky, the payload being a pickle of the Python objects.
+As with any pickle, only load snapshots you made yourself.
+"""
+
+import logging
+import pickle
+import struct
+from importlib.metadata import version
+from pathlib import Path
+
+from .specification import Specification
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'SPEKYSNAP'
+FORMAT_VERSION = 5
+_HEADER = struct.Struct('>9sHH')  # Magic, format version, length of the Speky version
+
+
+def save_snapshot(specs: Specification, path: Path):
+    """
+    speky:speky_mcp#MCP014
+
+    Write a specification to a snapshot file.
+
+    The modification times of the files it was loaded from are recorded, to warn when loading an outdated snapshot.
+    """
+    speky_version = version('speky').encode()
+    sources = _mtimes(specs.file_manifests.keys() | specs.code_source_files())
+    tmp = path.with_name(path.name + '.tmp')
+    with tmp.open('wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(speky_version)))
+        f.write(speky_version)
+        pickle.dump((sources, specs), f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(path)
+    logger.info('Snapshot of %d item(s) saved to %s', len(specs.by_id), path)
+
+
+def load_snapshot(path: Path, jobs: int = 1) -> Specification:
+    """
+    speky:speky_mcp#MCP014
+
+    Read a specification from a snapshot file.
+
+    Raises:
+        RuntimeError: If the file is not a snapshot, or was written by another version of Speky
+    """
+    with path.open('rb') as f:
+        header = f.read(_HEADER.size)
+        if len(header) < _HEADER.size or not header.startswith(MAGIC):
+            message = f'"{path}" is not a Speky snapshot'
+            raise RuntimeError(message)
+        _, format_version, version_length = _HEADER.unpack(header)
+        speky_version = f.read(version_length).decode(errors='replace')
+        if format_version != FORMAT_VERSION or speky_version != version('speky'):
+            message = f'Snapshot "{path}" was written by Speky {speky_version}, it must be made again with Speky {version("speky")}'
+            raise RuntimeError(message)
+        try:
+            sources, specs = pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError) as err:
+            message = f'Corrupted snapshot "{path}": {err}'
+            raise RuntimeError(message) from err
+
+    specs.jobs = jobs
+    current = _mtimes(set(sources))
+    outdated = sorted(source for source, mtime in sources.items() if current.get(source) != mtime)
+    if outdated:
+        logger.warning(
+            'Snapshot "%s" is older than %d of its source file(s), like %s', path, len(outdated), outdated[0]
+        )
+    logger.info('Snapshot of %d item(s) loaded from %s', len(specs.by_id), path)
+    return specs
+
+
+def _mtimes(paths: set[Path]) -> dict[Path, int]:
+    result = {}
+    for path in paths:
+        try:
+            result[path] = path.stat().st_mtime_ns
+        except OSError:
+            pass  # Removed files count as modified
+    return result
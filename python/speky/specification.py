@@ -2,18 +2,35 @@
 
 import csv
 import logging
+import os
+import sys
 import tomllib
 from collections import defaultdict
+from collections.abc import Callable, Collection
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from pathlib import Path
 
-import yaml
-
+from .coverage import STATUSES, CoverageEngine, CoverageSummary
+from .git import GitResolver
+from .lazy import LazyComment, LazyRequirement, LazyTest, Locator, parse_yaml_with_spans
 from .models import Comment, Manifest, Requirement, SourceLinkConfig, Test
-from .utils import ensure_fields
+from .utils import ensure_fields, load_yaml
 
 logger = logging.getLogger(__name__)
 
 
+class ReferenceErrors(KeyError):
+    """Every invalid reference found in a specification, one per line."""
+
+    def __init__(self, errors: list[str]):
+        super().__init__(*errors)
+        self.errors = errors
+
+    def __str__(self):
+        return '\n'.join(self.errors)
+
+
 class Specification:
     """
     Container for requirements, tests, and comments with cross-reference tracking.
@@ -21,8 +38,16 @@ class Specification:
     speky:speky#SF001
     """
 
-    def __init__(self):
-        """Initialize empty specification."""
+    def __init__(self, jobs: int = 1, lazy: bool = False):
+        """
+        Initialize empty specification.
+
+        Args:
+            jobs: Number of processes to use for CPU-bound work, like parsing specification and source files
+            lazy: Forget the heavy fields of items once loaded, to read them again from their file when accessed
+        """
+        self.jobs = jobs
+        self.lazy = lazy
         self.requirements = defaultdict(list)
         self.tests = defaultdict(list)
         self.references = defaultdict(list)
@@ -30,9 +55,24 @@ class Specification:
         self.comments = defaultdict(list)
         self.by_id = {}
         self.tags = defaultdict(list)
+        # Secondary indexes, to combine filters at the cost of the result rather than of a whole category
+        self.tags_by_category: dict[tuple[str, str], list] = defaultdict(list)
+        self.testers_by_category: dict[tuple[str, str], list] = defaultdict(list)
         self.loaded_files: set[Path] = set()
         self.manifests: list[Manifest] = []
         self.code_refs_by_id: dict[str, list] = defaultdict(list)
+        self.coverage = CoverageEngine()
+        # Provenance, to update the specification one file at a time
+        self.file_manifests: dict[Path, Manifest | None] = {}
+        self.items_by_file: dict[Path, list] = defaultdict(list)
+        # Shared by the manifests of a repository, so that its metadata is read once
+        self.git = GitResolver()
+        self.code_refs_by_file: dict[Path, list] = defaultdict(list)
+        # Incremented on every change, to invalidate what was derived from the specification
+        self.generation = 0
+        self._search_index = None
+        self._traceability_graph = None
+        self._coverage_summary = None
 
     def load_requirement(self, requirement: Requirement, category: str):
         """
@@ -41,6 +81,11 @@ class Specification:
         Raises:
             KeyError: If requirement ID is already defined
         """
+        self.generation += 1
+        requirement.id = _intern(requirement.id)
+        requirement.ref = _intern_all(requirement.ref)
+        requirement.tags = _intern_all(requirement.tags)
+        category = _intern(category)
         if requirement.id in self.by_id:
             existing = self.by_id[requirement.id]
             message = f'Multiple definitions of {requirement.id}: already defined in "{existing.source_file}", redefined in "{requirement.source_file}"'
@@ -55,17 +100,25 @@ class Specification:
         if requirement.tags:
             for tag in requirement.tags:
                 self.tags[tag].append(requirement)
+                self.tags_by_category[tag, category].append(requirement)
 
     def load_test(self, test: Test, category: str):
         """
         Add a test to the specification.
         """
+        self.generation += 1
+        test.id = _intern(test.id)
+        test.ref = _intern_all(test.ref)
+        test.prereq = _intern_all(test.prereq)
+        category = _intern(category)
         test.category = category
         test.kind = 'test'
         self.by_id[test.id] = test
         self.tests[category].append(test)
         for req in test.ref:
             self.testers_of[req].append(test)
+            self.testers_by_category[req, category].append(test)
+        self.coverage.add_test(test.id, test.ref)
 
     def load_comment(self, comment: Comment):
         """
@@ -74,6 +127,8 @@ class Specification:
         Args:
             comment: Comment instance
         """
+        self.generation += 1
+        comment.about = _intern(comment.about)
         self.comments[comment.about].append(comment)
 
     def read_file(self, path: Path, manifest: Manifest | None = None):
@@ -92,18 +147,32 @@ class Specification:
             RuntimeError: If file is empty
             KeyError: If required fields are missing
         """
+        self._read_file(path, manifest, partial(_parse_file, path.resolve(), self.lazy))
+
+    def _read_file(self, path: Path, manifest: Manifest | None, parse: Callable[[], tuple[object, dict]]):
         absolute = path.resolve()
         if absolute in self.loaded_files:
             return
         self.loaded_files.add(absolute)
+        self.file_manifests[absolute] = manifest
+        items = self.items_by_file[absolute]
         display_name = manifest.relative_path(path) if manifest else str(path)
         logger.info('%sLoading %s', f'[{manifest.name}] ' if manifest else '', display_name)
-        if path.suffix == '.toml':
-            with open(absolute, 'rb') as f:
-                data = tomllib.load(f)
+        mtime_ns = os.stat(absolute).st_mtime_ns if self.lazy else 0
+        data, spans = parse()
+        if self.lazy:
+            classes = {'requirements': LazyRequirement, 'tests': LazyTest, 'comments': LazyComment}
         else:
-            with open(absolute, encoding='utf8') as f:
-                data = yaml.safe_load(f)
+            classes = {'requirements': Requirement, 'tests': Test, 'comments': Comment}
+
+        def located(item, section: str, position: int):
+            if self.lazy:
+                span = spans[section][position] if section in spans else None
+                item.forget(Locator(absolute, mtime_ns, section, position, span))
+                data[section][position] = None  # Release its heavy fields, that are read from the file when needed
+            items.append(item)
+            return item
+
         if not data:
             message = f'Empty file "{display_name}"'
             raise RuntimeError(message)
@@ -115,25 +184,31 @@ class Specification:
                     data,
                     ['requirements', 'category'],
                 )
-                for req in data['requirements']:
-                    self.load_requirement(Requirement.from_dict(req, display_name, manifest=manifest), data['category'])
+                for position, req in enumerate(data['requirements']):
+                    requirement = classes['requirements'].from_dict(req, display_name, manifest=manifest)
+                    self.load_requirement(requirement, data['category'])
+                    located(requirement, 'requirements', position)
             case 'tests':
                 ensure_fields(f'Top-level of tests file "{display_name}"', data, ['tests', 'category'])
-                for test in data['tests']:
-                    self.load_test(Test.from_dict(test, display_name, manifest=manifest), data['category'])
+                for position, test in enumerate(data['tests']):
+                    item = classes['tests'].from_dict(test, display_name, manifest=manifest)
+                    self.load_test(item, data['category'])
+                    located(item, 'tests', position)
             case 'comments':
                 ensure_fields(f'Top-level of comments file "{display_name}"', data, ['comments'])
                 default = {'external': False}
                 if 'default' in data:
                     default |= data['default']
-                for comment in data['comments']:
-                    self.load_comment(Comment.from_dict(default | comment, display_name))
+                for position, comment in enumerate(data['comments']):
+                    item = classes['comments'].from_dict(default | comment, display_name)
+                    self.load_comment(item)
+                    located(item, 'comments', position)
             case 'project':
                 ensure_fields(f'Manifest "{display_name}"', data, ['name', 'files'])
                 manifest_dir = absolute.parent
                 root_dir = (manifest_dir / data.get('root_directory', '.')).resolve()
                 logger.debug('%s loads from %s', data['name'], root_dir)
-                link_config = SourceLinkConfig.from_dict(data.get('source_links'), manifest_dir)
+                link_config = SourceLinkConfig.from_dict(data.get('source_links'), manifest_dir, self.git)
                 current_manifest = Manifest(
                     name=data['name'],
                     root_dir=root_dir,
@@ -142,15 +217,34 @@ class Specification:
                     link_config=link_config,
                     parent_manifest=manifest,
                     coverage_categories=data.get('coverage_categories'),
+                    files=data['files'],
+                    comments_csvs=data.get('comments_csvs', []),
                 )
                 self.manifests.append(current_manifest)
-                for pattern in data['files']:
-                    for path in sorted(root_dir.glob(pattern)):
-                        self.read_file(path, manifest=current_manifest)
+                paths = [path for pattern in data['files'] for path in sorted(root_dir.glob(pattern))]
+                for path, parse in zip(paths, self._parsers(paths), strict=True):
+                    self._read_file(path, current_manifest, parse)
                 for pattern in data.get('comments_csvs', []):
                     for path in sorted(root_dir.glob(pattern)):
                         self.read_comment_csv(path, manifest=current_manifest)
 
+    def _parsers(self, paths: list[Path]) -> list[Callable[[], tuple[object, dict]]]:
+        """
+        Return a function giving the content of each file, that raises the parsing error if any.
+
+        With more than one job, the files not yet loaded are parsed beforehand by a pool of processes.
+        They are still validated and loaded one at a time in order, so errors are the same as when serial.
+        """
+        absolutes = [path.resolve() for path in paths]
+        pending = list(dict.fromkeys(path for path in absolutes if path not in self.loaded_files))
+        if self.jobs <= 1 or len(pending) < 2:
+            return [partial(_parse_file, path, self.lazy) for path in absolutes]
+        with ProcessPoolExecutor(max_workers=min(self.jobs, len(pending))) as executor:
+            futures = {path: executor.submit(_parse_file, path, self.lazy) for path in pending}
+        return [
+            futures[path].result if path in futures else partial(_parse_file, path, self.lazy) for path in absolutes
+        ]
+
     def read_comment_csv(self, path: Path, manifest: Manifest | None = None):
         """
         Load comments from a CSV file.
@@ -161,85 +255,332 @@ class Specification:
             path: Path to CSV file
             manifest: The Manifest that caused this file to be loaded, if any
         """
+        absolute = path.resolve()
+        self.file_manifests[absolute] = manifest
+        items = self.items_by_file[absolute]
         display_name = manifest.relative_path(path) if manifest else str(path)
         logger.info('%sLoading %s as comments', f'[{manifest.name}] ' if manifest else '', display_name)
         with open(path, encoding='utf8', newline='') as f:
             reader = csv.DictReader(f)
             for row in reader:
-                self.load_comment(Comment.from_dict(row, display_name))
+                comment = Comment.from_dict(row, display_name)
+                self.load_comment(comment)
+                items.append(comment)
+
+    def unload_file(self, path: Path):
+        """
+        Remove from the specification every requirement, test and comment that was loaded from a file.
+
+        Args:
+            path: Absolute path of a file previously given to read_file or read_comment_csv
+        """
+        self.generation += 1
+        for item in self.items_by_file.pop(path, []):
+            if isinstance(item, Comment):
+                _discard(self.comments, item.about, item)
+                continue
+            if self.by_id.get(item.id) is item:
+                del self.by_id[item.id]
+            if item.kind == 'requirement':
+                _discard(self.requirements, item.category, item)
+                for referred in item.ref or []:
+                    _discard(self.references, referred, item)
+                for tag in item.tags or []:
+                    _discard(self.tags, tag, item)
+                    _discard(self.tags_by_category, (tag, item.category), item)
+            else:
+                _discard(self.tests, item.category, item)
+                for req in item.ref:
+                    _discard(self.testers_of, req, item)
+                    _discard(self.testers_by_category, (req, item.category), item)
+                self.coverage.remove_test(item.id, item.ref)
+        self.loaded_files.discard(path)
+        self.file_manifests.pop(path, None)
+
+    def find_requirements(self, tags: Collection[str] = (), category: str | None = None, any_tag: bool = False) -> list:
+        """
+        Requirements with the given tags and in the given category.
+
+        With several tags, requirements need all of them, or any of them when any_tag is set.
+        Without tag, all the requirements of the category, or all the requirements without category either.
+        Unknown tags and categories match no requirement.
+        """
+        if not tags:
+            if category:
+                return list(self.requirements.get(category, []))
+            return [r for requirements in self.requirements.values() for r in requirements]
+
+        if category:
+            lists = [self.tags_by_category.get((tag, category), []) for tag in tags]
+        else:
+            lists = [self.tags.get(tag, []) for tag in tags]
+        if any_tag:
+            return list({r.id: r for requirements in lists for r in requirements}.values())
+        wanted = set(tags)
+        return [r for r in min(lists, key=len) if wanted.issubset(r.tags)]
+
+    def find_tests(self, tester_of: str | None = None, category: str | None = None) -> list:
+        """
+        Tests of the given requirement and in the given category, all the tests if neither is given.
+
+        Unknown requirements and categories match no test.
+        """
+        if tester_of and category:
+            return list(self.testers_by_category.get((tester_of, category), []))
+        if tester_of:
+            return list(self.testers_of.get(tester_of, []))
+        if category:
+            return list(self.tests.get(category, []))
+        return [t for tests in self.tests.values() for t in tests]
 
     def check_references(self):
         """
-        Validate that all referenced IDs exist.
+        speky:speky#SF018
+
+        Validate that all referenced IDs exist, and that no test is its own prerequisite, even indirectly.
+
+        Requirements may refer to each other: only cycles of prerequisites are errors.
 
         Raises:
-            KeyError: If a referenced ID does not exist
+            ReferenceErrors: Listing every invalid reference and cycle
         """
-        for req in self.by_id.values():
-            if req.ref is None:
-                continue
-            for referred in req.ref:
+        errors = []
+        for item in self.by_id.values():
+            for referred in item.ref or []:
                 if referred not in self.by_id:
-                    message = f'Requirement {referred}, referred from {req.id} in "{req.source_file}", does not exist'
-                    raise KeyError(message)
+                    errors.append(
+                        f'Requirement {referred}, referred from {item.id} in "{item.source_file}", does not exist'
+                    )
+            for prereq in getattr(item, 'prereq', None) or []:
+                if prereq not in self.by_id:
+                    errors.append(f'Test {prereq}, prerequisite of {item.id} in "{item.source_file}", does not exist')
+                elif self.by_id[prereq].kind != 'test':
+                    errors.append(f'{prereq}, prerequisite of {item.id} in "{item.source_file}", is not a test')
         for referred, comment_list in self.comments.items():
             if referred not in self.by_id:
                 source_file = comment_list[0].source_file
-                message = f'Requirement or Test {referred}, referred from a comment in "{source_file}", does not exist'
-                raise KeyError(message)
+                errors.append(
+                    f'Requirement or Test {referred}, referred from a comment in "{source_file}", does not exist'
+                )
+        prerequisites = {
+            test.id: [prereq for prereq in test.prereq or [] if prereq in self.by_id]
+            for tests in self.tests.values()
+            for test in tests
+        }
+        for cycle in _cycles(prerequisites):
+            source_file = self.by_id[cycle[0]].source_file
+            if len(cycle) == 1:
+                errors.append(f'Test {cycle[0]} in "{source_file}" is its own prerequisite')
+            else:
+                errors.append(f'Cycle of prerequisites between tests {", ".join(cycle)}, in "{source_file}"')
+        if errors:
+            raise ReferenceErrors(errors)
 
-    def scan_code_sources(self):
+    def scan_code_sources(self, cache_folder: Path | None = None):
         """
         speky:speky#SF016
 
         Scan declared code sources for speky reference tags.
+
+        Args:
+            cache_folder: Where to persist the scan results, so that unchanged files are not parsed again
         """
-        manifests_with_sources = [m for m in self.manifests if m.code_sources]
-        if not manifests_with_sources:
+        all_files = self.code_source_files()
+        if not all_files:
             return
         from .scanner import scan_sources
 
         manifest_by_name = {m.name.lower(): m for m in self.manifests}
+        for ref in scan_sources(sorted(all_files), set(manifest_by_name), cache_folder, self.jobs):
+            self._load_code_reference(ref, manifest_by_name)
+        unknown = sorted(ref_id for ref_id in self.code_refs_by_id if ref_id not in self.by_id)
+        if unknown:
+            logger.warning('Code references to unknown IDs: %s', ', '.join(unknown))
 
-        # Collect all files, deduplicated by resolved path
+    def code_source_files(self) -> set[Path]:
+        """Return the files matched by the code_sources of all manifests, deduplicated by resolved path."""
         all_files: set[Path] = set()
-        for manifest in manifests_with_sources:
+        for manifest in self.manifests:
             for pattern in manifest.code_sources:
                 for path in manifest.root_dir.glob(pattern):
                     all_files.add(path.resolve())
+        return all_files
 
-        logger.info('Scanning %d unique source file(s)', len(all_files))
-        for ref in scan_sources(sorted(all_files), set(manifest_by_name)):
-            manifest = manifest_by_name[ref.project]
-            ref.manifest = manifest
-            base_url = manifest.link_config.url_for(ref.file)
-            if base_url:
-                ref.url = f'{base_url}#L{ref.line}'
-            self.code_refs_by_id[ref.target_id].append(ref)
-        unknown = sorted(ref_id for ref_id in self.code_refs_by_id if ref_id not in self.by_id)
-        if unknown:
-            logger.warning('Code references to unknown IDs: %s', ', '.join(unknown))
+    def rescan_code_source(self, path: Path):
+        """
+        Replace the code references found in one source file, or remove them if the file no longer exists.
+
+        Args:
+            path: Absolute path of the source file
+        """
+        from .scanner import scan_sources
+
+        self.generation += 1
+        for ref in self.code_refs_by_file.pop(path, []):
+            _discard(self.code_refs_by_id, ref.target_id, ref)
+            if ref.is_test:
+                self.coverage.remove_automation(ref.target_id)
+        if path.is_file():
+            manifest_by_name = {m.name.lower(): m for m in self.manifests}
+            for ref in scan_sources([path], set(manifest_by_name)):
+                self._load_code_reference(ref, manifest_by_name)
+
+    def _load_code_reference(self, ref, manifest_by_name: dict[str, Manifest]):
+        self.generation += 1
+        ref.target_id = _intern(ref.target_id)
+        ref.project = _intern(ref.project)
+        manifest = manifest_by_name[ref.project]
+        ref.manifest = manifest
+        base_url = manifest.link_config.url_for(ref.file)
+        if base_url:
+            ref.url = f'{base_url}#L{ref.line}'
+        self.code_refs_by_id[ref.target_id].append(ref)
+        self.code_refs_by_file[ref.file].append(ref)
+        if ref.is_test:
+            self.coverage.add_automation(ref.target_id)
+
+    def search_index(self):
+        """
+        speky:speky_mcp#MCP021
+
+        The full-text index of requirements and tests, built on first use and again after changes.
+        """
+        from .search import SearchIndex
+
+        if self._search_index is None or self._search_index.generation != self.generation:
+            self._search_index = SearchIndex(self)
+        return self._search_index
+
+    def traceability_graph(self):
+        """
+        speky:speky_mcp#MCP023
+
+        The graph of the dependencies between requirements and tests, built on first use and again after changes.
+        """
+        from .graph import TraceabilityGraph
+
+        if self._traceability_graph is None or self._traceability_graph.generation != self.generation:
+            self._traceability_graph = TraceabilityGraph(self)
+        return self._traceability_graph
+
+    def coverage_summary(self):
+        """
+        speky:speky#SF020
+
+        The coverage statistics by tag, tag group, category and manifest, computed on first use and again after changes.
+        """
+        if self._coverage_summary is None or self._coverage_summary.generation != self.generation:
+            self._coverage_summary = CoverageSummary(self)
+        return self._coverage_summary
 
     def is_test_automated(self, test_id: str) -> bool:
         """True if the test has at least one code reference flagged as a test function."""
-        return any(r.is_test for r in self.code_refs_by_id.get(test_id, []))
+        return self.coverage.is_automated(test_id)
 
     def compute_coverage(self):
-        """Compute coverage buckets for each manifest that declares coverage_categories."""
+        """
+        speky:speky#SF019
+
+        Compute coverage buckets for each manifest that declares coverage_categories.
+
+        The status of each requirement is read from the coverage engine, kept up to date as tests and code change.
+        """
+        self.generation += 1
+        categories = {category for manifest in self.manifests for category in manifest.coverage_categories}
+        by_manifest: dict[tuple[int, str], list] = defaultdict(list)
+        for category in categories:
+            for requirement in self.requirements.get(category, []):
+                by_manifest[id(requirement.manifest), category].append(requirement)
         for manifest in self.manifests:
             for category in manifest.coverage_categories:
-                requirements = [r for r in self.requirements.get(category, []) if r.manifest is manifest]
-                automated, partial, manual, no_plan = [], [], [], []
-                for r in sorted(requirements):
-                    if r.id not in self.testers_of:
-                        no_plan.append(r)
-                    else:
-                        tests = self.testers_of[r.id]
-                        auto_count = sum(1 for t in tests if self.is_test_automated(t.id))
-                        if auto_count == len(tests):
-                            automated.append(r)
-                        elif auto_count == 0:
-                            manual.append(r)
-                        else:
-                            partial.append(r)
-                manifest.coverage[category] = (automated, partial, manual, no_plan)
+                buckets = tuple([] for _ in STATUSES)
+                for requirement in sorted(by_manifest.get((id(manifest), category), [])):
+                    buckets[self.coverage.status(requirement.id)].append(requirement)
+                manifest.coverage[category] = buckets
+
+
+def _intern(value):
+    """
+    Return the canonical copy of an identifier, tag or category.
+
+    The same strings are found in many items and indexes: interning them stores each one once,
+    and lets dictionary lookups succeed on identity before comparing characters.
+    """
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def _intern_all(values: list | None) -> list | None:
+    return [_intern(value) for value in values] if isinstance(values, list) else values
+
+
+def _parse_file(path: Path, spans: bool = False) -> tuple[object, dict]:
+    """
+    Parse a YAML or TOML file into plain Python objects.
+
+    Returns:
+        The content of the file, and the spans of its items if asked for and it is a YAML file
+    """
+    if path.suffix == '.toml':
+        with open(path, 'rb') as f:
+            return tomllib.load(f), {}
+    if spans:
+        return parse_yaml_with_spans(path)
+    with open(path, encoding='utf8') as f:
+        return load_yaml(f), {}
+
+
+def _cycles(graph: dict[str, list[str]]) -> list[list[str]]:
+    """
+    The cycles of a directed graph: its strongly connected components of several nodes, or with a loop.
+
+    Iterative version of Tarjan's algorithm, linear in the number of nodes and edges.
+    """
+    index: dict[str, int] = {}
+    lowlink: dict[str, int] = {}
+    stack: list[str] = []
+    on_stack: set[str] = set()
+    cycles = []
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(graph[root]))]
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, successors = work[-1]
+            successor = next(successors, None)
+            if successor is not None:
+                if successor not in index:
+                    index[successor] = lowlink[successor] = len(index)
+                    stack.append(successor)
+                    on_stack.add(successor)
+                    work.append((successor, iter(graph.get(successor, []))))
+                elif successor in on_stack:
+                    lowlink[node] = min(lowlink[node], index[successor])
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index[node]:
+                component = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    component.append(member)
+                    if member == node:
+                        break
+                if len(component) > 1 or node in graph.get(node, []):
+                    cycles.append(sorted(component))
+    return sorted(cycles)
+
+
+def _discard(index: dict[str, list], key: str, item):
+    """Remove an item from one of the lists of an index, and the key once its list is empty."""
+    items = index.get(key)
+    if items is None:
+        return
+    items[:] = [other for other in items if other is not item]
+    if not items:
+        del index[key]
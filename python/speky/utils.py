@@ -2,9 +2,21 @@
 
 import logging
 
+import yaml
+
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:  # PyYAML built without libyaml
+    from yaml import SafeLoader as YamlLoader
+
 logger = logging.getLogger(__name__)
 
 
+def load_yaml(stream):
+    """Parse a YAML document with the fastest safe loader available."""
+    return yaml.load(stream, Loader=YamlLoader)
+
+
 def import_fields(destination, source: dict, fields: list[str]):
     """
     Creates members to the destination objects, that have the name and values
@@ -0,0 +1,52 @@
+"""Cache of the encoded results of tool calls."""
+
+import json
+import threading
+from collections import OrderedDict
+
+from speky.specification import Specification
+
+
+class ResponseCache:
+    """
+    speky:speky_mcp#MCP020
+
+    The JSON encoding of tool results, by tool name and arguments, for the latest specification only.
+
+    Entries are dropped when the specification is replaced or changes, and the least recently used ones
+    when there are more than max_entries. Thread-safe, to be shared by the threads handling requests.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.entries: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self.specs: Specification | None = None
+        self.generation = -1
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def key(tool_name: str, arguments) -> tuple[str, str]:
+        """The same key for the same arguments, whatever the order of their fields."""
+        return tool_name, json.dumps(arguments, sort_keys=True, separators=(',', ':'))
+
+    def get(self, key: tuple[str, str], specs: Specification) -> str | None:
+        with self.lock:
+            self._follow(specs)
+            encoded = self.entries.get(key)
+            if encoded is not None:
+                self.entries.move_to_end(key)
+            return encoded
+
+    def put(self, key: tuple[str, str], specs: Specification, encoded: str):
+        with self.lock:
+            if self.max_entries < 1 or specs is not self.specs or specs.generation != self.generation:
+                return  # The specification changed while the result was computed
+            self.entries[key] = encoded
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def _follow(self, specs: Specification):
+        if specs is not self.specs or specs.generation != self.generation:
+            self.entries.clear()
+            self.specs = specs
+            self.generation = specs.generation
@@ -6,20 +6,27 @@ speky:speky_mcp#MCP002
 """
 
 import argparse
+import asyncio
 import importlib.resources
 import json
 import logging
 import logging.config
 import sys
 import tomllib
+from concurrent.futures import ThreadPoolExecutor
 from importlib.metadata import version
 from pathlib import Path
+from typing import TextIO
 
 import yaml
+from speky.snapshot import load_snapshot
 from speky.specification import Specification
+from speky.utils import YamlLoader
 
+from .cache import ResponseCache
 from .protocol import JsonRpcError, ToolError, protocol_error, tool_error, tool_result
 from .tools import TOOL_DEFINITIONS, TOOLS
+from .watch import Watcher
 
 assets = importlib.resources.files('speky').joinpath('assets')
 default_logging_file = assets.joinpath('logging.yaml')
@@ -51,14 +58,22 @@ def run(argv: list[str] | None = None):
         description='MCP server for querying Speky specifications',
         epilog='Copyright (c) 2025-2026 Antoine GAGNIERE',
     )
-    parser.add_argument('-v', '--version', action='version', version='%(prog)s ' + version('speky'))
+    parser.add_argument(
+        '-v', '--version', action='version', version=f'%(prog)s {version("speky")} (YAML: {YamlLoader.__name__})'
+    )
     parser.add_argument(
         'paths',
         type=str,
         metavar='FILE',
-        nargs='+',
+        nargs='*',
         help='Path(s) to YAML or TOML files containing requirements, tests, comments, or a manifest',
     )
+    parser.add_argument(
+        '--snapshot',
+        type=Path,
+        metavar='FILE',
+        help='Load the specification from a snapshot written by speky --snapshot, instead of from FILEs',
+    )
     parser.add_argument(
         '-C',
         '--comment-csv',
@@ -75,14 +90,86 @@ def run(argv: list[str] | None = None):
         default=default_logging_file,
         help='Specify a custom config file of the logging library',
     )
+    parser.add_argument(
+        '-j',
+        '--jobs',
+        type=int,
+        metavar='N',
+        default=1,
+        help='The number of processes used to parse specification files and code sources',
+    )
+    parser.add_argument(
+        '--cache-dir',
+        type=Path,
+        metavar='PATH',
+        help='The folder where to cache the tags found in code sources, to skip parsing unchanged files',
+    )
+    parser.add_argument(
+        '--lazy',
+        action='store_true',
+        help='Keep only the fields used to list and search items in memory, and read the others when requested',
+    )
+    parser.add_argument(
+        '-w',
+        '--watch',
+        action='store_true',
+        help='Reload the specification and code sources files when they change, without restarting',
+    )
+    parser.add_argument(
+        '--watch-interval',
+        type=float,
+        metavar='SECONDS',
+        default=1.0,
+        help='How often to look for changes in watch mode',
+    )
+    parser.add_argument(
+        '--max-concurrency',
+        type=int,
+        metavar='N',
+        default=4,
+        help='How many requests can be handled at the same time, their responses may be written out of order',
+    )
+    parser.add_argument(
+        '--response-cache',
+        type=int,
+        metavar='N',
+        default=256,
+        help='How many tool results to keep, to answer repeated calls without computing them again (0 to disable)',
+    )
 
     args = parser.parse_args(argv)
+    if args.max_concurrency < 1:
+        parser.error('--max-concurrency must be at least 1')
+    if args.snapshot and (args.paths or args.comment_csvs):
+        parser.error('specification files cannot be combined with --snapshot')
+    if not args.snapshot and not args.paths:
+        parser.error('either specification files or --snapshot are required')
+    if args.snapshot and args.watch:
+        parser.error('--watch needs the specification files, it cannot be combined with --snapshot')
+    if args.snapshot and args.lazy:
+        parser.error('--lazy needs the specification files, it cannot be combined with --snapshot')
 
     logging_config_file = Path(args.logging_config)
     with logging_config_file.open() as f:
         logging.config.dictConfig(yaml.safe_load(f))
+    logger.debug('Parsing YAML with %s', YamlLoader.__name__)
+
+    specs = load_specification(args)
+    logger.info('Specifications loaded successfully')
 
-    specs = Specification()
+    watcher = None
+    if args.watch:
+        watcher = Watcher(specs, lambda: load_specification(args), args.watch_interval)
+        watcher.start()
+
+    run_server(specs, watcher, args.max_concurrency, args.response_cache)
+
+
+def load_specification(args: argparse.Namespace) -> Specification:
+    """Build a Specification from the command-line arguments."""
+    if args.snapshot:
+        return load_snapshot(args.snapshot, args.jobs)
+    specs = Specification(jobs=args.jobs, lazy=args.lazy)
     for filename in args.paths:
         specs.read_file(Path(filename))
     if args.comment_csvs:
@@ -90,47 +177,162 @@ def run(argv: list[str] | None = None):
             specs.read_comment_csv(Path(filename))
 
     specs.check_references()
-    specs.scan_code_sources()
+    specs.scan_code_sources(args.cache_dir)
     specs.compute_coverage()
-
-    logger.info('Specifications loaded successfully')
-
-    run_server(specs)
+    if not specs.lazy:
+        # In lazy mode, indexing reads every heavy field back from disk: leave it to the first search
+        specs.search_index()
+    specs.traceability_graph()
+    specs.coverage_summary()
+    return specs
 
 
-def run_server(specs: Specification):
+def run_server(specs: Specification, watcher: Watcher | None = None, max_concurrency: int = 1, cache_size: int = 0):
     """
     speky:speky_mcp#MCP002
     """
     logger.info('MCP server ready, waiting for requests')
+    asyncio.run(Server(specs, watcher, max_concurrency, cache_size).serve(sys.stdin, sys.stdout))
+
+
+class Server:
+    """
+    speky:speky_mcp#MCP016
+    speky:speky_mcp#MCP017
+
+    Read JSON-RPC messages line by line, and handle tool calls concurrently in a pool of threads.
 
-    initialized = False
+    The initialization and notifications, that change the state of the session, are handled in order before reading
+    the next line. Responses are written by the event loop only, one complete line at a time.
+    A batch is answered with a single array, once all of its requests are handled.
+    The results of tool calls are kept already encoded, to answer the same calls again until the specification changes.
+    """
 
-    for line in sys.stdin:
-        line = line.strip()
-        if not line:
-            continue
+    def __init__(
+        self, specs: Specification, watcher: Watcher | None = None, max_concurrency: int = 1, cache_size: int = 0
+    ):
+        self.specs = specs
+        self.watcher = watcher
+        self.max_concurrency = max_concurrency
+        self.cache = ResponseCache(cache_size) if cache_size > 0 else None
+        self.initialized = False
+        self.in_flight: set[asyncio.Task] = set()
+        self.output: TextIO | None = None
+
+    async def serve(self, input_stream: TextIO, output_stream: TextIO):
+        """Answer the messages of the input stream until it is closed."""
+        self.output = output_stream
+        slots = asyncio.Semaphore(self.max_concurrency)
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='speky-mcp') as executor:
+            while line := await asyncio.to_thread(input_stream.readline):
+                line = line.strip()
+                if not line:
+                    continue
+                await self.refresh()
+
+                try:
+                    message = json.loads(line)
+                except json.JSONDecodeError as e:
+                    logger.error('Invalid JSON: %s', e)
+                    self.write(protocol_error(None, JsonRpcError.PARSE_ERROR, 'Parse error'))
+                    continue
+
+                batch = isinstance(message, list) and len(message) > 0
+                await slots.acquire()
+                pending = [self.start(request, executor) for request in (message if batch else [message])]
+                if all(future.done() for future in pending):
+                    slots.release()
+                    self.reply([future.result() for future in pending], batch)
+                    continue
+                task = asyncio.create_task(self.reply_when_done(pending, batch, slots))
+                self.in_flight.add(task)
+                task.add_done_callback(self.in_flight.discard)
+            await self.drain()
+
+    async def refresh(self):
+        """Apply the changes detected by the watcher, once the requests being handled are done."""
+        if self.watcher and self.watcher.has_changes():
+            await self.drain()
+            self.specs = self.watcher.apply(self.specs)
+
+    async def drain(self):
+        if self.in_flight:
+            await asyncio.wait(self.in_flight)
+
+    def start(self, request, executor: ThreadPoolExecutor) -> asyncio.Future:
+        """Handle a request in the pool of threads, or right away if it is invalid or changes the session."""
+        loop = asyncio.get_running_loop()
+        if isinstance(request, dict) and self.initialized and 'id' in request and request.get('method') != 'initialize':
+            return loop.run_in_executor(executor, self.handle, request, self.specs)
+        future = loop.create_future()
+        if isinstance(request, dict):
+            future.set_result(self.answer(request, self.handle(request, self.specs)))
+        else:
+            future.set_result(protocol_error(None, JsonRpcError.INVALID_REQUEST, 'Invalid request'))
+        return future
+
+    async def reply_when_done(self, pending: list[asyncio.Future], batch: bool, slots: asyncio.Semaphore):
+        try:
+            self.reply(await asyncio.gather(*pending), batch)
+        finally:
+            slots.release()
 
+    def handle(self, request: dict, specs: Specification) -> dict | str:
         try:
-            request = json.loads(line)
-            response = handle_request(request, specs, initialized)
-
-            if request.get('method') == 'initialize' and 'error' not in response:
-                initialized = True
-            elif request.get('method') == 'notifications/initialized':
-                logger.info('Client initialization complete')
-                continue  # Notifications don't get responses
-
-            json.dump(response, sys.stdout, sort_keys=True)
-            sys.stdout.write('\n')
-            sys.stdout.flush()
-
-        except json.JSONDecodeError as e:
-            logger.error('Invalid JSON: %s', e)
-            error_response = protocol_error(None, JsonRpcError.PARSE_ERROR, 'Parse error')
-            json.dump(error_response, sys.stdout, sort_keys=True)
-            sys.stdout.write('\n')
-            sys.stdout.flush()
+            if self.cache and self.initialized and request.get('method') == 'tools/call':
+                return self.call_tool_cached(request, specs)
+            return handle_request(request, specs, self.initialized)
+        except Exception:
+            logger.exception('Failed to handle %s', request.get('method'))
+            return protocol_error(request.get('id'), JsonRpcError.INTERNAL_ERROR, 'Internal error')
+
+    def call_tool_cached(self, request: dict, specs: Specification) -> dict | str:
+        """
+        speky:speky_mcp#MCP020
+
+        Answer a tool call with its cached result if any, or cache its result.
+
+        Returns:
+            The response already encoded, or a protocol error
+        """
+        params = request.get('params', {})
+        key = ResponseCache.key(params.get('name'), params.get('arguments', {}))
+        encoded = self.cache.get(key, specs)
+        if encoded is None:
+            response = handle_request(request, specs, self.initialized)
+            if 'result' not in response:
+                return response
+            encoded = json.dumps(response['result'], sort_keys=True)
+            self.cache.put(key, specs, encoded)
+        # Like json.dumps(tool_result(...), sort_keys=True), without encoding the result again
+        return f'{{"id": {json.dumps(request.get("id"))}, "jsonrpc": "2.0", "result": {encoded}}}'
+
+    def answer(self, request: dict, response: dict) -> dict | None:
+        """Update the session, and return the response unless the request is a notification."""
+        if request.get('method') == 'initialize' and 'error' not in response:
+            self.initialized = True
+        elif request.get('method') == 'notifications/initialized':
+            logger.info('Client initialization complete')
+        return response if 'id' in request else None
+
+    def reply(self, responses: list[dict | str | None], batch: bool):
+        """Write the responses to a message, if any: notifications are not answered, even in a batch."""
+        responses = [response for response in responses if response is not None]
+        if responses:
+            self.write(responses if batch else responses[0])
+
+    def write(self, response: dict | str | list[dict | str]):
+        """Write a response, or a list of responses, some of them being already encoded."""
+        if isinstance(response, list):
+            self.output.write(f'[{", ".join(map(_encode, response))}]')
+        else:
+            self.output.write(_encode(response))
+        self.output.write('\n')
+        self.output.flush()
+
+
+def _encode(response: dict | str) -> str:
+    return response if isinstance(response, str) else json.dumps(response, sort_keys=True)
 
 
 def handle_request(request: dict, specs: Specification, initialized: bool) -> dict:
@@ -1,53 +1,63 @@
 """MCP tool handlers for Speky specifications."""
 
+from collections.abc import Collection
 from typing import Callable
 
+from speky.coverage import DIMENSIONS
 from speky.specification import Specification
 
 from .protocol import ToolError
 
-
-def handle_get_requirement(arguments: dict, specs: Specification) -> dict:
-    """speky:speky_mcp#MCP003"""
-    requirement_id = arguments['id']
-
-    if requirement_id not in specs.by_id:
-        raise ToolError(f'Requirement {requirement_id} not found')
-
-    requirement = specs.by_id[requirement_id]
-
-    if requirement.kind != 'requirement':
-        raise ToolError(f'{requirement_id} is a {requirement.kind}, not a requirement')
-
-    content = {
-        'category': requirement.category,
-        'id': requirement.id,
-        'long': requirement.long,
-        'source_file': requirement.source_file,
-    }
-
-    if requirement.short:
+REQUIREMENT_FIELDS = (
+    'category',
+    'client_statement',
+    'code_references',
+    'comments',
+    'long',
+    'properties',
+    'ref',
+    'referenced_by',
+    'short',
+    'source_file',
+    'tags',
+    'tested_by',
+)
+TEST_FIELDS = ('category', 'code_references', 'initial', 'long', 'prereq', 'ref', 'short', 'source_file', 'steps')
+
+
+def requirement_record(requirement, specs: Specification, fields: Collection[str] = REQUIREMENT_FIELDS) -> dict:
+    """The details of a requirement: its ID, and the given fields when they have a value."""
+    requirement_id = requirement.id
+    content = {'id': requirement_id}
+
+    if 'category' in fields:
+        content['category'] = requirement.category
+    if 'long' in fields:
+        content['long'] = requirement.long
+    if 'source_file' in fields:
+        content['source_file'] = requirement.source_file
+    if 'short' in fields and requirement.short:
         content['short'] = requirement.short
-    if requirement.tags:
+    if 'tags' in fields and requirement.tags:
         content['tags'] = requirement.tags
-    if requirement.client_statement:
+    if 'client_statement' in fields and requirement.client_statement:
         content['client_statement'] = requirement.client_statement
-    if requirement.properties:
+    if 'properties' in fields and requirement.properties:
         content['properties'] = requirement.properties
-    if requirement.ref:
+    if 'ref' in fields and requirement.ref:
         content['ref'] = [
             referred.json_oneliner(False) for referred in sorted(map(specs.by_id.__getitem__, requirement.ref))
         ]
-    if requirement_id in specs.references:
+    if 'referenced_by' in fields and requirement_id in specs.references:
         content['referenced_by'] = [ref.json_oneliner(False) for ref in sorted(specs.references[requirement_id])]
-    if requirement_id in specs.testers_of:
+    if 'tested_by' in fields and requirement_id in specs.testers_of:
         content['tested_by'] = [test.json_oneliner(False) for test in sorted(specs.testers_of[requirement_id])]
-    if requirement_id in specs.comments:
+    if 'comments' in fields and requirement_id in specs.comments:
         content['comments'] = [
-            {k: v for k, v in comment.__dict__.items() if k in ('date', 'external', 'from', 'text')}
+            {field: getattr(comment, field) for field in ('date', 'external', 'from', 'text')}
             for comment in specs.comments[requirement_id]
         ]
-    if requirement_id in specs.code_refs_by_id:
+    if 'code_references' in fields and requirement_id in specs.code_refs_by_id:
         content['code_references'] = [
             {
                 k: v
@@ -59,36 +69,30 @@ def handle_get_requirement(arguments: dict, specs: Specification) -> dict:
     return content
 
 
-def handle_get_test(arguments: dict, specs: Specification) -> dict:
-    """speky:speky_mcp#MCP004"""
-    test_id = arguments['id']
-
-    if test_id not in specs.by_id:
-        raise ToolError(f'Test {test_id} not found')
-
-    test = specs.by_id[test_id]
-
-    if test.kind != 'test':
-        raise ToolError(f'{test_id} is a {test.kind}, not a test')
-
-    content = {
-        'category': test.category,
-        'id': test.id,
-        'long': test.long,
-        'ref': [referred.json_oneliner(False) for referred in sorted(map(specs.by_id.__getitem__, test.ref))],
-        'source_file': test.source_file,
-        'steps': test.steps,
-    }
-
-    if test.short:
+def test_record(test, specs: Specification, fields: Collection[str] = TEST_FIELDS) -> dict:
+    """The details of a test: its ID, and the given fields when they have a value."""
+    test_id = test.id
+    content = {'id': test_id}
+
+    if 'category' in fields:
+        content['category'] = test.category
+    if 'long' in fields:
+        content['long'] = test.long
+    if 'ref' in fields:
+        content['ref'] = [referred.json_oneliner(False) for referred in sorted(map(specs.by_id.__getitem__, test.ref))]
+    if 'source_file' in fields:
+        content['source_file'] = test.source_file
+    if 'steps' in fields:
+        content['steps'] = test.steps
+    if 'short' in fields and test.short:
         content['short'] = test.short
-    if test.initial:
+    if 'initial' in fields and test.initial:
         content['initial'] = test.initial
-    if test.prereq:
+    if 'prereq' in fields and test.prereq:
         content['prereq'] = [
             prereq_test.json_oneliner(False) for prereq_test in sorted(map(specs.by_id.__getitem__, test.prereq))
         ]
-    if test_id in specs.code_refs_by_id:
+    if 'code_references' in fields and test_id in specs.code_refs_by_id:
         content['code_references'] = [
             {
                 k: v
@@ -106,26 +110,113 @@ def handle_get_test(arguments: dict, specs: Specification) -> dict:
     return content
 
 
-def handle_search_requirements(arguments: dict, specs: Specification) -> dict:
-    """speky:speky_mcp#MCP005"""
-    tag = arguments.get('tag')
+def _get_item(item_id: str, kind: str, specs: Specification):
+    if item_id not in specs.by_id:
+        raise ToolError(f'{kind.capitalize()} {item_id} not found')
+    item = specs.by_id[item_id]
+    if item.kind != kind:
+        raise ToolError(f'{item_id} is a {item.kind}, not a {kind}')
+    return item
+
+
+def _get_items(ids: list[str], kind: str, specs: Specification) -> list:
+    """Look up items by ID, in the given order without duplicates, reporting every invalid ID at once."""
+    ids = list(dict.fromkeys(ids))
+    unknown = [item_id for item_id in ids if item_id not in specs.by_id]
+    if unknown:
+        raise ToolError(f'{kind.capitalize()}(s) not found: {", ".join(map(str, unknown))}')
+    others = [item_id for item_id in ids if specs.by_id[item_id].kind != kind]
+    if others:
+        raise ToolError(f'Not {kind}s: {", ".join(others)}')
+    return [specs.by_id[item_id] for item_id in ids]
+
+
+def _projection(arguments: dict, all_fields: tuple[str, ...]) -> Collection[str]:
+    fields = arguments.get('fields')
+    if fields is None:
+        return all_fields
+    if not isinstance(fields, list) or not all(isinstance(field, str) for field in fields):
+        raise ToolError(f'The fields must be a list of field names, not {fields!r}')
+    unknown = sorted(set(fields) - set(all_fields) - {'id'})
+    if unknown:
+        raise ToolError(f'Unknown field(s): {", ".join(unknown)}. Valid fields are: {", ".join(all_fields)}')
+    return frozenset(fields)
+
+
+def _filter_requirements(specs: Specification, arguments: dict) -> list:
+    """
+    speky:speky_mcp#MCP022
+
+    Requirements matching the tag, tags, tag_mode and category arguments, all of them if none is given.
+    """
+    tags = list(arguments.get('tags') or [])
+    if tag := arguments.get('tag'):
+        tags.append(tag)
     category = arguments.get('category')
+    tag_mode = arguments.get('tag_mode', 'all')
 
-    if tag and tag not in specs.tags:
-        raise ToolError(f'Tag {tag!r} not found')
+    for tag in tags:
+        if tag not in specs.tags:
+            raise ToolError(f'Tag {tag!r} not found')
     if category and category not in specs.requirements:
         raise ToolError(f'Category {category!r} not found')
+    if tag_mode not in ('all', 'any'):
+        raise ToolError(f"Tag mode {tag_mode!r} is neither 'all' nor 'any'")
+    return specs.find_requirements(tags, category, any_tag=tag_mode == 'any')
+
+
+def _filter_tests(specs: Specification, tester_of: str | None, category: str | None) -> list:
+    """Tests of the given requirement and in the given category, all of them if neither is given."""
+    if tester_of and tester_of not in specs.by_id:
+        raise ToolError(f'Requirement {tester_of!r} not found')
+    if category and category not in specs.tests:
+        raise ToolError(f'Category {category!r} not found')
+    return specs.find_tests(tester_of, category)
+
+
+def handle_get_requirement(arguments: dict, specs: Specification) -> dict:
+    """speky:speky_mcp#MCP003"""
+    return requirement_record(_get_item(arguments['id'], 'requirement', specs), specs)
+
+
+def handle_get_test(arguments: dict, specs: Specification) -> dict:
+    """speky:speky_mcp#MCP004"""
+    return test_record(_get_item(arguments['id'], 'test', specs), specs)
+
+
+def handle_get_requirements(arguments: dict, specs: Specification) -> dict:
+    """speky:speky_mcp#MCP018"""
+    fields = _projection(arguments, REQUIREMENT_FIELDS)
+
+    if 'ids' in arguments:
+        requirements = _get_items(arguments['ids'], 'requirement', specs)
+        if arguments.get('tag') or arguments.get('tags') or arguments.get('category'):
+            selected = set(map(id, _filter_requirements(specs, arguments)))
+            requirements = [r for r in requirements if id(r) in selected]
+    else:
+        requirements = sorted(_filter_requirements(specs, arguments))
+    return {'requirements': [requirement_record(r, specs, fields) for r in requirements]}
+
+
+def handle_get_tests(arguments: dict, specs: Specification) -> dict:
+    """speky:speky_mcp#MCP019"""
+    fields = _projection(arguments, TEST_FIELDS)
+    tester_of = arguments.get('tester_of')
+    category = arguments.get('category')
 
-    if tag and category:
-        by_tag = {r.id for r in specs.tags[tag]}
-        candidates = [r for r in specs.requirements[category] if r.id in by_tag]
-    elif tag:
-        candidates = specs.tags[tag]
-    elif category:
-        candidates = specs.requirements[category]
+    if 'ids' in arguments:
+        tests = _get_items(arguments['ids'], 'test', specs)
+        if tester_of or category:
+            selected = set(map(id, _filter_tests(specs, tester_of, category)))
+            tests = [t for t in tests if id(t) in selected]
     else:
-        candidates = [r for reqs in specs.requirements.values() for r in reqs]
+        tests = sorted(_filter_tests(specs, tester_of, category))
+    return {'tests': [test_record(t, specs, fields) for t in tests]}
 
+
+def handle_search_requirements(arguments: dict, specs: Specification) -> dict:
+    """speky:speky_mcp#MCP005"""
+    candidates = _filter_requirements(specs, arguments)
     requirements = sorted(
         (r.json_oneliner(True) for r in candidates),
         key=lambda r: r['id'],
@@ -144,6 +235,27 @@ def handle_list_references_to(arguments: dict, specs: Specification) -> dict:
     return {'requirements': requirements}
 
 
+def handle_impact_of(arguments: dict, specs: Specification) -> dict:
+    """speky:speky_mcp#MCP023"""
+    item_id = arguments['id']
+    max_depth = arguments.get('max_depth')
+
+    if not isinstance(item_id, str) or item_id not in specs.by_id:
+        raise ToolError(f'Requirement or test {item_id} not found')
+    if max_depth is not None and (not isinstance(max_depth, int) or isinstance(max_depth, bool)):
+        raise ToolError(f'The maximum depth must be an integer, not {max_depth!r}')
+    if max_depth is not None and max_depth < 1:
+        raise ToolError(f'The maximum depth must be at least 1, not {max_depth}')
+
+    impacted = []
+    for impact in specs.traceability_graph().impact_of(item_id, max_depth):
+        item = specs.by_id[impact.item_id]
+        entry = item.json_oneliner(False)
+        entry |= {'kind': item.kind, 'depth': impact.depth, 'via': impact.via, 'relation': impact.relation}
+        impacted.append(entry)
+    return {'id': item_id, 'impacted': impacted}
+
+
 def handle_test_plan_coverage(arguments: dict, specs: Specification) -> dict:
     """speky:speky_mcp#MCP010"""
     category = arguments.get('category')
@@ -169,31 +281,20 @@ def handle_test_plan_coverage(arguments: dict, specs: Specification) -> dict:
     }
 
 
-def handle_least_tested_requirements(arguments: dict, specs: Specification) -> dict:
-    """speky:speky_mcp#MCP012"""
-    tag = arguments.get('tag')
-    category = arguments.get('category')
-
-    if tag and tag not in specs.tags:
-        raise ToolError(f'Tag {tag!r} not found')
-    if category and category not in specs.requirements:
-        raise ToolError(f'Category {category!r} not found')
+def handle_coverage_summary(arguments: dict, specs: Specification) -> dict:
+    """speky:speky_mcp#MCP024"""
+    dimension = arguments.get('by')
+    if dimension is not None and dimension not in DIMENSIONS:
+        raise ToolError(f'Cannot group requirements by {dimension!r}, only by {", ".join(DIMENSIONS)}')
+    return {'groups': [stats._asdict() for stats in specs.coverage_summary().stats(dimension)]}
 
-    if tag and category:
-        by_tag = {r.id for r in specs.tags[tag]}
-        candidates = [r for r in specs.requirements[category] if r.id in by_tag]
-    elif tag:
-        candidates = specs.tags[tag]
-    elif category:
-        candidates = specs.requirements[category]
-    else:
-        candidates = [r for reqs in specs.requirements.values() for r in reqs]
 
+def handle_least_tested_requirements(arguments: dict, specs: Specification) -> dict:
+    """speky:speky_mcp#MCP012"""
+    candidates = _filter_requirements(specs, arguments)
     results = []
     for r in candidates:
-        tests = specs.testers_of.get(r.id, [])
-        total = len(tests)
-        automated = sum(1 for t in tests if specs.is_test_automated(t.id))
+        total, automated = specs.coverage.counts(r.id)
         entry = {
             'id': r.id,
             'category': r.category,
@@ -212,26 +313,29 @@ def handle_least_tested_requirements(arguments: dict, specs: Specification) -> d
 
 def handle_search_tests(arguments: dict, specs: Specification) -> dict:
     """speky:speky_mcp#MCP011"""
-    tester_of = arguments.get('tester_of')
-    category = arguments.get('category')
+    candidates = _filter_tests(specs, arguments.get('tester_of'), arguments.get('category'))
+    tests = sorted((t.json_oneliner(True) for t in candidates), key=lambda t: t['id'])
+    return {'tests': tests}
 
-    if tester_of and tester_of not in specs.by_id:
-        raise ToolError(f'Requirement {tester_of!r} not found')
-    if category and category not in specs.tests:
-        raise ToolError(f'Category {category!r} not found')
 
-    if tester_of and category:
-        by_tester = {t.id for t in specs.testers_of[tester_of]}
-        candidates = [t for t in specs.tests[category] if t.id in by_tester]
-    elif tester_of:
-        candidates = specs.testers_of[tester_of]
-    elif category:
-        candidates = specs.tests[category]
-    else:
-        candidates = [t for tests in specs.tests.values() for t in tests]
+def handle_search_text(arguments: dict, specs: Specification) -> dict:
+    """speky:speky_mcp#MCP021"""
+    query = arguments.get('query', '')
+    kind = arguments.get('kind')
+    if not query.strip():
+        raise ToolError(f'The query {query!r} has no word to look for')
+    if kind not in (None, 'requirement', 'test'):
+        raise ToolError(f"Kind {kind!r} is neither 'requirement' nor 'test'")
 
-    tests = sorted((t.json_oneliner(True) for t in candidates), key=lambda t: t['id'])
-    return {'tests': tests}
+    count = arguments.get('count')
+    if not count or count < 1:
+        count = 20
+    results = []
+    for hit in specs.search_index().search(query, kind, count):
+        entry = hit.item.json_oneliner(False)
+        entry |= {'kind': hit.item.kind, 'score': round(hit.score, 3), 'field': hit.field, 'snippet': hit.snippet}
+        results.append(entry)
+    return {'results': results}
 
 
 def handle_list_all_ids(arguments: dict, specs: Specification) -> dict:
@@ -272,6 +376,93 @@ TOOL_REGISTRY: dict[str, dict] = {
         },
         'handler': handle_get_test,
     },
+    'get_requirements': {
+        'description': (
+            'Get the full details of several requirements at once: the given IDs, '
+            'or the requirements with a tag and/or in a category. '
+            'Use fields to only return some of the details, the ID being always included.'
+        ),
+        'inputSchema': {
+            'type': 'object',
+            'properties': {
+                'ids': {
+                    'type': 'array',
+                    'items': {'type': 'string'},
+                    'description': (
+                        'Requirement IDs, returned in this order. Returns an error if any of them does not exist.'
+                    ),
+                },
+                'tag': {
+                    'type': 'string',
+                    'description': (
+                        "Filter by tag, exact match (e.g. 'security' or 'output:pdf'). "
+                        'Returns an error if the tag does not exist.'
+                    ),
+                },
+                'tags': {
+                    'type': 'array',
+                    'items': {'type': 'string'},
+                    'description': (
+                        'Filter by several tags, combined with tag if both are given. '
+                        'Returns an error if one of the tags does not exist.'
+                    ),
+                },
+                'tag_mode': {
+                    'type': 'string',
+                    'enum': ['all', 'any'],
+                    'description': "Whether requirements need 'all' the tags (the default) or 'any' of them.",
+                },
+                'category': {
+                    'type': 'string',
+                    'description': (
+                        "Filter by category (e.g. 'functional'). Returns an error if the category does not exist."
+                    ),
+                },
+                'fields': {
+                    'type': 'array',
+                    'items': {'type': 'string', 'enum': list(REQUIREMENT_FIELDS)},
+                    'description': "Details to return (e.g. ['long', 'tested_by']). Omit to return all of them.",
+                },
+            },
+        },
+        'handler': handle_get_requirements,
+    },
+    'get_tests': {
+        'description': (
+            'Get the full details of several tests at once: the given IDs, '
+            'or the tests in a category and/or covering a requirement. '
+            'Use fields to only return some of the details, the ID being always included.'
+        ),
+        'inputSchema': {
+            'type': 'object',
+            'properties': {
+                'ids': {
+                    'type': 'array',
+                    'items': {'type': 'string'},
+                    'description': 'Test IDs, returned in this order. Returns an error if any of them does not exist.',
+                },
+                'category': {
+                    'type': 'string',
+                    'description': (
+                        "Filter by category (e.g. 'functional'). Returns an error if the category does not exist."
+                    ),
+                },
+                'tester_of': {
+                    'type': 'string',
+                    'description': (
+                        'Filter by requirement ID — returns only tests that reference that requirement. '
+                        'Returns an error if the requirement ID does not exist.'
+                    ),
+                },
+                'fields': {
+                    'type': 'array',
+                    'items': {'type': 'string', 'enum': list(TEST_FIELDS)},
+                    'description': "Details to return (e.g. ['long', 'steps']). Omit to return all of them.",
+                },
+            },
+        },
+        'handler': handle_get_tests,
+    },
     'search_requirements': {
         'description': (
             'Search and filter requirements by tag and/or category. '
@@ -289,6 +480,19 @@ TOOL_REGISTRY: dict[str, dict] = {
                         'Returns an error if the tag does not exist.'
                     ),
                 },
+                'tags': {
+                    'type': 'array',
+                    'items': {'type': 'string'},
+                    'description': (
+                        'Filter by several tags, combined with tag if both are given. '
+                        'Returns an error if one of the tags does not exist.'
+                    ),
+                },
+                'tag_mode': {
+                    'type': 'string',
+                    'enum': ['all', 'any'],
+                    'description': "Whether requirements need 'all' the tags (the default) or 'any' of them.",
+                },
                 'category': {
                     'type': 'string',
                     'description': (
@@ -337,6 +541,25 @@ TOOL_REGISTRY: dict[str, dict] = {
         },
         'handler': handle_list_references_to,
     },
+    'impact_of': {
+        'description': (
+            'List every requirement and test affected by a change to a given item, directly or transitively: '
+            'the requirements that refer to it, the tests that cover it, the tests that need them as prerequisite, '
+            'and so on. Each entry gives its distance to the item, and the item it depends on along the shortest path.'
+        ),
+        'inputSchema': {
+            'type': 'object',
+            'properties': {
+                'id': {'type': 'string', 'description': 'Requirement or test ID that changes.'},
+                'max_depth': {
+                    'type': 'integer',
+                    'description': 'How many levels of dependencies to follow. Omit to follow all of them.',
+                },
+            },
+            'required': ['id'],
+        },
+        'handler': handle_impact_of,
+    },
     'test_plan_coverage': {
         'description': (
             'Partition requirements into four coverage buckets based on their associated tests: '
@@ -357,6 +580,55 @@ TOOL_REGISTRY: dict[str, dict] = {
         },
         'handler': handle_test_plan_coverage,
     },
+    'coverage_summary': {
+        'description': (
+            'Count the requirements of each tag, tag group (the part before the colon of tags like group:subtag), '
+            'category and manifest in each coverage bucket: '
+            'fully automated, partially automated, manual tests only, or no tests. '
+            'Useful for dashboards, or to find which areas of the specification lack tests.'
+        ),
+        'inputSchema': {
+            'type': 'object',
+            'properties': {
+                'by': {
+                    'type': 'string',
+                    'enum': list(DIMENSIONS),
+                    'description': 'Only return the groups of one kind. Omit to return all of them.',
+                },
+            },
+        },
+        'handler': handle_coverage_summary,
+    },
+    'search_text': {
+        'description': (
+            'Full-text search in the descriptions, client statements, test steps and comments '
+            'of requirements and tests, ranked by relevance (BM25). '
+            'Returns summary entries with a snippet of the matching text; use get_requirement or get_test for full details.'
+        ),
+        'inputSchema': {
+            'type': 'object',
+            'properties': {
+                'query': {
+                    'type': 'string',
+                    'description': (
+                        'Words to look for, case-insensitive. End a word with * to match a prefix (e.g. auth*), '
+                        'and use double quotes for a phrase that must appear (e.g. "shall not").'
+                    ),
+                },
+                'kind': {
+                    'type': 'string',
+                    'enum': ['requirement', 'test'],
+                    'description': 'Only return requirements, or only tests.',
+                },
+                'count': {
+                    'type': 'integer',
+                    'description': 'Maximum number of results, 20 by default.',
+                },
+            },
+            'required': ['query'],
+        },
+        'handler': handle_search_text,
+    },
     'least_tested_requirements': {
         'description': (
             'List requirements ranked by ascending test coverage, returning test_plans and automated_test_plans counts per entry. '
@@ -374,6 +646,19 @@ TOOL_REGISTRY: dict[str, dict] = {
                         'Returns an error if the tag does not exist.'
                     ),
                 },
+                'tags': {
+                    'type': 'array',
+                    'items': {'type': 'string'},
+                    'description': (
+                        'Filter by several tags, combined with tag if both are given. '
+                        'Returns an error if one of the tags does not exist.'
+                    ),
+                },
+                'tag_mode': {
+                    'type': 'string',
+                    'enum': ['all', 'any'],
+                    'description': "Whether requirements need 'all' the tags (the default) or 'any' of them.",
+                },
                 'category': {
                     'type': 'string',
                     'description': (
@@ -0,0 +1,185 @@
+"""
+Keep a loaded Specification up to date with the files it was built from.
+
+A background thread polls the modification times of the specification files, of the files matched by
+the patterns of the manifests, and of the code sources. The changes it detects are applied by the
+server between two requests, so that tool handlers never see a half-updated specification.
+"""
+
+import logging
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from pathlib import Path
+
+import yaml
+from speky.models import Manifest
+from speky.specification import Specification
+
+logger = logging.getLogger(__name__)
+
+# Kinds of change
+ADDED, MODIFIED, REMOVED = 'added', 'modified', 'removed'
+
+
+@dataclass(frozen=True)
+class Targets:
+    """The files to watch, extracted from a Specification so that the polling thread never reads it."""
+
+    spec_files: dict[Path, Manifest | None]
+    spec_patterns: list[tuple[Path, str, Manifest]]
+    code_patterns: list[tuple[Path, str]]
+    manifest_files: frozenset[Path]
+
+    @classmethod
+    def of(cls, specs: Specification) -> 'Targets':
+        spec_patterns = []
+        for manifest in specs.manifests:
+            for pattern in manifest.files + manifest.comments_csvs:
+                spec_patterns.append((manifest.root_dir, pattern, manifest))
+        return cls(
+            spec_files=dict(specs.file_manifests),
+            spec_patterns=spec_patterns,
+            code_patterns=[(m.root_dir, pattern) for m in specs.manifests for pattern in m.code_sources],
+            manifest_files=frozenset(m.source_file for m in specs.manifests),
+        )
+
+    def stat(self) -> tuple[dict[Path, int], dict[Path, int]]:
+        """Return the modification times of the specification files and of the code sources."""
+        spec_files = set(self.spec_files)
+        for root_dir, pattern, _ in self.spec_patterns:
+            spec_files.update(path.resolve() for path in root_dir.glob(pattern))
+        code_files = {path.resolve() for root_dir, pattern in self.code_patterns for path in root_dir.glob(pattern)}
+        return _mtimes(spec_files), _mtimes(code_files)
+
+    def manifest_of(self, path: Path) -> Manifest | None:
+        if path in self.spec_files:
+            return self.spec_files[path]
+        for root_dir, pattern, manifest in self.spec_patterns:
+            if any(match.resolve() == path for match in root_dir.glob(pattern)):
+                return manifest
+        return None
+
+
+def _mtimes(paths: set[Path]) -> dict[Path, int]:
+    result = {}
+    for path in paths:
+        try:
+            result[path] = path.stat().st_mtime_ns
+        except OSError:
+            pass  # Removed since it was listed
+    return result
+
+
+def _diff(before: dict[Path, int], after: dict[Path, int]) -> dict[Path, str]:
+    changes = dict.fromkeys(before.keys() - after.keys(), REMOVED)
+    changes |= dict.fromkeys(after.keys() - before.keys(), ADDED)
+    changes |= {path: MODIFIED for path in before.keys() & after.keys() if before[path] != after[path]}
+    return changes
+
+
+class Watcher:
+    """
+    speky:speky_mcp#MCP013
+
+    Detect changes in a background thread, and apply them on demand.
+    """
+
+    def __init__(self, specs: Specification, rebuild: Callable[[], Specification], interval: float = 1.0):
+        """
+        Args:
+            specs: The specification to keep up to date
+            rebuild: Builds a new specification from scratch, used when a manifest changes
+            interval: Seconds between two polls
+        """
+        self.rebuild = rebuild
+        self.interval = interval
+        self.targets = Targets.of(specs)
+        self.lock = threading.Lock()
+        self.baseline = self.targets.stat()
+        self.spec_changes: dict[Path, str] = {}
+        self.code_changes: dict[Path, str] = {}
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='speky-watch', daemon=True)
+
+    def start(self):
+        logger.info('Watching %d specification file(s) and code sources', len(self.targets.spec_files))
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.poll()
+
+    def poll(self):
+        """Compare the files with the previous poll, and record the differences."""
+        spec_state, code_state = self.targets.stat()
+        with self.lock:
+            self.spec_changes |= _diff(self.baseline[0], spec_state)
+            self.code_changes |= _diff(self.baseline[1], code_state)
+            self.baseline = (spec_state, code_state)
+
+    def has_changes(self) -> bool:
+        with self.lock:
+            return bool(self.spec_changes or self.code_changes)
+
+    def apply(self, specs: Specification) -> Specification:
+        """
+        Update the specification with the changes detected since the previous call.
+
+        Returns:
+            The updated specification, which is a new one if a manifest changed
+        """
+        with self.lock:
+            spec_changes, self.spec_changes = self.spec_changes, {}
+            code_changes, self.code_changes = self.code_changes, {}
+        if not spec_changes and not code_changes:
+            return specs
+
+        if self.targets.manifest_files & spec_changes.keys():
+            return self._rebuild(specs)
+
+        for path, change in sorted(spec_changes.items()):
+            if change != ADDED:
+                logger.info('Unloading %s', path)
+                specs.unload_file(path)
+        for path, change in sorted(spec_changes.items()):
+            if change != REMOVED:
+                self._load(specs, path)
+        for path in sorted(code_changes):
+            specs.rescan_code_source(path)
+
+        try:
+            specs.check_references()
+        except KeyError as err:
+            logger.error('After reloading: %s', err)
+        specs.compute_coverage()
+        return specs
+
+    def _load(self, specs: Specification, path: Path):
+        manifest = self.targets.manifest_of(path)
+        try:
+            if path.suffix == '.csv':
+                specs.read_comment_csv(path, manifest=manifest)
+            else:
+                specs.read_file(path, manifest=manifest)
+        except (KeyError, OSError, ValueError, RuntimeError, yaml.YAMLError) as err:
+            logger.error('Could not reload %s: %s', path, err)
+
+    def _rebuild(self, specs: Specification) -> Specification:
+        logger.info('A manifest changed, reloading everything')
+        try:
+            result = self.rebuild()
+        except (KeyError, OSError, ValueError, RuntimeError, yaml.YAMLError) as err:
+            logger.error('Could not reload the specification: %s', err)
+            return specs
+        targets = Targets.of(result)
+        baseline = targets.stat()
+        with self.lock:
+            self.targets = targets
+            self.baseline = baseline
+            self.spec_changes.clear()
+            self.code_changes.clear()
+        return result
@@ -0,0 +1,150 @@
+"""Tests for the coverage engine and the coverage summary."""
+
+import csv
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+import speky
+from speky.coverage import STATUSES, CoverageEngine
+from speky.specification import Specification
+
+SAMPLES_DIR = Path(__file__).parent / 'samples'
+
+
+@pytest.fixture
+def folder(tmp_path):
+    shutil.copytree(SAMPLES_DIR, tmp_path, dirs_exist_ok=True)
+    return tmp_path.resolve()
+
+
+@pytest.fixture
+def specs(folder):
+    specs = Specification()
+    specs.read_file(folder / 'more_samples.yaml')
+    specs.check_references()
+    specs.scan_code_sources()
+    return specs
+
+
+def rescanned(specs: Specification) -> dict[str, tuple[int, int]]:
+    """The counts of every requirement, computed from the testers and code references of the specification."""
+    counts = {}
+    for requirement_id, tests in specs.testers_of.items():
+        automated = sum(any(r.is_test for r in specs.code_refs_by_id.get(t.id, [])) for t in tests)
+        counts[requirement_id] = (len(tests), automated)
+    return counts
+
+
+def test_counts(specs):
+    assert specs.coverage.counts('RF03') == (2, 1)
+    assert specs.coverage.counts('RF04') == (0, 0)
+    assert specs.is_test_automated('T04')
+    assert not specs.is_test_automated('T03')
+    assert [STATUSES[specs.coverage.status(r)] for r in ('RF01', 'RF03', 'RF04')] == ['manual', 'partial', 'no_plan']
+
+
+def test_unloaded_tests(folder, specs):
+    specs.unload_file(folder / 'more_tests.yaml')
+
+    assert specs.coverage.counts('RF03') == (0, 0)
+    assert specs.coverage.counters == {key: list(value) for key, value in rescanned(specs).items()}
+
+    specs.read_file(folder / 'more_tests.yaml', specs.manifests[0])
+
+    assert specs.coverage.counts('RF03') == (2, 1)
+
+
+def test_rescanned_code(folder, specs):
+    source = folder / 'more_source.go'
+    source.write_text(source.read_text().replace('func CreateFiles()', 'func TestCreateFiles(t *testing.T)'))
+    specs.rescan_code_source(source)
+
+    assert specs.coverage.counts('RF03') == (2, 2)
+
+    source.unlink()
+    specs.rescan_code_source(source)
+
+    assert specs.coverage.counts('RF03') == (2, 0)
+    assert not specs.coverage.automations
+
+
+def test_several_automations():
+    engine = CoverageEngine()
+    engine.add_automation('T1')
+    engine.add_test('T1', ['R1', 'R2'])
+    engine.add_test('T2', ['R1'])
+    engine.add_automation('T1')
+    engine.remove_automation('T1')
+
+    assert engine.counts('R1') == (2, 1)
+    assert engine.counts('R2') == (1, 1)
+
+    engine.remove_automation('T1')
+
+    assert engine.counts('R1') == (2, 0)
+
+    engine.remove_test('T1', ['R1', 'R2'])
+    engine.remove_test('T1', ['R1', 'R2'])
+
+    assert engine.counters == {'R1': [1, 0]}
+
+
+def test_buckets(specs):
+    specs.compute_coverage()
+
+    assert {
+        category: [[r.id for r in bucket] for bucket in buckets]
+        for category, buckets in specs.manifests[0].coverage.items()
+    } == {
+        'functional': [[], [], ['RF01', 'RF02'], []],
+        'non-functional': [[], ['RF03'], [], ['RF04']],
+    }
+
+
+def test_summary(specs):
+    stats = {(s.dimension, s.name): s[2:] for s in specs.coverage_summary().stats()}
+
+    assert stats == {
+        ('category', 'functional'): (2, 0, 0, 2, 0),
+        ('category', 'non-functional'): (2, 0, 1, 0, 1),
+        ('manifest', 'more_samples'): (4, 0, 1, 2, 1),
+        ('tag', 'bar:baz'): (1, 0, 1, 0, 0),
+        ('tag', 'foo'): (1, 0, 1, 0, 0),
+        ('tag_group', 'bar'): (1, 0, 1, 0, 0),
+    }
+    assert [s.name for s in specs.coverage_summary().stats('category')] == ['functional', 'non-functional']
+
+
+def test_summary_after_changes(folder, specs):
+    summary = specs.coverage_summary()
+    assert specs.coverage_summary() is summary
+
+    specs.unload_file(folder / 'more_tests.yaml')
+
+    assert specs.coverage_summary() is not summary
+    assert specs.coverage_summary().stats('manifest')[0][2:] == (4, 0, 0, 2, 2)
+
+
+def test_cli_exports(sample, tmp_path):
+    speky.run(['--check-only', '--coverage-summary', str(tmp_path / 'coverage.json'), sample('more_samples')])
+    speky.run(['--check-only', '--coverage-summary', str(tmp_path / 'coverage.csv'), sample('more_samples')])
+
+    rows = json.loads((tmp_path / 'coverage.json').read_text())
+    assert rows[0] == {
+        'dimension': 'category',
+        'name': 'functional',
+        'requirements': 2,
+        'automated': 0,
+        'partial': 0,
+        'manual': 2,
+        'no_plan': 0,
+    }
+    with (tmp_path / 'coverage.csv').open(newline='') as f:
+        assert list(csv.DictReader(f)) == [{key: str(value) for key, value in row.items()} for row in rows]
+
+
+def test_unknown_export_format(sample, tmp_path):
+    with pytest.raises(RuntimeError, match='must be .json or .csv'):
+        speky.run(['--check-only', '--coverage-summary', str(tmp_path / 'coverage.xml'), sample('more_samples')])
@@ -35,8 +35,20 @@ def test_error_msg(sample):
         ('test_missing_ref_and_steps', r'Missing fields from Definition of Test \w+ in [^:]+: ref, steps'),
         ('test_unknwon_ref', r'Requirement \w+, referred from \w+ in "[^"]+", does not exist'),
         ('test_step_missing_action', r'Missing field from Step \d+ of Test \w+ in "[^"]+": action'),
+        ('test_unknown_prereq', r'Test \w+, prerequisite of \w+ in "[^"]+", does not exist'),
+        ('test_prereq_cycle', r'Cycle of prerequisites between tests TF01, TF02, TF03, in "[^"]+"'),
     ]
 
     for name, reason in error_list:
         with pytest.raises(KeyError, match=reason):
             speky.run([sample(name)])
+
+
+def test_every_reference_error(sample):
+    with pytest.raises(KeyError) as error:
+        speky.run([sample('many_unknown_refs')])
+
+    lines = str(error.value).splitlines()
+    assert [line.split(',')[0] for line in lines[:3]] == ['Requirement RF00', 'Requirement RF01', 'Test TF00']
+    assert lines[3].startswith('Test TF02 in "') and lines[3].endswith('" is its own prerequisite')
+    assert len(lines) == 4
@@ -0,0 +1,87 @@
+"""Tests for the resolution of git metadata."""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+from speky.git import GitError, GitResolver
+from speky.models import NullSourceLinks, SourceLinkConfig
+
+
+def git(cwd: Path, *arguments: str) -> str:
+    command = ['git', '-c', 'user.name=Speky', '-c', 'user.email=speky@example.com', *arguments]
+    return subprocess.run(command, cwd=cwd, capture_output=True, text=True, check=True).stdout.strip()
+
+
+@pytest.fixture
+def repository(tmp_path, monkeypatch):
+    """A repository with a commit, a remote, nested folders and a worktree, its refs packed."""
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.delenv('XDG_CONFIG_HOME', raising=False)
+    root = tmp_path / 'repository'
+    root.mkdir()
+    git(root, 'init', '-q', '-b', 'main')
+    git(root, 'commit', '-q', '--allow-empty', '-m', 'First')
+    git(root, 'remote', 'add', 'origin', 'git@github.com:agagniere/speky.git')
+    git(root, 'worktree', 'add', '-q', str(tmp_path / 'worktree'), '-b', 'feature')
+    git(root, 'pack-refs', '--all')
+    (root / 'specs' / 'mcp').mkdir(parents=True)
+    return root
+
+
+def test_read_from_files(repository):
+    resolver = GitResolver()
+    worktree = repository.parent / 'worktree'
+
+    for folder in (repository, repository / 'specs', repository / 'specs' / 'mcp'):
+        assert resolver.toplevel(folder) == repository
+        assert resolver.branch(folder) == 'main'
+        assert resolver.remote_url(folder) == 'git@github.com:agagniere/speky.git'
+    assert resolver.toplevel(worktree) == worktree
+    assert resolver.branch(worktree) == 'feature'
+    assert resolver.remote_url(worktree) == 'git@github.com:agagniere/speky.git'
+    assert resolver.subprocesses == 0
+    assert len(resolver.values) == 6
+
+
+def test_detached_head(repository):
+    git(repository, 'checkout', '-q', '--detach')
+
+    assert GitResolver().branch(repository) == git(repository, 'rev-parse', '--abbrev-ref', 'HEAD') == 'HEAD'
+
+
+def test_fallback_once_per_repository(repository):
+    git(repository, 'checkout', '-q', '--orphan', 'empty')
+    resolver = GitResolver()
+
+    for folder in (repository, repository / 'specs', repository / 'specs' / 'mcp'):
+        with pytest.raises(GitError, match='HEAD'):
+            resolver.branch(folder)
+    assert resolver.subprocesses == 1
+
+
+def test_url_rewrites_are_left_to_git(repository):
+    git(repository, 'config', 'url.https://github.com/.insteadOf', 'git@github.com:')
+
+    assert GitResolver().remote_url(repository) == 'https://github.com/agagniere/speky.git'
+
+
+def test_errors(repository, tmp_path):
+    with pytest.raises(GitError, match='other'):
+        GitResolver().remote_url(repository, 'other')
+
+    outside = tmp_path / 'outside'
+    outside.mkdir()
+    resolver = GitResolver()
+    with pytest.raises(GitError, match='not a git repository'):
+        resolver.toplevel(outside)
+
+
+def test_source_links(repository):
+    resolver = GitResolver()
+    config = SourceLinkConfig.from_dict({'url': 'auto'}, repository / 'specs', resolver)
+
+    assert config.url_for(repository / 'specs' / 'speky.yaml') == (
+        'https://github.com/agagniere/speky/blob/main/specs/speky.yaml'
+    )
+    assert isinstance(SourceLinkConfig.from_dict({'url': 'auto'}, repository.parent), NullSourceLinks)
@@ -0,0 +1,59 @@
+"""Tests for the traceability graph."""
+
+from pathlib import Path
+
+import pytest
+from speky.graph import Impact
+from speky.specification import Specification
+
+SAMPLES_DIR = Path(__file__).parent / 'samples'
+
+
+@pytest.fixture
+def specs():
+    specs = Specification()
+    specs.read_file(SAMPLES_DIR / 'more_samples.yaml')
+    specs.check_references()
+    return specs
+
+
+def test_direct_dependents(specs):
+    graph = specs.traceability_graph()
+
+    assert len(graph) == 7
+    assert graph.impact_of('RF01') == [Impact('T01', 1, 'RF01', 'test')]
+    assert graph.impact_of('T03') == [Impact('T04', 1, 'T03', 'prereq')]
+    assert graph.impact_of('T04') == []
+
+
+def test_transitive_through_cycle(specs):
+    # RF03 and RF04 refer to each other, and RF03 is covered by T03 and T04
+    assert specs.traceability_graph().impact_of('RF04') == [
+        Impact('RF03', 1, 'RF04', 'ref'),
+        Impact('T03', 2, 'RF03', 'test'),
+        Impact('T04', 2, 'RF03', 'test'),
+    ]
+
+
+def test_max_depth(specs):
+    assert specs.traceability_graph().impact_of('RF04', max_depth=1) == [Impact('RF03', 1, 'RF04', 'ref')]
+
+
+def test_rebuilt_after_changes(specs):
+    graph = specs.traceability_graph()
+    assert specs.traceability_graph() is graph
+
+    specs.unload_file((SAMPLES_DIR / 'more_tests.yaml').resolve())
+
+    assert specs.traceability_graph() is not graph
+    assert specs.traceability_graph().impact_of('RF04') == [Impact('RF03', 1, 'RF04', 'ref')]
+
+
+def test_dangling_references_are_ignored(tmp_path):
+    (tmp_path / 'tests.yaml').write_text(
+        'kind: tests\ncategory: functional\ntests:\n- {id: T1, long: One, ref: [R404], prereq: [T404], steps: []}\n'
+    )
+    specs = Specification()
+    specs.read_file(tmp_path / 'tests.yaml')
+
+    assert len(specs.traceability_graph()) == 0
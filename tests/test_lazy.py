@@ -0,0 +1,158 @@
+"""Tests for the lazy loading of heavy fields."""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import shutil
+import tomllib
+from pathlib import Path
+
+import pytest
+from speky.lazy import LazyRequirement
+from speky.specification import Specification
+from speky_mcp.server import Server, handle_request, load_specification
+
+SAMPLES_DIR = Path(__file__).parent / 'samples'
+
+
+def load(folder: Path, lazy: bool) -> Specification:
+    specs = Specification(lazy=lazy)
+    specs.read_file(folder / 'more_samples.yaml')
+    specs.check_references()
+    specs.scan_code_sources()
+    specs.compute_coverage()
+    return specs
+
+
+def call(specs: Specification, tool: str, arguments: dict) -> dict:
+    request = {
+        'jsonrpc': '2.0',
+        'method': 'tools/call',
+        'id': 1,
+        'params': {'name': tool, 'arguments': arguments},
+    }
+    return handle_request(request, specs, initialized=True)['result']['structuredContent']
+
+
+@pytest.fixture
+def folder(tmp_path):
+    shutil.copytree(SAMPLES_DIR, tmp_path, dirs_exist_ok=True)
+    return tmp_path.resolve()
+
+
+def test_lazy_matches_eager():
+    eager, lazy = load(SAMPLES_DIR, lazy=False), load(SAMPLES_DIR, lazy=True)
+
+    for item_id, item in eager.by_id.items():
+        tool = 'get_requirement' if item.kind == 'requirement' else 'get_test'
+        assert call(lazy, tool, {'id': item_id}) == call(eager, tool, {'id': item_id})
+
+
+def test_heavy_fields_are_read_on_access(folder):
+    specs = load(folder, lazy=True)
+    requirement = specs.by_id['RF01']
+    assert isinstance(requirement, LazyRequirement)
+    with pytest.raises(AttributeError):
+        LazyRequirement.long.slot.__get__(requirement)
+
+    path = folder / 'simple_requirements.yaml'
+    path.write_text(path.read_text().replace('The first requirement', 'The edited requirement'))
+
+    assert requirement.long == 'The edited requirement'
+    assert requirement.short is None
+
+
+def test_moved_item_is_found(folder, caplog):
+    specs = load(folder, lazy=True)
+    path = folder / 'simple_requirements.yaml'
+    path.write_text(
+        'kind: requirements\ncategory: functional\nrequirements:\n- id: RF02\n  long: Moved\n- id: RF01\n  long: First\n'
+    )
+
+    assert specs.by_id['RF01'].long == 'First'
+    assert specs.by_id['RF02'].long == 'Moved'
+    assert 'changed since it was loaded' in caplog.text
+
+
+def test_items_are_located_in_the_file(tmp_path):
+    requirements, comments = tmp_path / 'requirements.yaml', tmp_path / 'comments.yaml'
+    requirements.write_bytes(
+        'kind: requirements\r\ncategory: functional\r\nrequirements:\r\n'
+        '- {id: R1, long: "Première exigence ✓"}\r\n'
+        '- id: R2\r\n  long: |\r\n    Deuxième\r\n    exigence\r\n'.encode()
+    )
+    comments.write_text(
+        'kind: comments\ncomments:\n- &comment {about: R1, from: Léa, date: 01/02/2026, text: Déjà vu}\n- *comment\n'
+    )
+    specs = Specification(lazy=True)
+    specs.read_file(requirements)
+    specs.read_file(comments)
+
+    assert all(item.locator.span for item in specs.items_by_file[requirements])
+    assert specs.by_id['R1'].long == 'Première exigence ✓'
+    assert specs.by_id['R2'].long == 'Deuxième\nexigence\n'
+    # An alias would have the span of the item it repeats: it is read from the whole file
+    assert [item.locator.span is None for item in specs.items_by_file[comments]] == [False, True]
+    assert [comment.text for comment in specs.comments['R1']] == ['Déjà vu', 'Déjà vu']
+
+
+def test_whole_file_is_parsed_once(folder, monkeypatch):
+    specs = load(folder, lazy=True)
+    parses = []
+    original = tomllib.load
+    monkeypatch.setattr(tomllib, 'load', lambda f: parses.append(f.name) or original(f))
+
+    assert specs.by_id['RF03'].long == 'The third requirement !'
+    assert specs.by_id['RF04'].long.startswith('A requirement created')
+    assert len(parses) == 1
+
+    path = folder / 'more_requirements.toml'
+    path.write_text(path.read_text().replace('be referenced by RF03', 'be edited'))
+    os.utime(path, ns=(path.stat().st_mtime_ns + 1_000_000_000,) * 2)
+    specs.by_id['RF04'].forget(specs.by_id['RF04'].locator)
+
+    assert specs.by_id['RF04'].long.endswith('be edited')
+    assert len(parses) == 2
+
+
+def test_server_startup_does_not_read_heavy_fields(folder):
+    args = argparse.Namespace(
+        snapshot=None, jobs=1, lazy=True, paths=[str(folder / 'more_samples.yaml')], comment_csvs=None, cache_dir=None
+    )
+    specs = load_specification(args)
+
+    for item in specs.by_id.values():
+        with pytest.raises(AttributeError):
+            type(item).long.slot.__get__(item)
+    assert [hit.item.id for hit in specs.search_index().search('third')] == ['T04', 'RF03']
+
+
+def test_index_does_not_change_items(folder):
+    specs = load(folder, lazy=True)
+    # Being read by another request
+    assert specs.by_id['RF01'].long
+
+    assert specs.search_index().search('"third requirement"')
+    assert [item_id for item_id, item in specs.by_id.items() if item.is_loaded()] == ['RF01']
+
+
+def test_concurrent_tool_calls(folder):
+    specs, eager = load(folder, lazy=True), load(folder, lazy=False)
+    requests = []
+    for i, item_id in enumerate(sorted(eager.by_id) * 10):
+        tool = 'get_requirement' if eager.by_id[item_id].kind == 'requirement' else 'get_test'
+        requests.append({'name': tool, 'arguments': {'id': item_id}})
+        requests.append({'name': 'search_text', 'arguments': {'query': ['requirement', 'test', 'file*'][i % 3]}})
+    lines = [{'jsonrpc': '2.0', 'method': 'initialize', 'id': 0, 'params': {}}]
+    lines.append({'jsonrpc': '2.0', 'method': 'notifications/initialized'})
+    lines.extend({'jsonrpc': '2.0', 'method': 'tools/call', 'id': i, 'params': p} for i, p in enumerate(requests, 1))
+
+    output = io.StringIO()
+    server = Server(specs, max_concurrency=4)
+    asyncio.run(server.serve(io.StringIO('\n'.join(json.dumps(line) for line in lines) + '\n'), output))
+
+    responses = {response['id']: response for response in map(json.loads, output.getvalue().splitlines())}
+    for i, params in enumerate(requests, 1):
+        assert responses[i]['result']['structuredContent'] == call(eager, params['name'], params['arguments']), params
@@ -0,0 +1,58 @@
+"""Tests for the Myst Markdown output."""
+
+import os
+
+import speky
+
+
+def generate(sample, output, *names):
+    speky.run(['--output-folder', str(output)] + [sample(name) for name in names])
+
+
+def test_generated_pages(sample, tmp_path):
+    generate(sample, tmp_path, 'more_samples')
+
+    assert (tmp_path / 'index.md').is_file()
+    assert (tmp_path / 'coverage.md').is_file()
+    assert sorted(p.name for p in (tmp_path / 'requirements').iterdir()) == [
+        'RF01.md',
+        'RF02.md',
+        'RF03.md',
+        'RF04.md',
+        'functional.md',
+        'index.md',
+        'non-functional.md',
+    ]
+
+
+def test_unchanged_pages_are_not_rewritten(sample, tmp_path):
+    generate(sample, tmp_path, 'more_samples')
+    page = tmp_path / 'requirements' / 'RF01.md'
+    os.utime(page, ns=(0, 0))
+
+    generate(sample, tmp_path, 'more_samples')
+
+    assert page.stat().st_mtime_ns == 0
+
+
+def test_stale_pages_are_removed(sample, tmp_path):
+    generate(sample, tmp_path, 'more_samples')
+
+    generate(sample, tmp_path, 'simple_requirements', 'simple_tests')
+
+    assert not (tmp_path / 'requirements' / 'RF03.md').exists()
+    assert not (tmp_path / 'requirements' / 'non-functional.md').exists()
+    assert not (tmp_path / 'tests' / 'T03.md').exists()
+    assert not (tmp_path / 'coverage.md').exists()
+    assert (tmp_path / 'requirements' / 'RF01.md').is_file()
+
+
+def test_parallel_output_matches_serial(sample, tmp_path):
+    serial, parallel = tmp_path / 'serial', tmp_path / 'parallel'
+    generate(sample, serial, 'more_samples')
+    speky.run(['--jobs', '4', '--output-folder', str(parallel), sample('more_samples')])
+
+    pages = sorted(p.relative_to(serial) for p in serial.rglob('*.md'))
+    assert pages == sorted(p.relative_to(parallel) for p in parallel.rglob('*.md'))
+    for page in pages:
+        assert (serial / page).read_bytes() == (parallel / page).read_bytes()
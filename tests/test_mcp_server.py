@@ -1,10 +1,16 @@
 """Tests for the MCP server implementation."""
 
+import asyncio
+import io
+import json
+import threading
 from pathlib import Path
 
 import pytest
 from speky.specification import Specification
-from speky_mcp.server import handle_request
+from speky_mcp.cache import ResponseCache
+from speky_mcp.server import Server, handle_request
+from speky_mcp.tools import TOOLS
 
 SAMPLES_DIR = Path(__file__).parent / 'samples'
 
@@ -443,6 +449,46 @@ class TestSearchRequirements:
         assert 'nonexistent' in response['result']['structuredContent']['error']
 
 
+class TestMultipleTags:
+    """Tests for the tags and tag_mode arguments."""
+
+    @pytest.fixture
+    def specs(self, tmp_path):
+        (tmp_path / 'requirements.yaml').write_text(
+            'kind: requirements\ncategory: functional\nrequirements:\n'
+            '- {id: R1, long: One, tags: [a, b]}\n- {id: R2, long: Two, tags: [a]}\n- {id: R3, long: Three, tags: [c]}\n'
+        )
+        specs = Specification()
+        specs.read_file(tmp_path / 'requirements.yaml')
+        return specs
+
+    def _ids(self, specs, tool='search_requirements', **arguments):
+        request = {'jsonrpc': '2.0', 'method': 'tools/call', 'id': 2, 'params': {'name': tool, 'arguments': arguments}}
+        result = handle_request(request, specs, initialized=True)['result']
+        assert 'isError' not in result
+        return sorted(r['id'] for r in result['structuredContent']['requirements'])
+
+    def test_all_tags(self, specs):
+        assert self._ids(specs, tags=['a', 'b']) == ['R1']
+        assert self._ids(specs, tag='b', tags=['a'], category='functional') == ['R1']
+        assert self._ids(specs, 'least_tested_requirements', tags=['a']) == ['R1', 'R2']
+
+    def test_any_tag(self, specs):
+        assert self._ids(specs, tags=['b', 'c'], tag_mode='any') == ['R1', 'R3']
+        assert self._ids(specs, 'get_requirements', tags=['b', 'c'], tag_mode='any', fields=[]) == ['R1', 'R3']
+
+    def test_invalid(self, specs):
+        request = {
+            'jsonrpc': '2.0',
+            'method': 'tools/call',
+            'id': 2,
+            'params': {'name': 'search_requirements', 'arguments': {'tags': ['a', 'd']}},
+        }
+        result = handle_request(request, specs, initialized=True)['result']
+        assert result['isError'] is True
+        assert "'d'" in result['structuredContent']['error']
+
+
 class TestSearchTests:
     """Tests for search_tests tool."""
 
@@ -602,6 +648,92 @@ class TestListReferencesTo:
         assert 'not found' in error_msg
 
 
+class TestImpactOf:
+    """Tests for impact_of tool."""
+
+    def _call(self, specs, **arguments):
+        response = handle_request(
+            {
+                'jsonrpc': '2.0',
+                'method': 'tools/call',
+                'id': 2,
+                'params': {'name': 'impact_of', 'arguments': arguments},
+            },
+            specs,
+            initialized=True,
+        )
+        return response['result']
+
+    def test_transitive(self, complex_specs):
+        content = self._call(complex_specs, id='RF04')['structuredContent']
+
+        assert content['id'] == 'RF04'
+        assert content['impacted'] == [
+            {'id': 'RF03', 'short': 'Number 3', 'kind': 'requirement', 'depth': 1, 'via': 'RF04', 'relation': 'ref'},
+            {'id': 'T03', 'short': 'Create files', 'kind': 'test', 'depth': 2, 'via': 'RF03', 'relation': 'test'},
+            {'id': 'T04', 'short': 'Yet another test', 'kind': 'test', 'depth': 2, 'via': 'RF03', 'relation': 'test'},
+        ]
+
+    def test_max_depth(self, complex_specs):
+        content = self._call(complex_specs, id='RF04', max_depth=1)['structuredContent']
+
+        assert [entry['id'] for entry in content['impacted']] == ['RF03']
+
+    def test_errors(self, complex_specs):
+        assert self._call(complex_specs, id='RF99')['isError'] is True
+        assert self._call(complex_specs, id='RF04', max_depth=0)['isError'] is True
+        assert self._call(complex_specs, id='RF04', max_depth='a')['isError'] is True
+        assert self._call(complex_specs, id='RF04', max_depth=True)['isError'] is True
+        assert self._call(complex_specs, id=['RF04'])['isError'] is True
+
+
+class TestCoverageSummary:
+    """Tests for coverage_summary tool."""
+
+    def _call(self, specs, **arguments):
+        response = handle_request(
+            {
+                'jsonrpc': '2.0',
+                'method': 'tools/call',
+                'id': 2,
+                'params': {'name': 'coverage_summary', 'arguments': arguments},
+            },
+            specs,
+            initialized=True,
+        )
+        return response['result']
+
+    def test_by_tag_group(self, complex_specs):
+        content = self._call(complex_specs, by='tag_group')['structuredContent']
+
+        assert content['groups'] == [
+            {
+                'dimension': 'tag_group',
+                'name': 'bar',
+                'requirements': 1,
+                'automated': 0,
+                'partial': 1,
+                'manual': 0,
+                'no_plan': 0,
+            }
+        ]
+
+    def test_all_groups(self, complex_specs):
+        content = self._call(complex_specs)['structuredContent']
+
+        assert [(group['dimension'], group['name']) for group in content['groups']] == [
+            ('category', 'functional'),
+            ('category', 'non-functional'),
+            ('manifest', 'more_samples'),
+            ('tag', 'bar:baz'),
+            ('tag', 'foo'),
+            ('tag_group', 'bar'),
+        ]
+
+    def test_unknown_dimension(self, complex_specs):
+        assert self._call(complex_specs, by='author')['isError'] is True
+
+
 class TestTestPlanCoverage:
     """Tests for test_plan_coverage tool."""
 
@@ -862,3 +994,301 @@ class TestLeastTestedRequirements:
         requirements = self._call(complex_specs, count=9999)['structuredContent']['requirements']
 
         assert [r['id'] for r in requirements] == ['RF04', 'RF01', 'RF02', 'RF03']
+
+
+class TestBulkGet:
+    """Tests for get_requirements and get_tests tools."""
+
+    def _call(self, specs, name, **arguments):
+        response = handle_request(
+            {'jsonrpc': '2.0', 'method': 'tools/call', 'id': 2, 'params': {'name': name, 'arguments': arguments}},
+            specs,
+            initialized=True,
+        )
+        return response['result']
+
+    def test_requirements_by_ids_match_get_requirement(self, complex_specs):
+        requirements = self._call(complex_specs, 'get_requirements', ids=['RF03', 'RF01', 'RF03'])
+        requirements = requirements['structuredContent']['requirements']
+
+        assert [r['id'] for r in requirements] == ['RF03', 'RF01']
+        for requirement in requirements:
+            single = self._call(complex_specs, 'get_requirement', id=requirement['id'])
+            assert requirement == single['structuredContent']
+
+    def test_requirements_by_tag_and_category(self, complex_specs):
+        by_tag = self._call(complex_specs, 'get_requirements', tag='foo')['structuredContent']['requirements']
+        by_category = self._call(complex_specs, 'get_requirements', category='non-functional')
+        everything = self._call(complex_specs, 'get_requirements')['structuredContent']['requirements']
+
+        assert [r['id'] for r in by_tag] == ['RF03']
+        assert [r['id'] for r in by_category['structuredContent']['requirements']] == ['RF03', 'RF04']
+        assert [r['id'] for r in everything] == ['RF01', 'RF02', 'RF03', 'RF04']
+
+    def test_ids_narrowed_by_filters(self, complex_specs):
+        result = self._call(complex_specs, 'get_requirements', ids=['RF04', 'RF01', 'RF03'], category='non-functional')
+
+        assert [r['id'] for r in result['structuredContent']['requirements']] == ['RF04', 'RF03']
+
+    def test_field_projection(self, complex_specs):
+        result = self._call(complex_specs, 'get_requirements', ids=['RF03', 'RF04'], fields=['long', 'tested_by'])
+
+        assert result['structuredContent']['requirements'] == [
+            {
+                'id': 'RF03',
+                'long': 'The third requirement !',
+                'tested_by': [{'id': 'T03', 'short': 'Create files'}, {'id': 'T04', 'short': 'Yet another test'}],
+            },
+            {'id': 'RF04', 'long': 'A requirement created to reference and be referenced by RF03'},
+        ]
+
+    def test_every_unknown_id_reported(self, complex_specs):
+        result = self._call(complex_specs, 'get_requirements', ids=['RF01', 'RF98', 'RF99'])
+
+        assert result['isError'] is True
+        assert 'RF98, RF99' in result['structuredContent']['error']
+
+    def test_tests_are_not_requirements(self, complex_specs):
+        result = self._call(complex_specs, 'get_requirements', ids=['RF01', 'T01'])
+
+        assert result['isError'] is True
+        assert 'T01' in result['structuredContent']['error']
+
+    def test_unknown_field(self, complex_specs):
+        result = self._call(complex_specs, 'get_tests', fields=['steps', 'tags'])
+
+        assert result['isError'] is True
+        assert 'tags' in result['structuredContent']['error']
+
+    def test_fields_not_a_list(self, complex_specs):
+        for fields in ('long', [['long']], {'long': True}):
+            result = self._call(complex_specs, 'get_requirements', fields=fields)
+
+            assert result['isError'] is True
+            assert 'list of field names' in result['structuredContent']['error']
+
+    def test_tests_by_requirement(self, complex_specs):
+        result = self._call(complex_specs, 'get_tests', tester_of='RF03', fields=['prereq'])
+
+        assert result['structuredContent']['tests'] == [
+            {'id': 'T03'},
+            {'id': 'T04', 'prereq': [{'id': 'T03', 'short': 'Create files'}]},
+        ]
+
+    def test_tests_by_ids_match_get_test(self, complex_specs):
+        tests = self._call(complex_specs, 'get_tests', ids=['T04', 'T01'])['structuredContent']['tests']
+
+        assert [t['id'] for t in tests] == ['T04', 'T01']
+        for test in tests:
+            assert test == self._call(complex_specs, 'get_test', id=test['id'])['structuredContent']
+
+
+class TestSearchText:
+    """Tests for search_text tool."""
+
+    def _call(self, specs, **arguments):
+        response = handle_request(
+            {
+                'jsonrpc': '2.0',
+                'method': 'tools/call',
+                'id': 2,
+                'params': {'name': 'search_text', 'arguments': arguments},
+            },
+            specs,
+            initialized=True,
+        )
+        return response['result']
+
+    def test_results(self, complex_specs):
+        results = self._call(complex_specs, query='"shell command"', kind='test')['structuredContent']['results']
+
+        assert sorted(r['id'] for r in results) == ['T02', 'T04']
+        result = next(r for r in results if r['id'] == 'T04')
+        assert result['short'] == 'Yet another test'
+        assert result['kind'] == 'test'
+        assert result['field'] == 'steps'
+        assert result['snippet'] == 'Do that shell command'
+        assert result['score'] > 0
+
+    def test_count(self, complex_specs):
+        results = self._call(complex_specs, query='requirement', count=3)['structuredContent']['results']
+
+        assert len(results) == 3
+        assert [r['score'] for r in results] == sorted((r['score'] for r in results), reverse=True)
+
+    def test_invalid_arguments(self, complex_specs):
+        assert self._call(complex_specs, query='  ')['isError'] is True
+        assert self._call(complex_specs, query='first', kind='comment')['isError'] is True
+
+
+class ServerLoop:
+    """Run the server loop over in-memory streams."""
+
+    INITIALIZE = {'jsonrpc': '2.0', 'method': 'initialize', 'id': 0, 'params': {}}
+    INITIALIZED = {'jsonrpc': '2.0', 'method': 'notifications/initialized'}
+
+    def _serve(self, specs, lines, max_concurrency=4, cache_size=0) -> list[dict]:
+        return [json.loads(line) for line in self._serve_raw(specs, lines, max_concurrency, cache_size).splitlines()]
+
+    def _serve_raw(self, specs, lines, max_concurrency=4, cache_size=0) -> str:
+        messages = [line if isinstance(line, str) else json.dumps(line) for line in lines]
+        output = io.StringIO()
+        server = Server(specs, max_concurrency=max_concurrency, cache_size=cache_size)
+        asyncio.run(server.serve(io.StringIO('\n'.join(messages) + '\n'), output))
+        return output.getvalue()
+
+    def _get(self, request_id, item_id):
+        return {
+            'jsonrpc': '2.0',
+            'method': 'tools/call',
+            'id': request_id,
+            'params': {'name': 'get_requirement', 'arguments': {'id': item_id}},
+        }
+
+
+class TestServerLoop(ServerLoop):
+    """Tests for the concurrent server loop."""
+
+    def test_responses_match_requests(self, complex_specs):
+        ids = ['RF01', 'RF02', 'RF03', 'RF04'] * 5
+        requests = [self._get(f'request-{i}', item_id) for i, item_id in enumerate(ids)]
+
+        responses = self._serve(complex_specs, [self.INITIALIZE, self.INITIALIZED, *requests])
+
+        assert responses[0]['id'] == 0
+        by_id = {response['id']: response for response in responses[1:]}
+        assert len(by_id) == len(requests)
+        for i, item_id in enumerate(ids):
+            assert by_id[f'request-{i}']['result']['structuredContent']['id'] == item_id
+
+    def test_notifications_are_not_answered(self, simple_specs):
+        unknown = {'jsonrpc': '2.0', 'method': 'notifications/cancelled', 'params': {'requestId': 1}}
+
+        responses = self._serve(simple_specs, [self.INITIALIZE, self.INITIALIZED, unknown, self._get(1, 'RF01')])
+
+        assert [response['id'] for response in responses] == [0, 1]
+
+    def test_invalid_messages(self, simple_specs):
+        responses = self._serve(simple_specs, ['{not json', '42', self._get(1, 'RF01')])
+
+        assert [response['error']['code'] for response in responses] == [-32700, -32600, -32002]
+
+    def test_slow_call_does_not_block_others(self, simple_specs, monkeypatch):
+        second_call = threading.Event()
+
+        def slow(arguments, specs):
+            return {'saw_second_call': second_call.wait(timeout=5)}
+
+        def fast(arguments, specs):
+            second_call.set()
+            return {}
+
+        monkeypatch.setitem(TOOLS, 'slow', slow)
+        monkeypatch.setitem(TOOLS, 'fast', fast)
+        calls = [
+            {'jsonrpc': '2.0', 'method': 'tools/call', 'id': i, 'params': {'name': name, 'arguments': {}}}
+            for i, name in enumerate(['slow', 'fast'], 1)
+        ]
+
+        responses = self._serve(simple_specs, [self.INITIALIZE, self.INITIALIZED, *calls], max_concurrency=2)
+
+        slow_response = next(response for response in responses if response['id'] == 1)
+        assert slow_response['result']['structuredContent'] == {'saw_second_call': True}
+
+    def test_internal_error(self, simple_specs, monkeypatch):
+        def broken(arguments, specs):
+            return 1 / 0
+
+        monkeypatch.setitem(TOOLS, 'broken', broken)
+        call = {'jsonrpc': '2.0', 'method': 'tools/call', 'id': 1, 'params': {'name': 'broken', 'arguments': {}}}
+
+        responses = self._serve(simple_specs, [self.INITIALIZE, self.INITIALIZED, call])
+
+        assert responses[1]['error']['code'] == -32603
+
+    def test_batch(self, complex_specs):
+        batch = [self._get(1, 'RF01'), self.INITIALIZED, self._get(2, 'RF02'), 42, self._get(3, 'RF99')]
+
+        responses = self._serve(complex_specs, [self.INITIALIZE, self.INITIALIZED, batch])
+
+        assert len(responses) == 2
+        answers = responses[1]
+        assert [answer['id'] for answer in answers] == [1, 2, None, 3]
+        assert answers[1]['result']['structuredContent']['id'] == 'RF02'
+        assert answers[2]['error']['code'] == -32600
+        assert answers[3]['result']['isError'] is True
+
+    def test_batch_of_notifications_is_not_answered(self, simple_specs):
+        responses = self._serve(
+            simple_specs, [self.INITIALIZE, [self.INITIALIZED, self.INITIALIZED], self._get(1, 'RF01')]
+        )
+
+        assert [response['id'] for response in responses] == [0, 1]
+
+    def test_initialization_in_batch(self, simple_specs):
+        responses = self._serve(simple_specs, [[self.INITIALIZE, self.INITIALIZED, self._get(1, 'RF01')]])
+
+        assert [answer['id'] for answer in responses[0]] == [0, 1]
+        assert 'result' in responses[0][1]
+
+    def test_empty_batch(self, simple_specs):
+        responses = self._serve(simple_specs, ['[]'])
+
+        assert responses == [{'jsonrpc': '2.0', 'id': None, 'error': {'code': -32600, 'message': 'Invalid request'}}]
+
+
+class TestResponseCache(ServerLoop):
+    """Tests for the cache of tool results."""
+
+    def test_same_output_as_without_cache(self, complex_specs):
+        search = {'jsonrpc': '2.0', 'method': 'tools/call', 'id': 'search', 'params': {'name': 'search_requirements'}}
+        lines = [self.INITIALIZE, self.INITIALIZED, self._get(1, 'RF03'), self._get(2, 'RF99'), search]
+        lines += [self._get(3, 'RF03'), [self._get(4, 'RF03'), self._get(5, 'RF99'), search]]
+
+        cached = self._serve_raw(complex_specs, lines, max_concurrency=1, cache_size=8)
+
+        assert cached == self._serve_raw(complex_specs, lines, max_concurrency=1)
+
+    def test_repeated_calls_are_handled_once(self, simple_specs, monkeypatch):
+        calls = []
+
+        def counted(arguments, specs):
+            calls.append(arguments)
+            return {'calls': len(calls)}
+
+        monkeypatch.setitem(TOOLS, 'counted', counted)
+        requests = [
+            {'jsonrpc': '2.0', 'method': 'tools/call', 'id': i, 'params': {'name': 'counted', 'arguments': arguments}}
+            for i, arguments in enumerate([{'a': 1, 'b': 2}, {'b': 2, 'a': 1}, {'a': 2}, {'a': 1, 'b': 2}], 1)
+        ]
+
+        responses = self._serve(
+            simple_specs, [self.INITIALIZE, self.INITIALIZED, *requests], max_concurrency=1, cache_size=8
+        )
+
+        assert [response['id'] for response in responses[1:]] == [1, 2, 3, 4]
+        assert [response['result']['structuredContent']['calls'] for response in responses[1:]] == [1, 1, 2, 1]
+        assert len(calls) == 2
+
+    def test_invalidated_by_changes(self, simple_specs):
+        cache = ResponseCache(max_entries=8)
+        key = ResponseCache.key('get_requirement', {'id': 'RF01'})
+        assert cache.get(key, simple_specs) is None
+        cache.put(key, simple_specs, '{}')
+        assert cache.get(key, simple_specs) == '{}'
+
+        simple_specs.unload_file((SAMPLES_DIR / 'simple_comments.yaml').resolve())
+
+        assert cache.get(key, simple_specs) is None
+        assert cache.get(key, Specification()) is None
+
+    def test_least_recently_used_dropped(self, simple_specs):
+        cache = ResponseCache(max_entries=2)
+        keys = [ResponseCache.key('tool', {'n': n}) for n in range(3)]
+        cache.get(keys[0], simple_specs)
+        cache.put(keys[0], simple_specs, '0')
+        cache.put(keys[1], simple_specs, '1')
+        cache.get(keys[0], simple_specs)
+        cache.put(keys[2], simple_specs, '2')
+
+        assert [cache.get(key, simple_specs) for key in keys] == ['0', None, '2']
@@ -0,0 +1,107 @@
+"""Tests for the watch mode of the MCP server."""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+from speky.specification import Specification
+from speky_mcp.watch import Watcher
+
+SAMPLES_DIR = Path(__file__).parent / 'samples'
+
+
+def load(folder: Path) -> Specification:
+    specs = Specification()
+    specs.read_file(folder / 'more_samples.yaml')
+    specs.check_references()
+    specs.scan_code_sources()
+    specs.compute_coverage()
+    return specs
+
+
+def edit(path: Path, content: str):
+    """Write a file, making sure its modification time changes even on coarse filesystems."""
+    previous = path.stat().st_mtime_ns if path.exists() else 0
+    path.write_text(content)
+    os.utime(path, ns=(previous + 1_000_000_000, previous + 1_000_000_000))
+
+
+@pytest.fixture
+def folder(tmp_path):
+    shutil.copytree(SAMPLES_DIR, tmp_path, dirs_exist_ok=True)
+    return tmp_path.resolve()
+
+
+@pytest.fixture
+def watched(folder):
+    specs = load(folder)
+    return specs, Watcher(specs, lambda: load(folder))
+
+
+def refresh(watched) -> Specification:
+    specs, watcher = watched
+    watcher.poll()
+    return watcher.apply(specs)
+
+
+def test_no_change(watched):
+    specs, _ = watched
+    assert refresh(watched) is specs
+
+
+def test_modified_requirement(folder, watched):
+    path = folder / 'simple_requirements.yaml'
+    edit(path, path.read_text().replace('The first requirement', 'The edited requirement'))
+
+    specs = refresh(watched)
+
+    assert specs.by_id['RF01'].long == 'The edited requirement'
+    assert [r.id for r in specs.requirements['functional']] == ['RF01', 'RF02']
+    assert [t.id for t in specs.testers_of['RF01']] == ['T01']
+
+
+def test_removed_requirement(folder, watched):
+    path = folder / 'more_requirements.toml'
+    content = path.read_text()
+    edit(path, content[: content.index('[[requirements]]\nid = "RF04"')].replace('ref = ["RF04"]\n', ''))
+
+    specs = refresh(watched)
+
+    assert 'RF04' not in specs.by_id
+    assert 'RF04' not in specs.references
+    assert [r.id for r in specs.tags['foo']] == ['RF03']
+    assert [r.id for r in specs.manifests[0].coverage['non-functional'][1]] == ['RF03']
+
+
+def test_invalid_edit_is_reported(folder, watched, caplog):
+    path = folder / 'simple_requirements.yaml'
+    edit(path, 'kind: requirements\n')
+
+    specs = refresh(watched)
+
+    assert 'Could not reload' in caplog.text
+    assert 'RF01' not in specs.by_id
+
+    edit(path, (SAMPLES_DIR / 'simple_requirements.yaml').read_text())
+    assert 'RF01' in refresh(watched).by_id
+
+
+def test_modified_code_source(folder, watched):
+    edit(folder / 'more_source.py', '# speky:more_samples#RF04\ndef other_function():\n    pass\n')
+
+    specs = refresh(watched)
+
+    assert 'RF03' not in specs.code_refs_by_id
+    assert [r.symbol for r in specs.code_refs_by_id['RF04']] == ['other_function']
+
+
+def test_modified_manifest_rebuilds(folder, watched):
+    specs, _ = watched
+    path = folder / 'more_samples.yaml'
+    edit(path, path.read_text().replace('  - more_source.go\n', ''))
+
+    rebuilt = refresh(watched)
+
+    assert rebuilt is not specs
+    assert 'T03' not in rebuilt.code_refs_by_id
@@ -0,0 +1,99 @@
+"""Tests for the source code scanner."""
+
+import logging
+from pathlib import Path
+
+import pytest
+from speky.scanner import scan_sources
+
+SAMPLES_DIR = Path(__file__).parent / 'samples'
+PROJECTS = {'more_samples'}
+
+
+def test_scan_samples():
+    refs = scan_sources([SAMPLES_DIR / 'more_source.py', SAMPLES_DIR / 'more_source.go'], PROJECTS)
+
+    assert [(r.target_id, r.symbol, r.is_test) for r in refs] == [
+        ('RF03', 'my_function', False),
+        ('T03', 'CreateFiles', False),
+        ('T04', 'TestYetAnotherTest', True),
+    ]
+
+
+def test_files_without_tag_are_skipped(tmp_path, caplog):
+    caplog.set_level(logging.INFO, logger='speky.scanner')
+    untagged = tmp_path / 'untagged.py'
+    untagged.write_text('def helper():\n    pass\n')
+
+    refs = scan_sources([untagged, SAMPLES_DIR / 'more_source.py'], PROJECTS)
+
+    assert [r.target_id for r in refs] == ['RF03']
+    assert 'Scanning 2 unique source file(s): 1 parsed, 1 skipped without tag, 0 from cache' in caplog.text
+
+
+def test_parallel_scan_matches_serial(tmp_path):
+    sources = []
+    for i in range(8):
+        source = tmp_path / f'feature_{i}.py'
+        source.write_text(f'# speky:more_samples#RF0{i}\ndef feature_{i}():\n    pass\n')
+        sources.append(source)
+    sources.append(SAMPLES_DIR / 'more_source.go')
+
+    assert scan_sources(sources, PROJECTS, jobs=3) == scan_sources(sources, PROJECTS)
+
+
+class TestScanCache:
+    """Tests for the persistent scan cache."""
+
+    @pytest.fixture(autouse=True)
+    def _log_info(self, caplog):
+        caplog.set_level(logging.INFO, logger='speky.scanner')
+
+    def _source(self, tmp_path):
+        source = tmp_path / 'feature.py'
+        source.write_text('# speky:more_samples#RF01\ndef feature():\n    pass\n')
+        return source
+
+    def test_second_scan_hits(self, tmp_path, caplog):
+        source = self._source(tmp_path)
+        cache = tmp_path / 'cache'
+
+        first = scan_sources([source], PROJECTS, cache)
+        assert (cache / 'scan.json').is_file()
+        assert 'Scan cache: 0 hit(s), 1 miss(es)' in caplog.text
+
+        caplog.clear()
+        second = scan_sources([source], PROJECTS, cache)
+        assert 'Scan cache: 1 hit(s), 0 miss(es)' in caplog.text
+        assert second == first
+
+    def test_modified_file_is_parsed_again(self, tmp_path, caplog):
+        source = self._source(tmp_path)
+        cache = tmp_path / 'cache'
+        scan_sources([source], PROJECTS, cache)
+
+        source.write_text('def feature():\n    """speky:more_samples#RF02"""\n')
+        caplog.clear()
+        refs = scan_sources([source], PROJECTS, cache)
+
+        assert 'Scan cache: 0 hit(s), 1 miss(es)' in caplog.text
+        assert [r.target_id for r in refs] == ['RF02']
+
+    def test_other_projects_discard_cache(self, tmp_path, caplog):
+        source = self._source(tmp_path)
+        cache = tmp_path / 'cache'
+        scan_sources([source], PROJECTS, cache)
+
+        caplog.clear()
+        refs = scan_sources([source], PROJECTS | {'other'}, cache)
+
+        assert 'Scan cache: 0 hit(s), 1 miss(es)' in caplog.text
+        assert [r.target_id for r in refs] == ['RF01']
+
+    def test_corrupted_cache_is_ignored(self, tmp_path):
+        source = self._source(tmp_path)
+        cache = tmp_path / 'cache'
+        cache.mkdir()
+        (cache / 'scan.json').write_text('{not json')
+
+        assert [r.target_id for r in scan_sources([source], PROJECTS, cache)] == ['RF01']
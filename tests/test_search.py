@@ -0,0 +1,99 @@
+"""Tests for the full-text search index."""
+
+from pathlib import Path
+
+import pytest
+from speky.search import snippet
+from speky.specification import Specification
+
+SAMPLES_DIR = Path(__file__).parent / 'samples'
+
+
+def load(lazy: bool = False) -> Specification:
+    specs = Specification(lazy=lazy)
+    specs.read_file(SAMPLES_DIR / 'more_samples.yaml')
+    specs.check_references()
+    return specs
+
+
+@pytest.fixture
+def specs():
+    return load()
+
+
+def ids(specs: Specification, query: str, **kwargs) -> list[str]:
+    return [hit.item.id for hit in specs.search_index().search(query, **kwargs)]
+
+
+def test_ranked_by_relevance(specs):
+    # Both words in a short document first, one word in longer ones after
+    assert ids(specs, 'second requirement')[:2] == ['RF02', 'T02']
+    assert set(ids(specs, 'second requirement')) >= {'RF01', 'RF03', 'RF04'}
+
+
+def test_case_insensitive_and_kind(specs):
+    assert ids(specs, 'SECRET') == ['T03']
+    assert ids(specs, 'first', kind='requirement') == ['RF01']
+    assert sorted(ids(specs, 'first', kind='test')) == ['T01', 'T03']
+
+
+def test_prefix(specs):
+    assert ids(specs, 'topsec*') == ['T04']
+    assert ids(specs, 'zz*') == []
+
+
+def test_phrase_is_required(specs):
+    assert sorted(ids(specs, '"the third requirement"')) == ['RF03', 'T04']
+    assert ids(specs, '"third the requirement"') == []
+    # Words outside the phrase only change the ranking
+    assert ids(specs, 'comment "the first"') == ['RF01', 'T01']
+
+
+def test_phrase_does_not_span_fields(specs):
+    # The short "Second" is followed by the long "The second requirement"
+    assert ids(specs, '"second the"') == []
+
+
+def test_comments_and_steps(specs):
+    hits = specs.search_index().search('see')
+    assert [(hit.item.id, hit.field, hit.snippet) for hit in hits] == [('RF03', 'comments', 'I can see that')]
+
+    hits = specs.search_index().search('"shell command"')
+    assert sorted((hit.item.id, hit.field) for hit in hits) == [('T02', 'steps'), ('T04', 'steps')]
+
+
+def test_count(specs):
+    assert len(ids(specs, 'requirement', count=2)) == 2
+
+
+def test_rebuilt_after_changes(specs):
+    index = specs.search_index()
+    assert specs.search_index() is index
+
+    specs.unload_file((SAMPLES_DIR / 'more_tests.yaml').resolve())
+
+    assert specs.search_index() is not index
+    assert ids(specs, 'secret') == []
+
+
+def test_lazy_matches_eager(specs):
+    lazy = load(lazy=True)
+
+    for query in ('requirement', '"the first"', 'topsec*', 'good'):
+        eager_hits = specs.search_index().search(query)
+        lazy_hits = lazy.search_index().search(query)
+        assert [(h.item.id, h.score, h.snippet) for h in lazy_hits] == [
+            (h.item.id, h.score, h.snippet) for h in eager_hits
+        ]
+
+
+def test_snippet():
+    text = ' '.join(f'word{i}' for i in range(100))
+    start = text.index('word50')
+
+    result = snippet(text, start, start + len('word50'))
+
+    assert result.startswith('…word') and result.endswith('…')
+    assert 'word50' in result
+    assert len(result) < 2 * 60 + 20
+    assert snippet('Short\n  text', 0, 5) == 'Short text'
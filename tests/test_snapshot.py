@@ -0,0 +1,110 @@
+"""Tests for the snapshots of a loaded specification."""
+
+import argparse
+import logging
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+import speky
+from speky.snapshot import load_snapshot, save_snapshot
+from speky.specification import Specification
+from speky_mcp.server import load_specification, run
+
+SAMPLES_DIR = Path(__file__).parent / 'samples'
+
+
+@pytest.fixture
+def specs():
+    specs = Specification()
+    specs.read_file(SAMPLES_DIR / 'more_samples.yaml')
+    specs.check_references()
+    specs.scan_code_sources()
+    specs.compute_coverage()
+    return specs
+
+
+def test_round_trip(specs, tmp_path):
+    path = tmp_path / 'spec.snap'
+    save_snapshot(specs, path)
+
+    loaded = load_snapshot(path)
+
+    assert sorted(loaded.by_id) == sorted(specs.by_id)
+    assert [t.id for t in loaded.testers_of['RF01']] == [t.id for t in specs.testers_of['RF01']]
+    assert [r.symbol for r in loaded.code_refs_by_id['RF03']] == ['my_function']
+    assert loaded.by_id['RF01'].manifest is loaded.manifests[0]
+    coverage = loaded.manifests[0].coverage['non-functional']
+    assert [[r.id for r in bucket] for bucket in coverage] == [
+        [r.id for r in bucket] for bucket in specs.manifests[0].coverage['non-functional']
+    ]
+
+
+def test_cli_writes_snapshot(sample, tmp_path):
+    path = tmp_path / 'spec.snap'
+    speky.run(['--check-only', '--snapshot', str(path), sample('more_samples')])
+
+    assert 'RF04' in load_snapshot(path).by_id
+
+
+def test_server_loads_snapshot(specs, tmp_path):
+    path = tmp_path / 'spec.snap'
+    save_snapshot(specs, path)
+    args = argparse.Namespace(snapshot=path, jobs=1)
+
+    assert sorted(load_specification(args).by_id) == sorted(specs.by_id)
+
+
+def test_server_rejects_snapshot_and_files(tmp_path):
+    with pytest.raises(SystemExit):
+        run(['--snapshot', str(tmp_path / 'spec.snap'), str(SAMPLES_DIR / 'more_samples.yaml')])
+
+
+def test_not_a_snapshot(tmp_path):
+    path = tmp_path / 'spec.snap'
+    path.write_text('kind: requirements\n')
+
+    with pytest.raises(RuntimeError, match='is not a Speky snapshot'):
+        load_snapshot(path)
+
+
+def test_other_version_is_rejected(specs, tmp_path, monkeypatch):
+    path = tmp_path / 'spec.snap'
+    monkeypatch.setattr('speky.snapshot.version', lambda _: '0.0.1')
+    save_snapshot(specs, path)
+    monkeypatch.undo()
+
+    with pytest.raises(RuntimeError, match='written by Speky 0.0.1'):
+        load_snapshot(path)
+
+
+def test_outdated_snapshot_is_reported(tmp_path, caplog):
+    shutil.copytree(SAMPLES_DIR, tmp_path / 'samples')
+    specs = Specification()
+    specs.read_file(tmp_path / 'samples' / 'simple_requirements.yaml')
+    path = tmp_path / 'spec.snap'
+    save_snapshot(specs, path)
+
+    os.utime(tmp_path / 'samples' / 'simple_requirements.yaml', ns=(0, 0))
+    with caplog.at_level(logging.WARNING, logger='speky.snapshot'):
+        load_snapshot(path)
+
+    assert 'older than 1 of its source file(s)' in caplog.text
+
+
+def test_outdated_comment_csv_is_reported(tmp_path, caplog):
+    shutil.copytree(SAMPLES_DIR, tmp_path / 'samples')
+    comments = tmp_path / 'samples' / 'comments.csv'
+    comments.write_text('about,from,date,text,external\nRF01,Alice,01/02/2025,Looks good,false\n')
+    specs = Specification()
+    specs.read_file(tmp_path / 'samples' / 'simple_requirements.yaml')
+    specs.read_comment_csv(comments)
+    path = tmp_path / 'spec.snap'
+    save_snapshot(specs, path)
+
+    os.utime(comments, ns=(0, 0))
+    with caplog.at_level(logging.WARNING, logger='speky.snapshot'):
+        load_snapshot(path)
+
+    assert 'older than 1 of its source file(s), like ' + str(comments.resolve()) in caplog.text
@@ -0,0 +1,121 @@
+"""Tests for the loading of specification files."""
+
+from pathlib import Path
+
+import pytest
+from speky.specification import Specification
+
+SAMPLES_DIR = Path(__file__).parent / 'samples'
+
+
+def load(path: Path, jobs: int) -> Specification:
+    specs = Specification(jobs=jobs)
+    specs.read_file(path)
+    return specs
+
+
+def test_parallel_load_matches_serial():
+    serial = load(SAMPLES_DIR / 'more_samples.yaml', jobs=1)
+    parallel = load(SAMPLES_DIR / 'more_samples.yaml', jobs=4)
+
+    assert list(parallel.by_id) == list(serial.by_id)
+    assert parallel.loaded_files == serial.loaded_files
+    for category, requirements in serial.requirements.items():
+        assert [r.id for r in parallel.requirements[category]] == [r.id for r in requirements]
+    for about, comments in serial.comments.items():
+        assert [c.text for c in parallel.comments[about]] == [c.text for c in comments]
+
+
+@pytest.mark.parametrize('jobs', [1, 4])
+def test_parallel_load_reports_same_redefinition(tmp_path, jobs):
+    (tmp_path / 'manifest.yaml').write_text('kind: project\nname: dup\nfiles:\n  - "*_requirements.yaml"\n')
+    for name in ('a', 'b', 'c'):
+        (tmp_path / f'{name}_requirements.yaml').write_text(
+            f'kind: requirements\ncategory: functional\nrequirements:\n- id: R{name}\n  long: Unique\n- id: R01\n  long: Shared\n'
+        )
+
+    with pytest.raises(KeyError, match='already defined in "a_requirements.yaml", redefined in "b_requirements.yaml"'):
+        load(tmp_path / 'manifest.yaml', jobs)
+
+
+def test_parallel_load_reports_first_invalid_file(tmp_path):
+    (tmp_path / 'manifest.yaml').write_text('kind: project\nname: bad\nfiles:\n  - "*.yaml"\n')
+    (tmp_path / 'a.yaml').write_text('kind: requirements\ncategory: functional\nrequirements: []\n')
+    (tmp_path / 'b.yaml').write_text('')
+    (tmp_path / 'c.yaml').write_text('kind: [\n')
+
+    with pytest.raises(RuntimeError, match='Empty file "b.yaml"'):
+        load(tmp_path / 'manifest.yaml', jobs=4)
+
+
+def test_identifiers_are_interned():
+    specs = load(SAMPLES_DIR / 'more_samples.yaml', jobs=1)
+
+    test = specs.by_id['T01']
+    assert test.ref[0] is specs.by_id['RF01'].id
+    assert next(key for key in specs.testers_of if key == 'RF01') is specs.by_id['RF01'].id
+    assert test.category is specs.by_id['RF01'].category
+
+
+@pytest.fixture
+def tagged(tmp_path):
+    (tmp_path / 'functional.yaml').write_text(
+        'kind: requirements\ncategory: functional\nrequirements:\n'
+        '- {id: F1, long: One, tags: [a, b]}\n- {id: F2, long: Two, tags: [a]}\n- {id: F3, long: Three}\n'
+    )
+    (tmp_path / 'other.yaml').write_text(
+        'kind: requirements\ncategory: other\nrequirements:\n- {id: O1, long: One, tags: [a, b, c]}\n'
+    )
+    (tmp_path / 'tests.yaml').write_text(
+        'kind: tests\ncategory: manual\ntests:\n'
+        '- {id: T1, long: One, ref: [F1], steps: []}\n- {id: T2, long: Two, ref: [F1, O1], steps: []}\n'
+    )
+    specs = Specification()
+    for name in ('functional', 'other', 'tests'):
+        specs.read_file(tmp_path / f'{name}.yaml')
+    return specs
+
+
+def ids(items) -> list[str]:
+    return sorted(item.id for item in items)
+
+
+def test_find_requirements(tagged):
+    assert ids(tagged.find_requirements()) == ['F1', 'F2', 'F3', 'O1']
+    assert ids(tagged.find_requirements(category='functional')) == ['F1', 'F2', 'F3']
+    assert ids(tagged.find_requirements(['a'], 'functional')) == ['F1', 'F2']
+    assert ids(tagged.find_requirements(['a', 'b'])) == ['F1', 'O1']
+    assert ids(tagged.find_requirements(['b', 'c'], any_tag=True)) == ['F1', 'O1']
+    assert ids(tagged.find_requirements(['c', 'b'], 'functional', any_tag=True)) == ['F1']
+    assert ids(tagged.find_requirements(['a', 'c'], 'functional')) == []
+    assert ids(tagged.find_requirements(['unknown'])) == []
+    assert 'unknown' not in tagged.tags
+
+
+def test_find_tests(tagged):
+    assert ids(tagged.find_tests()) == ['T1', 'T2']
+    assert ids(tagged.find_tests('F1', 'manual')) == ['T1', 'T2']
+    assert ids(tagged.find_tests('O1')) == ['T2']
+    assert ids(tagged.find_tests('O1', 'automated')) == []
+
+
+def test_secondary_indexes_follow_unloads(tagged, tmp_path):
+    tagged.unload_file((tmp_path / 'functional.yaml').resolve())
+    tagged.unload_file((tmp_path / 'tests.yaml').resolve())
+
+    assert ids(tagged.find_requirements(['a', 'b'])) == ['O1']
+    assert list(tagged.tags_by_category) == [('a', 'other'), ('b', 'other'), ('c', 'other')]
+    assert not tagged.testers_by_category
+
+
+def test_prerequisite_cycles():
+    from speky.specification import _cycles
+
+    graph = {'a': ['b'], 'b': ['c', 'd'], 'c': ['a'], 'd': ['d', 'e'], 'e': [], 'f': ['e']}
+    assert _cycles(graph) == [['a', 'b', 'c'], ['d']]
+
+    # Deeper than the recursion limit
+    chain = {f'n{i}': [f'n{i + 1}'] for i in range(100_000)}
+    assert _cycles(chain) == []
+    chain['n100000'] = ['n0']
+    assert len(_cycles(chain)[0]) == 100_001